@@ -1,22 +1,38 @@
+from .config_param import config, config_param
 
 from .aircraft_control import *
 from .async_aircraft_control import *
-from .bluebird_connect import bluebird_config, get_bluebird_url
+from .batch_executor import batch, batch_results, async_batch, BatchError, CommandResult
+from .async_client import AsyncDodo
+from .client import Dodo
+from .bluebird_connect import bluebird_config, get_bluebird_url, async_session
+from .blocked_separation import separation_matrix
+from .conflicts import predict_conflicts
 from .create_aircraft import create_aircraft
 from .distance_measures import *
 from .episode_log import episode_log
+from .fuel_accumulator import FuelEfficiencyAccumulator
 from .get_flight_level import *
 from .list_route import list_route
+from .local_metrics import loss_of_separation_matrix, loss_of_separation_pairs
 from .metrics import loss_of_separation, sector_exit, fuel_efficiency
+from .position_stream import PositionDelta, stream_positions
+from .proximity import ProximityTracker, proximity_pairs
 from .request_position import *
 from .simulation_control import *
 from .scenario import upload_scenario
-from .sector import upload_sector
+from .sector import Sector, upload_sector
 from .simulation_info import simulation_info
+from .trajectory_file import TrajectoryReader, TrajectoryRecorder
+from .trajectory_store import TrajectoryStore
+from .wait import wait_until
 
 __all__ = [
     "aircraft_position",
     "all_positions",
+    "set_position_cache",
+    "stream_positions",
+    "wait_until",
     "requested_flight_level",
     "cleared_flight_level",
     "current_flight_level",
@@ -42,12 +58,19 @@ __all__ = [
     "vertical_distance",
     "euclidean_separation",
     "euclidean_distance",
+    "separation_matrix",
+    "proximity_pairs",
+    "predict_conflicts",
     "batch",
+    "batch_results",
+    "async_batch",
     "async_change_altitude",
     "async_change_heading",
     "async_change_speed",
     "async_direct_to_waypoint",
     "loss_of_separation",
+    "loss_of_separation_matrix",
+    "loss_of_separation_pairs",
     "sector_exit",
     "bluebird_config",
     "get_bluebird_url",
@@ -1,6 +1,6 @@
 from . import utils
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
 
 
 def change_altitude(aircraft_id, altitude=None, flight_level=None, vertical_speed=None):
@@ -36,12 +36,12 @@ def change_altitude(aircraft_id, altitude=None, flight_level=None, vertical_spee
     ), "Only altitude or flight level should be provided, not both"
     alt = utils._parse_alt(altitude, flight_level)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "alt": alt}
+    body = {config.query_aircraft_id: aircraft_id, "alt": alt}
 
     if vertical_speed:
         utils._validate_speed(vertical_speed)
         body["vs"] = vertical_speed
-    return post_request(config_param("endpoint_change_altitude"), body)
+    return post_request(config.endpoint_change_altitude, body)
 
 
 def change_heading(aircraft_id, heading):
@@ -68,8 +68,8 @@ def change_heading(aircraft_id, heading):
     utils._validate_id(aircraft_id)
     utils._validate_heading(heading)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "hdg": heading}
-    return post_request(config_param("endpoint_change_heading"), body)
+    body = {config.query_aircraft_id: aircraft_id, "hdg": heading}
+    return post_request(config.endpoint_change_heading, body)
 
 
 def change_speed(aircraft_id, speed):
@@ -97,8 +97,8 @@ def change_speed(aircraft_id, speed):
     utils._validate_id(aircraft_id)
     utils._validate_speed(speed)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "gspd": speed}
-    return post_request(config_param("endpoint_change_speed"), body)
+    body = {config.query_aircraft_id: aircraft_id, "gspd": speed}
+    return post_request(config.endpoint_change_speed, body)
 
 
 def direct_to_waypoint(aircraft_id, waypoint_name):
@@ -129,5 +129,5 @@ def direct_to_waypoint(aircraft_id, waypoint_name):
     utils._validate_id(aircraft_id)
     utils._validate_string(waypoint_name, "waypoint name")
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "waypoint": waypoint_name}
-    return post_request(config_param("endpoint_direct_to_waypoint"), body)
+    body = {config.query_aircraft_id: aircraft_id, "waypoint": waypoint_name}
+    return post_request(config.endpoint_direct_to_waypoint, body)
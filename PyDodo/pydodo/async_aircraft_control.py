@@ -1,56 +1,7 @@
-import requests
-import asyncio
-import aiohttp
-
-from concurrent.futures import ThreadPoolExecutor
-
 from . import utils
-from .bluebird_connect import construct_endpoint_url
-from .config_param import config_param
-
-
-def batch(commands):
-    """
-    Send a batch of aircraft control commands and dispatch them asynchronously
-    to Bluebird.
-
-    Parameters
-    ----------
-    async_commands : list
-        A list of aircraft control commands. In PyDodo, these need an ``async_``
-        prefix. For example, ``batch([async_change_speed(...), async_change_altitude(...)]``.
-
-    Returns
-    -------
-    TRUE if all commands were executed. Otherwise an exception is thrown.
-
-    Examples
-    --------
-    ::
-
-        batch(
-            async_change_heading("BAW123", heading = 350),
-            async_change_altitude("BAW123", flight_level = 450),
-            async_change_heading("KLM456", heading = 10),
-            async_change_altitude("KLM456", flight_level = 250)
-            )
-    """
-
-    if type(commands) != list:
-        futures = [commands]
-    else:
-        futures = commands
-
-    asyncio.set_event_loop(asyncio.new_event_loop())
-    loop = asyncio.get_event_loop()
-    tasks = asyncio.gather(*futures, return_exceptions=True)
-    results = loop.run_until_complete(tasks)
-    loop.close()
-
-    if results.count(True) == len(futures):
-        return True
-    else:
-        raise Exception(";".join([str(resp) for resp in results if resp != True]))
+from .batch_executor import batch
+from .post_request import async_post_request
+from .config_param import config
 
 
 async def async_change_altitude(
@@ -88,14 +39,11 @@ async def async_change_altitude(
     ), "Only altitude or flight level should be provided, not both"
     alt = utils._parse_alt(altitude, flight_level)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "alt": alt}
+    body = {config.query_aircraft_id: aircraft_id, "alt": alt}
     if vertical_speed:
         utils._validate_speed(vertical_speed)
         body["vs"] = vertical_speed
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        url = construct_endpoint_url(config_param("endpoint_change_altitude"))
-        async with session.post(url, json=body) as response:
-            return True
+    return await async_post_request(config.endpoint_change_altitude, body)
 
 
 async def async_change_heading(aircraft_id, heading):
@@ -122,11 +70,8 @@ async def async_change_heading(aircraft_id, heading):
     utils._validate_id(aircraft_id)
     utils._validate_heading(heading)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "hdg": heading}
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        url = construct_endpoint_url(config_param("endpoint_change_heading"))
-        async with session.post(url, json=body) as response:
-            return True
+    body = {config.query_aircraft_id: aircraft_id, "hdg": heading}
+    return await async_post_request(config.endpoint_change_heading, body)
 
 
 async def async_change_speed(aircraft_id, speed):
@@ -154,11 +99,8 @@ async def async_change_speed(aircraft_id, speed):
     utils._validate_id(aircraft_id)
     utils._validate_speed(speed)
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "gspd": speed}
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        url = construct_endpoint_url(config_param("endpoint_change_speed"))
-        async with session.post(url, json=body) as response:
-            return True
+    body = {config.query_aircraft_id: aircraft_id, "gspd": speed}
+    return await async_post_request(config.endpoint_change_speed, body)
 
 
 async def async_direct_to_waypoint(aircraft_id, waypoint_name):
@@ -189,8 +131,5 @@ async def async_direct_to_waypoint(aircraft_id, waypoint_name):
     utils._validate_id(aircraft_id)
     utils._validate_string(waypoint_name, "waypoint name")
 
-    body = {config_param("query_aircraft_id"): aircraft_id, "waypoint": waypoint_name}
-    async with aiohttp.ClientSession(raise_for_status=True) as session:
-        url = construct_endpoint_url(config_param("direct_to_waypoint"))
-        async with session.post(url, json=body) as response:
-            return True
+    body = {config.query_aircraft_id: aircraft_id, "waypoint": waypoint_name}
+    return await async_post_request(config.endpoint_direct_to_waypoint, body)
@@ -0,0 +1,547 @@
+import json
+import asyncio
+import inspect
+import functools
+
+from . import utils
+from . import distance_measures
+from .async_aircraft_control import (
+    async_change_altitude,
+    async_change_heading,
+    async_change_speed,
+    async_direct_to_waypoint,
+)
+from .batch_executor import async_batch, BatchError
+from .blocked_separation import separation_matrix
+from .bluebird_connect import (
+    bluebird_config,
+    get_bluebird_url,
+    construct_endpoint_url,
+    get_async_session,
+    close_async_sessions,
+)
+from .client import _bind, get_client, Dodo
+from .config_param import config
+from .conflicts import _conflicts_from_pos
+from .create_aircraft import _create_aircraft_body
+from .derived_positions import _share_derived_positions
+from .episode_log import _save_episode_log
+from .list_route import _handle_route_call, _process_listroute_response
+from .local_metrics import _los_matrix_from_pos, _los_pairs_from_pos
+from .metrics import (
+    _bulk_scores,
+    _handle_metrics_call,
+    _pair_arg,
+    _pair_args,
+    _pair_scores_df,
+    _parse_pair_lists,
+    _scores_series,
+)
+from .position_stream import _async_stream_positions
+from .post_request import async_post_request
+from .proximity import _proximity_from_pos
+from .request_position import (
+    _fallback_positions,
+    _filtered_call_params,
+    _handle_filtered_call,
+    _handle_position_call,
+    _process_pos_response,
+    _record_aircraft_count,
+    _select_positions,
+    _use_filtered_call,
+    set_position_cache,
+)
+from .scenario import _upload_scenario_body
+from .sector import _upload_sector_body, _uploaded_sector
+from .simulation_info import _process_siminfo_response
+from .wait import _Wait
+
+
+def _local(f):
+    """Expose a function that does not talk to BlueBird as a coroutine."""
+
+    @functools.wraps(f)
+    async def wrapper(self, *args, **kwargs):
+        return f(*args, **kwargs)
+
+    return wrapper
+
+
+class AsyncDodo:
+    """
+    Asynchronous PyDodo client. Every function in ``pydodo.__all__`` is
+    available as a coroutine method, so observations, metrics and commands can
+    be awaited concurrently within one step.
+
+    All requests share the aiohttp session of the client's running event loop.
+    Used as an asynchronous context manager, the session is closed on exit.
+
+    Parameters
+    ----------
+    host : str, optional
+        BlueBird host (e.g., 'localhost' or '0.0.0.0').
+    port : int, optional
+        BlueBird port (e.g., 5001).
+    version : str, optional
+        BlueBird version (e.g., 'v1' or 'v2')
+    client : Dodo, optional
+        The client whose BlueBird URL and sessions to use. If no client nor
+        any of host, port and version are given, the current Dodo client is used
+        (see ``pydodo.client.get_client()``).
+
+    Examples
+    --------
+    ::
+
+        async with pydodo.AsyncDodo() as dodo:
+            pos, score, _ = await asyncio.gather(
+                dodo.all_positions(),
+                dodo.loss_of_separation("BAW123", "KLM456"),
+                dodo.change_heading("BAW123", heading = 90),
+                )
+    """
+
+    def __init__(self, host=None, port=None, version=None, client=None):
+        if client is None and not (host is None and port is None and version is None):
+            client = Dodo(host, port, version)
+        self.client = client
+
+    async def __aenter__(self):
+        self._bound(get_async_session)()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """Close the aiohttp session of the running event loop."""
+        return await close_async_sessions()
+
+    async def _get(self, endpoint, params=None):
+        """Make a GET request and return the response status and text."""
+        url = construct_endpoint_url(endpoint)
+        session = get_async_session()
+        async with session.get(url, params=params, raise_for_status=False) as resp:
+            return resp.status, await resp.text()
+
+    def _bound(self, f):
+        """Wrap f so that it talks to this client's BlueBird instance."""
+        return f if self.client is None else _bind(self.client, f)
+
+    # ---------------------------------------------------------------------- #
+    # Positions
+    # ---------------------------------------------------------------------- #
+    async def _position_call(self, aircraft_id=None):
+        params = None if aircraft_id is None else {config.query_aircraft_id: aircraft_id}
+        status, text = await self._get(config.endpoint_aircraft_position, params)
+        return _handle_position_call(status, text, aircraft_id)
+
+    async def all_positions(self, output="dataframe"):
+        """Coroutine version of ``pydodo.all_positions()``."""
+        client = get_client()
+        cache = client.position_cache
+        if cache is None:
+            response = await self._position_call()
+        else:
+            response = await cache.async_fetch(self._position_call)
+        _record_aircraft_count(client, response)
+        return _share_derived_positions(_process_pos_response(response, output), cache)
+
+    async def aircraft_position(self, aircraft_id):
+        """Coroutine version of ``pydodo.aircraft_position()``."""
+        utils._validate_id_list(aircraft_id)
+
+        if type(aircraft_id) == str:
+            if get_client().position_cache is not None:
+                return _select_positions(
+                    await self.all_positions(), [aircraft_id.upper()]
+                )
+            return _process_pos_response(await self._position_call(aircraft_id))
+        elif type(aircraft_id) == list:
+            client = get_client()
+            filtered = _use_filtered_call(client, aircraft_id)
+            if filtered:
+                status, text = await self._get(
+                    config.endpoint_aircraft_position,
+                    _filtered_call_params(aircraft_id),
+                )
+                pos_df = _handle_filtered_call(client, aircraft_id, status, text)
+                if pos_df is not None:
+                    return pos_df
+            return _fallback_positions(
+                client, aircraft_id, await self.all_positions(), filtered
+            )
+
+    set_position_cache = _local(set_position_cache)
+
+    async def stream_positions(self, interval=None, on_step=False):
+        """Asynchronous iterator version of ``pydodo.stream_positions()``."""
+        async for delta in _async_stream_positions(
+            self.all_positions, self.simulation_step, interval, on_step
+        ):
+            yield delta
+
+    async def wait_until(self, aircraft_id, predicate, timeout=10, sim_timeout=None):
+        """Coroutine version of ``pydodo.wait_until()``."""
+        wait = _Wait(get_client(), aircraft_id, predicate, timeout, sim_timeout)
+        while True:
+            holds, delay = wait.poll(await wait.cache.async_fetch(self._position_call))
+            if delay is None:
+                return holds
+            await asyncio.sleep(delay)
+
+    async def _get_flight_level(self, aircraft_id):
+        utils._validate_id(aircraft_id)
+        return await self.aircraft_position(aircraft_id)
+
+    async def requested_flight_level(self, aircraft_id):
+        """Coroutine version of ``pydodo.requested_flight_level()``."""
+        pos_df = await self._get_flight_level(aircraft_id)
+        return pos_df.iloc[0]["requested_flight_level"]
+
+    async def cleared_flight_level(self, aircraft_id):
+        """Coroutine version of ``pydodo.cleared_flight_level()``."""
+        pos_df = await self._get_flight_level(aircraft_id)
+        return pos_df.iloc[0]["cleared_flight_level"]
+
+    async def current_flight_level(self, aircraft_id):
+        """Coroutine version of ``pydodo.current_flight_level()``."""
+        pos_df = await self._get_flight_level(aircraft_id)
+        return pos_df.iloc[0]["current_flight_level"]
+
+    async def list_route(self, aircraft_id):
+        """Coroutine version of ``pydodo.list_route()``."""
+        utils._validate_id(aircraft_id)
+
+        status, text = await self._get(
+            config.endpoint_list_route, {config.query_aircraft_id: aircraft_id}
+        )
+        return _process_listroute_response(_handle_route_call(aircraft_id, status, text))
+
+    # ---------------------------------------------------------------------- #
+    # Aircraft control
+    # ---------------------------------------------------------------------- #
+    async def change_altitude(
+        self, aircraft_id, altitude=None, flight_level=None, vertical_speed=None
+    ):
+        """Coroutine version of ``pydodo.change_altitude()``."""
+        return await async_change_altitude(
+            aircraft_id, altitude, flight_level, vertical_speed
+        )
+
+    async def change_heading(self, aircraft_id, heading):
+        """Coroutine version of ``pydodo.change_heading()``."""
+        return await async_change_heading(aircraft_id, heading)
+
+    async def change_speed(self, aircraft_id, speed):
+        """Coroutine version of ``pydodo.change_speed()``."""
+        return await async_change_speed(aircraft_id, speed)
+
+    async def direct_to_waypoint(self, aircraft_id, waypoint_name):
+        """Coroutine version of ``pydodo.direct_to_waypoint()``."""
+        return await async_direct_to_waypoint(aircraft_id, waypoint_name)
+
+    async_change_altitude = change_altitude
+    async_change_heading = change_heading
+    async_change_speed = change_speed
+    async_direct_to_waypoint = direct_to_waypoint
+
+    async def create_aircraft(
+        self,
+        aircraft_id,
+        type,
+        latitude,
+        longitude,
+        heading,
+        speed,
+        altitude=None,
+        flight_level=None,
+    ):
+        """Coroutine version of ``pydodo.create_aircraft()``."""
+        body = _create_aircraft_body(
+            aircraft_id, type, latitude, longitude, heading, speed, altitude, flight_level
+        )
+        return await async_post_request(config.endpoint_create_aircraft, body)
+
+    async def batch(self, commands, max_concurrency=None):
+        """Coroutine version of ``pydodo.batch()``."""
+        results = await async_batch(commands, max_concurrency)
+        if all(res.success for res in results):
+            return True
+        else:
+            raise BatchError(results)
+
+    async def batch_results(self, commands, max_concurrency=None):
+        """Coroutine version of ``pydodo.batch_results()``."""
+        return await async_batch(commands, max_concurrency)
+
+    async_batch = batch_results
+
+    # ---------------------------------------------------------------------- #
+    # Scenario, sector and simulation control
+    # ---------------------------------------------------------------------- #
+    async def upload_scenario(self, filename, scenario_name):
+        """Coroutine version of ``pydodo.upload_scenario()``."""
+        body = _upload_scenario_body(filename, scenario_name)
+        return await async_post_request(config.endpoint_create_scenario, body)
+
+    async def upload_sector(self, filename, sector_name):
+        """Coroutine version of ``pydodo.upload_sector()``."""
+        body = _upload_sector_body(filename, sector_name)
+        result = await async_post_request(config.endpoint_upload_sector, body)
+        get_client()._sector = _uploaded_sector(body)
+        return result
+
+    async def reset_simulation(self):
+        """Coroutine version of ``pydodo.reset_simulation()``."""
+        return await async_post_request(config.endpoint_reset_simulation)
+
+    async def pause_simulation(self):
+        """Coroutine version of ``pydodo.pause_simulation()``."""
+        return await async_post_request(config.endpoint_pause_simulation)
+
+    async def resume_simulation(self):
+        """Coroutine version of ``pydodo.resume_simulation()``."""
+        return await async_post_request(config.endpoint_resume_simulation)
+
+    async def set_simulation_rate_multiplier(self, multiplier):
+        """Coroutine version of ``pydodo.set_simulation_rate_multiplier()``."""
+        utils._validate_multiplier(multiplier)
+
+        body = {"multiplier": multiplier}
+        return await async_post_request(
+            config.endpoint_set_simulation_rate_multiplier, body
+        )
+
+    async def simulation_step(self):
+        """Coroutine version of ``pydodo.simulation_step()``."""
+        return await async_post_request(config.endpoint_simulation_step)
+
+    async def simulation_info(self):
+        """Coroutine version of ``pydodo.simulation_info()``."""
+        status, text = await self._get(config.endpoint_simulation_info)
+        if status >= 400:
+            raise Exception(f"BlueBird returned '{text}'")
+        return _process_siminfo_response(json.loads(text))
+
+    async def episode_log(self):
+        """Coroutine version of ``pydodo.episode_log()``."""
+        status, text = await self._get(config.endpoint_episode_log)
+        if status >= 400:
+            raise Exception(f"BlueBird returned '{text}'")
+        return _save_episode_log(json.loads(text))
+
+    # ---------------------------------------------------------------------- #
+    # Metrics
+    # ---------------------------------------------------------------------- #
+    async def _metrics_call(self, metric, args):
+        status, text = await self._get(
+            config.endpoint_metrics, {"name": metric, "args": args}
+        )
+        return _handle_metrics_call(metric, status, text)
+
+    async def _bulk_metrics_call(self, metric, args, max_concurrency=None):
+        if max_concurrency is None:
+            max_concurrency = config.metrics_max_concurrency
+        args = list(dict.fromkeys(args))
+        results = await async_batch(
+            [self._metrics_call(metric, arg) for arg in args], max_concurrency
+        )
+        return dict(zip(args, _bulk_scores(results)))
+
+    async def loss_of_separation(
+        self, from_aircraft_id, to_aircraft_id, max_concurrency=None
+    ):
+        """Coroutine version of ``pydodo.loss_of_separation()``."""
+        if isinstance(from_aircraft_id, str) and isinstance(to_aircraft_id, str):
+            utils._validate_id(from_aircraft_id)
+            utils._validate_id(to_aircraft_id)
+
+            return await self._metrics_call(
+                config.loss_of_separation, _pair_arg(from_aircraft_id, to_aircraft_id)
+            )
+
+        from_aircraft_id, to_aircraft_id = _parse_pair_lists(
+            from_aircraft_id, to_aircraft_id
+        )
+        scores = await self._bulk_metrics_call(
+            config.loss_of_separation,
+            _pair_args(from_aircraft_id, to_aircraft_id),
+            max_concurrency,
+        )
+        return _pair_scores_df(from_aircraft_id, to_aircraft_id, scores)
+
+    async def _get_los_pos_df(self, aircraft_id):
+        if aircraft_id is None:
+            pos_df = await self.all_positions()
+            aircraft_id = list(pos_df.index)
+        else:
+            utils._validate_id_list(aircraft_id)
+            if not isinstance(aircraft_id, list):
+                aircraft_id = [aircraft_id]
+            pos_df = await self.aircraft_position(aircraft_id)
+        return distance_measures._altitude_to_metres(pos_df), aircraft_id
+
+    async def loss_of_separation_matrix(self, aircraft_id=None):
+        """Coroutine version of ``pydodo.loss_of_separation_matrix()``."""
+        pos_df, aircraft_id = await self._get_los_pos_df(aircraft_id)
+        return _los_matrix_from_pos(pos_df, aircraft_id)
+
+    async def loss_of_separation_pairs(self, aircraft_id=None):
+        """Coroutine version of ``pydodo.loss_of_separation_pairs()``."""
+        pos_df, _ = await self._get_los_pos_df(aircraft_id)
+        return _los_pairs_from_pos(pos_df)
+
+    async def _aircraft_metric(self, metric, aircraft_id, max_concurrency):
+        utils._validate_id_list(aircraft_id)
+
+        if isinstance(aircraft_id, str):
+            return await self._metrics_call(metric, aircraft_id)
+
+        scores = await self._bulk_metrics_call(metric, aircraft_id, max_concurrency)
+        return _scores_series(aircraft_id, scores)
+
+    async def sector_exit(self, aircraft_id, max_concurrency=None):
+        """Coroutine version of ``pydodo.sector_exit()``."""
+        return await self._aircraft_metric(
+            config.sector_exit, aircraft_id, max_concurrency
+        )
+
+    async def fuel_efficiency(self, aircraft_id, max_concurrency=None):
+        """Coroutine version of ``pydodo.fuel_efficiency()``."""
+        return await self._aircraft_metric(
+            config.fuel_efficiency, aircraft_id, max_concurrency
+        )
+
+    # ---------------------------------------------------------------------- #
+    # Separation (positions are fetched asynchronously, distances are local)
+    # ---------------------------------------------------------------------- #
+    async def _separation(self, from_aircraft_id, to_aircraft_id, distance_f, **kwargs):
+        from_aircraft_id, to_aircraft_id = distance_measures._parse_id_lists(
+            from_aircraft_id, to_aircraft_id
+        )
+        ids = distance_measures._unique_ids(from_aircraft_id, to_aircraft_id)
+        pos_df = distance_measures._altitude_to_metres(await self.aircraft_position(ids))
+        return distance_measures._separation_from_pos(
+            pos_df, from_aircraft_id, to_aircraft_id, distance_f, **kwargs
+        )
+
+    async def geodesic_separation(
+        self,
+        from_aircraft_id,
+        to_aircraft_id=None,
+        major_semiaxis=distance_measures._EARTH_RADIUS,
+        flattening=distance_measures._FLATTENING,
+    ):
+        """Coroutine version of ``pydodo.geodesic_separation()``."""
+        return await self._separation(
+            from_aircraft_id,
+            to_aircraft_id,
+            distance_f=distance_measures.geodesic_distance,
+            major_semiaxis=major_semiaxis,
+            flattening=flattening,
+        )
+
+    async def great_circle_separation(
+        self, from_aircraft_id, to_aircraft_id=None, radius=distance_measures._EARTH_RADIUS
+    ):
+        """Coroutine version of ``pydodo.great_circle_separation()``."""
+        return await self._separation(
+            from_aircraft_id,
+            to_aircraft_id,
+            distance_f=distance_measures.great_circle_distance,
+            radius=radius,
+        )
+
+    async def vertical_separation(self, from_aircraft_id, to_aircraft_id=None):
+        """Coroutine version of ``pydodo.vertical_separation()``."""
+        return await self._separation(
+            from_aircraft_id,
+            to_aircraft_id,
+            distance_f=distance_measures.vertical_distance,
+        )
+
+    async def euclidean_separation(
+        self,
+        from_aircraft_id,
+        to_aircraft_id=None,
+        major_semiaxis=distance_measures._EARTH_RADIUS,
+        flattening=distance_measures._FLATTENING,
+    ):
+        """Coroutine version of ``pydodo.euclidean_separation()``."""
+        return await self._separation(
+            from_aircraft_id,
+            to_aircraft_id,
+            distance_f=distance_measures.euclidean_distance,
+            major_semiaxis=major_semiaxis,
+            flattening=flattening,
+        )
+
+    async def proximity_pairs(
+        self,
+        lateral,
+        vertical=None,
+        aircraft_id=None,
+        major_semiaxis=distance_measures._EARTH_RADIUS,
+        flattening=distance_measures._FLATTENING,
+    ):
+        """Coroutine version of ``pydodo.proximity_pairs()``."""
+        if aircraft_id is None:
+            pos_df = await self.all_positions()
+        else:
+            utils._validate_id_list(aircraft_id)
+            if not isinstance(aircraft_id, list):
+                aircraft_id = [aircraft_id]
+            pos_df = await self.aircraft_position(aircraft_id)
+        return _proximity_from_pos(
+            distance_measures._altitude_to_metres(pos_df),
+            lateral,
+            vertical,
+            major_semiaxis,
+            flattening,
+        )
+
+    async def predict_conflicts(
+        self, lookahead_s, lateral_min=None, vertical_min=None, aircraft_id=None
+    ):
+        """Coroutine version of ``pydodo.predict_conflicts()``."""
+        if aircraft_id is None:
+            pos_df = await self.all_positions()
+        else:
+            utils._validate_id_list(aircraft_id)
+            if not isinstance(aircraft_id, list):
+                aircraft_id = [aircraft_id]
+            pos_df = await self.aircraft_position(aircraft_id)
+        return _conflicts_from_pos(
+            distance_measures._altitude_to_metres(pos_df),
+            lookahead_s,
+            lateral_min,
+            vertical_min,
+        )
+
+    geodesic_distance = _local(distance_measures.geodesic_distance)
+    great_circle_distance = _local(distance_measures.great_circle_distance)
+    vertical_distance = _local(distance_measures.vertical_distance)
+    euclidean_distance = _local(distance_measures.euclidean_distance)
+    separation_matrix = _local(separation_matrix)
+
+    # ---------------------------------------------------------------------- #
+    # BlueBird connection
+    # ---------------------------------------------------------------------- #
+    bluebird_config = _local(bluebird_config)
+    get_bluebird_url = _local(get_bluebird_url)
+
+
+def _bind_method(method):
+    """Run a coroutine method with the instance's client as the current client."""
+
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        return await self._bound(method)(self, *args, **kwargs)
+
+    return wrapper
+
+
+for _name, _member in list(vars(AsyncDodo).items()):
+    if inspect.iscoroutinefunction(_member) and not _name.startswith("__"):
+        setattr(AsyncDodo, _name, _bind_method(_member))
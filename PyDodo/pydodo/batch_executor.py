@@ -0,0 +1,226 @@
+import time
+import atexit
+import asyncio
+import threading
+
+from collections import namedtuple
+
+from .client import _CLIENTS
+from .config_param import config
+
+CommandResult = namedtuple("CommandResult", ["success", "latency", "result", "error"])
+CommandResult.__doc__ = """
+Outcome of a single command sent as part of a batch.
+
+Attributes
+----------
+success : bool
+    TRUE if the command completed without raising an exception.
+latency : double
+    Wall-clock time in seconds from sending the command to receiving the
+    response (time spent waiting for a concurrency slot is not included).
+result :
+    The value returned by the command (TRUE for aircraft control commands),
+    None if the command failed.
+error : Exception
+    The exception raised by the command, None if it succeeded.
+"""
+
+
+class BatchError(Exception):
+    """
+    Raised by ``batch()`` if any of the commands failed.
+
+    Attributes
+    ----------
+    results : [CommandResult]
+        The outcome of every command in the batch, in the order they were given.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        super().__init__(
+            ";".join([str(res.error) for res in results if not res.success])
+        )
+
+
+# long-lived event loop running on a daemon thread, shared by all batches so
+# that the aiohttp sessions (and their keep-alive connections) outlive a batch
+_LOOP = None
+_LOOP_THREAD = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_batch_loop():
+    """Return the background batch event loop, starting it if needed."""
+    global _LOOP, _LOOP_THREAD
+    with _LOOP_LOCK:
+        if _LOOP_THREAD is None or not _LOOP_THREAD.is_alive():
+            _LOOP = asyncio.new_event_loop()
+            _LOOP_THREAD = threading.Thread(
+                target=_LOOP.run_forever, name="pydodo-batch", daemon=True
+            )
+            _LOOP_THREAD.start()
+        return _LOOP
+
+
+async def _close_async_sessions():
+    """Close the aiohttp sessions of all clients on the running event loop."""
+    for client in list(_CLIENTS):
+        await client.close_async_sessions()
+
+
+@atexit.register
+def _stop_batch_loop():
+    """Close the background loop's sessions and stop the loop."""
+    global _LOOP, _LOOP_THREAD
+    with _LOOP_LOCK:
+        if _LOOP_THREAD is None or not _LOOP_THREAD.is_alive():
+            return
+        loop, thread = _LOOP, _LOOP_THREAD
+        _LOOP, _LOOP_THREAD = None, None
+    try:
+        asyncio.run_coroutine_threadsafe(_close_async_sessions(), loop).result(5)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        if not thread.is_alive():
+            loop.close()
+
+
+async def _timed_command(command, semaphore):
+    """Await a command once a concurrency slot is free and time it."""
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            result = await command
+        except Exception as e:
+            return CommandResult(False, time.perf_counter() - start, None, e)
+        return CommandResult(True, time.perf_counter() - start, result, None)
+
+
+async def async_batch(commands, max_concurrency=None):
+    """
+    Await a batch of asynchronous commands concurrently.
+
+    Parameters
+    ----------
+    commands : list
+        A list of asynchronous commands (e.g., ``async_change_speed(...)``).
+    max_concurrency : int, optional
+        Maximum number of commands in flight at the same time. The default is
+        set in the config file.
+
+    Returns
+    -------
+    [CommandResult]
+        The outcome of every command, in the order they were given.
+
+    Notes
+    -----
+    This is the awaitable variant of ``batch_results()`` for callers that are
+    already running an event loop.
+
+    Examples
+    --------
+    ::
+
+        results = await async_batch([
+            async_change_heading("BAW123", heading = 350),
+            async_change_altitude("BAW123", flight_level = 450),
+            ])
+    """
+    if not isinstance(commands, list):
+        commands = [commands]
+    if max_concurrency is None:
+        max_concurrency = config.batch_max_concurrency
+    assert max_concurrency >= 1, "Invalid value {} for max_concurrency".format(
+        max_concurrency
+    )
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    results = await asyncio.gather(
+        *[_timed_command(command, semaphore) for command in commands]
+    )
+    return list(results)
+
+
+def batch_results(commands, max_concurrency=None):
+    """
+    Send a batch of aircraft control commands and dispatch them asynchronously
+    to Bluebird, returning the outcome of each command.
+
+    Parameters
+    ----------
+    commands : list
+        A list of asynchronous commands (e.g., ``async_change_speed(...)``).
+    max_concurrency : int, optional
+        Maximum number of commands in flight at the same time. The default is
+        set in the config file.
+
+    Returns
+    -------
+    [CommandResult]
+        The outcome of every command, in the order they were given.
+
+    Notes
+    -----
+    The commands run on a long-lived event loop in a background thread, so this
+    function can also be called while another event loop is running (e.g., in
+    Jupyter).
+
+    Examples
+    --------
+    >>> results = batch_results([async_change_heading("BAW123", heading = 350)])
+    >>> [res.latency for res in results if res.success]
+    """
+    loop = _get_batch_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        raise RuntimeError("batch() cannot be called from a batch command, use async_batch()")
+
+    future = asyncio.run_coroutine_threadsafe(
+        async_batch(commands, max_concurrency), loop
+    )
+    return future.result()
+
+
+def batch(commands, max_concurrency=None):
+    """
+    Send a batch of aircraft control commands and dispatch them asynchronously
+    to Bluebird.
+
+    Parameters
+    ----------
+    commands : list
+        A list of aircraft control commands. In PyDodo, these need an ``async_``
+        prefix. For example, ``batch([async_change_speed(...), async_change_altitude(...)]``.
+    max_concurrency : int, optional
+        Maximum number of commands in flight at the same time. The default is
+        set in the config file.
+
+    Returns
+    -------
+    TRUE if all commands were executed. Otherwise a ``BatchError`` is thrown,
+    its ``results`` attribute holds the outcome of each command.
+
+    Examples
+    --------
+    ::
+
+        batch([
+            async_change_heading("BAW123", heading = 350),
+            async_change_altitude("BAW123", flight_level = 450),
+            async_change_heading("KLM456", heading = 10),
+            async_change_altitude("KLM456", flight_level = 250)
+            ])
+    """
+    results = batch_results(commands, max_concurrency)
+
+    if all(res.success for res in results):
+        return True
+    else:
+        raise BatchError(results)
@@ -0,0 +1,235 @@
+import os
+import numbers
+import itertools
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from . import utils
+from .config_param import config
+from .distance_measures import (
+    _EARTH_RADIUS,
+    _FLATTENING,
+    _SEPARATION_KERNELS,
+    _altitude_to_metres,
+    _position_arrays,
+    _validate_positions,
+    euclidean_distance,
+    geodesic_distance,
+    great_circle_distance,
+    vertical_distance,
+)
+
+_MEASURES = {
+    "geodesic": geodesic_distance,
+    "great_circle": great_circle_distance,
+    "vertical": vertical_distance,
+    "euclidean": euclidean_distance,
+}
+
+
+def separation_matrix(
+    pos_df,
+    from_aircraft_id=None,
+    to_aircraft_id=None,
+    measure="geodesic",
+    dtype="float64",
+    path=None,
+    tile_size=None,
+    processes=None,
+    major_semiaxis=_EARTH_RADIUS,
+    radius=_EARTH_RADIUS,
+    flattening=_FLATTENING,
+):
+    """
+    Get the separation in metres between all from_aircraft_id and
+    to_aircraft_id pairs of aircraft in a dataframe of positions, computed
+    tile by tile to bound the memory used.
+
+    Parameters
+    ----------
+    pos_df : pandas.DataFrame
+        Aircraft positions as returned by ``all_positions()`` (e.g., a snapshot
+        read back from a ``TrajectoryReader``), indexed by aircraft ID.
+    from_aircraft_id : [str], optional
+        A list of strings of aircraft IDs. If not provided, all aircraft in
+        pos_df.
+    to_aircraft_id : [str], optional
+        A list of strings of aircraft IDs. If not provided,
+        ``to_aircraft_id=from_aircraft_id``.
+    measure : str, optional
+        One of ``["geodesic", "great_circle", "vertical", "euclidean"]``.
+    dtype : str, optional
+        One of ``["float64", "float32"]``. The type of the separations.
+    path : str, optional
+        Path of a ``.npy`` file the matrix is written to. If provided, the
+        tiles are streamed to the memory-mapped file instead of memory.
+    tile_size : int, optional
+        A positive integer. Number of rows and columns of a tile. The default
+        is set in the config file.
+    processes : int, optional
+        A positive integer. Number of worker processes computing the tiles. If
+        1, the tiles are computed in this process. The default is set in the
+        config file, or the number of CPUs if not set.
+    major_semiaxis : double, optional
+        The major (equatorial) radius of the ellipsoid. The default value is for WGS84.
+    radius : double, optional
+        The radius of the earth in metres for the great circle distance. The
+        default value is for WGS84.
+    flattening : double, optional
+        Ellipsoid flattening. The default value is for WGS84.
+
+    Returns
+    -------
+    pandas.DataFrame, numpy.memmap
+        If path is not provided, a dataframe with from_aircraft_id as row names
+        and to_aircraft_id as column names, as returned by
+        ``geodesic_separation()`` etc. Otherwise the memory-mapped matrix, with
+        rows and columns in the order of from_aircraft_id and to_aircraft_id.
+
+    Notes
+    -----
+    The distances are computed with the same vectorised kernels as
+    ``geodesic_separation()`` etc., so the peak memory is the output matrix
+    plus the temporaries of ``processes`` tiles of ``tile_size`` squared
+    pairs. Pairs with an aircraft which is missing from pos_df (or has no
+    position) are missing values. With ``float32``, separations have a
+    relative precision of about 1e-7, i.e. better than a metre up to 10000 km.
+
+    Workers write their tiles straight to the memory-mapped file; without a
+    file, the tiles are sent back to this process and copied into the matrix
+    as they complete. At most two tiles per worker are in flight at a time.
+    The workers are started with the "spawn" method, so that they do not
+    inherit the threads and open connections of this process. Use
+    ``np.load(path, mmap_mode="r")`` to read a matrix written to disk.
+
+    Examples
+    --------
+    >>> pos_df = pydodo.all_positions()
+    >>> pydodo.separation_matrix(pos_df, measure = "euclidean", dtype = "float32")
+    >>> pydodo.separation_matrix(pos_df, path = "separation.npy", processes = 8)
+    """
+    assert measure in _MEASURES, "Invalid value {} for measure".format(measure)
+    assert dtype in ["float64", "float32"], "Invalid value {} for dtype".format(dtype)
+    if tile_size is None:
+        tile_size = config.separation_tile_size
+    if processes is None:
+        processes = config.separation_processes or os.cpu_count() or 1
+    assert (
+        isinstance(tile_size, numbers.Integral) and tile_size > 0
+    ), "Invalid value {} for tile_size".format(tile_size)
+    assert (
+        isinstance(processes, numbers.Integral) and processes > 0
+    ), "Invalid value {} for processes".format(processes)
+    tile_size, processes = int(tile_size), int(processes)
+    if path is not None:
+        assert path.endswith(".npy"), "Invalid value {} for path".format(path)
+
+    if from_aircraft_id is None:
+        from_aircraft_id = list(pos_df.index)
+    if to_aircraft_id is None:
+        to_aircraft_id = from_aircraft_id
+    utils._validate_id_list(from_aircraft_id)
+    utils._validate_id_list(to_aircraft_id)
+
+    pos_df = _altitude_to_metres(pos_df.copy())
+    from_pos = _position_arrays(pos_df, from_aircraft_id)
+    to_pos = _position_arrays(pos_df, to_aircraft_id)
+    kernel = _SEPARATION_KERNELS[_MEASURES[measure]]
+    _validate_positions(kernel, from_pos, to_pos)
+    kwargs = {
+        "major_semiaxis": major_semiaxis,
+        "radius": radius,
+        "flattening": flattening,
+    }
+
+    shape = (len(from_aircraft_id), len(to_aircraft_id))
+    if path is None:
+        out = np.empty(shape, dtype=dtype)
+    else:
+        out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    tiles = [
+        (rows, cols)
+        for rows in _tile_slices(shape[0], tile_size)
+        for cols in _tile_slices(shape[1], tile_size)
+    ]
+    if processes == 1 or len(tiles) == 1:
+        for rows, cols in tiles:
+            out[rows, cols] = _separation_tile(
+                kernel, from_pos, to_pos, rows, cols, dtype, kwargs
+            )
+    else:
+        if path is not None:
+            # the workers open the file themselves
+            out.flush()
+        tiles = iter(tiles)
+        pending = {}
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(processes, mp_context=mp_context) as pool:
+            while True:
+                # bound the memory of the arguments and results of the tiles
+                for rows, cols in itertools.islice(tiles, 2 * processes - len(pending)):
+                    future = pool.submit(
+                        _separation_tile,
+                        kernel,
+                        _slice_positions(from_pos, rows),
+                        _slice_positions(to_pos, cols),
+                        slice(None),
+                        slice(None),
+                        dtype,
+                        kwargs,
+                        path,
+                        (rows, cols),
+                    )
+                    pending[future] = (rows, cols)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rows, cols = pending.pop(future)
+                    tile = future.result()
+                    if path is None:
+                        out[rows, cols] = tile
+
+    if path is not None:
+        out.flush()
+        return out
+    return pd.DataFrame(out, index=from_aircraft_id, columns=to_aircraft_id, copy=False)
+
+
+def _tile_slices(n, tile_size):
+    """Slices splitting range(n) into tiles of at most tile_size."""
+    return [slice(start, min(start + tile_size, n)) for start in range(0, n, tile_size)]
+
+
+def _slice_positions(pos, index):
+    """Slice the arrays of positions returned by ``_position_arrays()``."""
+    return {
+        key: values.take(index) if key == "derived" else values[index]
+        for key, values in pos.items()
+    }
+
+
+def _separation_tile(
+    kernel, from_pos, to_pos, rows, cols, dtype, kwargs, path=None, out_index=None
+):
+    """
+    Compute a tile of a separation matrix: the separation between the rows of
+    from_pos and the cols of to_pos. If path is provided, write the tile to
+    the memory-mapped matrix at out_index instead of returning it.
+    """
+    from_pos = _slice_positions(from_pos, rows)
+    to_pos = _slice_positions(to_pos, cols)
+    valid = from_pos["valid"][:, np.newaxis] & to_pos["valid"][np.newaxis, :]
+    with np.errstate(invalid="ignore"):
+        distances = kernel(from_pos, to_pos, valid, **kwargs)
+    tile = np.where(valid, distances, np.nan).astype(dtype, copy=False)
+
+    if path is None:
+        return tile
+    out = np.load(path, mmap_mode="r+")
+    out[out_index] = tile
+    out.flush()
@@ -1,17 +1,15 @@
-import sys
 import requests
 
-from .config_param import config_param
+from contextlib import asynccontextmanager
 
-_BB_HOST = config_param("host")
-_BB_PORT = config_param("port")
-_BB_API_VERSION = config_param("api_version")
+from .client import get_client
+from .config_param import config
 
 
 def bluebird_config(
-    host=config_param("host"),
-    port=config_param("port"),
-    version=config_param("api_version")
+    host=config.host,
+    port=config.port,
+    version=config.api_version
     ):
     """
     Set BlueBird host, port and version parameters.
@@ -25,13 +23,14 @@ def bluebird_config(
         BlueBird port (e.g., 5001).
     version : str
         BlueBird version (e.g., 'v1' or 'v2')
+
+    Notes
+    -----
+    This configures the current Dodo client, i.e. the default client unless
+    called as a ``Dodo`` method or inside a ``with Dodo(...)`` block.
     """
 
-    this_module = sys.modules[__name__]
-    setattr(this_module, "_BB_HOST", host)
-    setattr(this_module, "_BB_PORT", port)
-    setattr(this_module, "_BB_API_VERSION", version)
-    return True
+    return get_client().configure(host, port, version)
 
 
 def get_bluebird_url():
@@ -51,12 +50,7 @@ def get_bluebird_url():
     --------
     >>> pydodo.utils.get_bluebird_url()
     """
-    return "http://{}:{}/{}/{}".format(
-        _BB_HOST,
-        _BB_PORT,
-        config_param('api_path'),
-        _BB_API_VERSION,
-    )
+    return get_client().url
 
 
 def construct_endpoint_url(endpoint):
@@ -77,10 +71,106 @@ def construct_endpoint_url(endpoint):
     --------
     >>> pydodo.utils.construct_endpoint_url(endpoint = "ic")
     """
-    return "{}/{}".format(
-        get_bluebird_url(),
-        endpoint
-    )
+    return get_client().construct_endpoint_url(endpoint)
+
+
+def get_session():
+    """
+    Get the pooled HTTP session of the current Dodo client.
+
+    Parameters
+    ----------
+    NONE
+
+    Returns
+    -------
+    requests.Session
+        A session that keeps connections to BlueBird alive between requests.
+        The session is created on first use.
+
+    Examples
+    --------
+    >>> pydodo.bluebird_connect.get_session().get(construct_endpoint_url("pos"))
+    """
+    return get_client().session
+
+
+def close_sessions():
+    """
+    Close the pooled HTTP session of the current Dodo client. A new session
+    is created on the next request.
+
+    Parameters
+    ----------
+    NONE
+
+    Returns
+    -------
+    TRUE if successful. Otherwise an exception is thrown.
+    """
+    return get_client().close()
+
+
+def get_async_session():
+    """
+    Get the shared aiohttp session of the current Dodo client for the
+    running event loop.
+
+    Parameters
+    ----------
+    NONE
+
+    Returns
+    -------
+    aiohttp.ClientSession
+        A session that keeps connections to BlueBird alive between requests.
+        The session is created on first use.
+
+    Notes
+    -----
+    Must be called from a coroutine. Sessions stay open until
+    ``close_async_sessions()`` is awaited on the same event loop, see also
+    ``async_session()``.
+    """
+    return get_client().get_async_session()
+
+
+async def close_async_sessions():
+    """
+    Close the aiohttp session of the current Dodo client opened on the
+    running event loop.
+
+    Parameters
+    ----------
+    NONE
+
+    Returns
+    -------
+    TRUE if successful. Otherwise an exception is thrown.
+    """
+    return await get_client().close_async_sessions()
+
+
+@asynccontextmanager
+async def async_session():
+    """
+    Asynchronous context manager sharing one aiohttp session between all
+    ``async_`` commands awaited inside it. The session is closed on exit.
+
+    Examples
+    --------
+    ::
+
+        async with pydodo.async_session():
+            await asyncio.gather(
+                pydodo.async_change_heading("BAW123", heading = 350),
+                pydodo.async_change_altitude("BAW123", flight_level = 450),
+                )
+    """
+    try:
+        yield get_async_session()
+    finally:
+        await close_async_sessions()
 
 
 def ping_bluebird():
@@ -100,7 +190,7 @@ def ping_bluebird():
     --------
     >>> pydodo.bluebird_connect.ping_bluebird()
     """
-    endpoint = config_param("endpoint_aircraft_position")
+    endpoint = config.endpoint_aircraft_position
 
     url = construct_endpoint_url(endpoint)
     print("ping bluebird on {}".format(url))
@@ -108,8 +198,8 @@ def ping_bluebird():
     # /pos endpoint only supports GET requests, this should return an error if BlueBird is running
     # on the specified host
     try:
-        resp = requests.post(url)
-    except requests.exceptions.ConnectionError as e:
+        resp = get_session().post(url)
+    except requests.exceptions.RequestException as e:
         print(e)
         return False
 
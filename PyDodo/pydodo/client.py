@@ -0,0 +1,388 @@
+import asyncio
+import weakref
+import functools
+import threading
+import contextvars
+import aiohttp
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from .config_param import config
+from .position_cache import PositionCache
+
+
+class _BlueBirdSession(requests.Session):
+    """A requests session with a default timeout for every request."""
+
+    def __init__(self, timeout=None):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def _create_session(
+    pool_connections=None, pool_maxsize=None, keep_alive=None, timeout=None
+):
+    """
+    Create a requests session with a connection pool.
+
+    Parameters
+    ----------
+    pool_connections : int, optional
+        Number of host connection pools to cache.
+    pool_maxsize : int, optional
+        Maximum number of connections kept open per host.
+    keep_alive : bool, optional
+        If False, connections are closed after each request.
+    timeout : double, optional
+        Default request timeout in seconds.
+
+    Returns
+    -------
+    requests.Session
+
+    Notes
+    -----
+    Parameters not provided are taken from the config file.
+    """
+    if pool_connections is None:
+        pool_connections = config.http_pool_connections
+    if pool_maxsize is None:
+        pool_maxsize = config.http_pool_maxsize
+    if keep_alive is None:
+        keep_alive = config.http_keep_alive
+    if timeout is None:
+        timeout = config.http_timeout
+
+    session = _BlueBirdSession(timeout=timeout)
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+def _create_async_session(
+    limit=None, limit_per_host=None, dns_cache_ttl=None, keep_alive=None, timeout=None
+):
+    """
+    Create an aiohttp session with a connection-limited connector.
+
+    Parameters
+    ----------
+    limit : int, optional
+        Maximum number of simultaneous connections.
+    limit_per_host : int, optional
+        Maximum number of simultaneous connections to the same host.
+    dns_cache_ttl : int, optional
+        Number of seconds to cache resolved host names for.
+    keep_alive : bool, optional
+        If False, connections are closed after each request.
+    timeout : double, optional
+        Total request timeout in seconds.
+
+    Returns
+    -------
+    aiohttp.ClientSession
+
+    Notes
+    -----
+    Parameters not provided are taken from the config file. Must be called
+    from a running event loop.
+    """
+    if limit is None:
+        limit = config.async_connector_limit
+    if limit_per_host is None:
+        limit_per_host = config.async_limit_per_host
+    if dns_cache_ttl is None:
+        dns_cache_ttl = config.async_dns_cache_ttl
+    if keep_alive is None:
+        keep_alive = config.http_keep_alive
+    if timeout is None:
+        timeout = config.http_timeout
+
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        use_dns_cache=True,
+        ttl_dns_cache=dns_cache_ttl,
+        force_close=not keep_alive,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        raise_for_status=True,
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    )
+
+
+def _bind(client, f):
+    """Wrap f so that it runs with client as the current Dodo client."""
+    if asyncio.iscoroutinefunction(f):
+
+        @functools.wraps(f)
+        async def bound(*args, **kwargs):
+            token = _CURRENT_CLIENT.set(client)
+            try:
+                return await f(*args, **kwargs)
+            finally:
+                _CURRENT_CLIENT.reset(token)
+
+    else:
+
+        @functools.wraps(f)
+        def bound(*args, **kwargs):
+            token = _CURRENT_CLIENT.set(client)
+            try:
+                return f(*args, **kwargs)
+            finally:
+                _CURRENT_CLIENT.reset(token)
+
+    return bound
+
+
+class Dodo:
+    """
+    A client for one BlueBird instance. Each client owns its BlueBird URL,
+    HTTP connection pools and caches, so one process can drive several
+    simulators at the same time.
+
+    Every function in ``pydodo.__all__`` is available as a method of the
+    client. The module-level functions use a default client configured from
+    the config file (see ``bluebird_config()``).
+
+    Parameters
+    ----------
+    host : str, optional
+        BlueBird host (e.g., 'localhost' or '0.0.0.0').
+    port : int, optional
+        BlueBird port (e.g., 5001).
+    version : str, optional
+        BlueBird version (e.g., 'v1' or 'v2')
+    **kwargs:
+        pool_connections : int, optional
+            Number of host connection pools to cache.
+        pool_maxsize : int, optional
+            Maximum number of connections kept open per host.
+        keep_alive : bool, optional
+            If False, connections are closed after each request.
+        timeout : double, optional
+            Default request timeout in seconds.
+        limit : int, optional
+            Maximum number of simultaneous async connections.
+        limit_per_host : int, optional
+            Maximum number of simultaneous async connections to the same host.
+        dns_cache_ttl : int, optional
+            Number of seconds to cache resolved host names for.
+        position_cache : bool, optional
+            If True, aircraft positions are cached (see ``set_position_cache()``).
+        position_cache_max_age : double, optional
+            Maximum age of cached positions in seconds.
+
+    Notes
+    -----
+    Default values are taken from the config file.
+
+    Used as a context manager, the client becomes the current client for the
+    module-level functions called inside the ``with`` block (in the current
+    thread or task only).
+
+    Examples
+    --------
+    >>> sim1 = pydodo.Dodo(port = 5001)
+    >>> sim2 = pydodo.Dodo(port = 5002)
+    >>> sim1.all_positions()
+    >>> sim2.change_heading("BAW123", heading = 90)
+    >>> with sim2:
+    >>>     pydodo.simulation_step()
+    """
+
+    def __init__(self, host=None, port=None, version=None, **kwargs):
+        self._lock = threading.Lock()
+        session_keys = ["pool_connections", "pool_maxsize", "keep_alive", "timeout"]
+        async_keys = ["limit", "limit_per_host", "dns_cache_ttl", "keep_alive", "timeout"]
+        cache_keys = ["position_cache", "position_cache_max_age"]
+        invalid = set(kwargs) - set(session_keys) - set(async_keys) - set(cache_keys)
+        assert not invalid, "Invalid arguments {}".format(sorted(invalid))
+        self._session_kwargs = {k: v for k, v in kwargs.items() if k in session_keys}
+        self._async_session_kwargs = {
+            k: v for k, v in kwargs.items() if k in async_keys
+        }
+        self._session = None
+        # aiohttp sessions are bound to the event loop they are created in
+        self._async_sessions = weakref.WeakKeyDictionary()
+        self._tokens = []
+        self._position_cache = None
+        self._sector = None
+        # shared by the wait_until() calls while positions are not cached
+        self._wait_cache = PositionCache(config.wait_min_interval)
+        self.configure(host, port, version)
+        self.set_position_cache(
+            kwargs.get("position_cache", config.position_cache),
+            kwargs.get("position_cache_max_age"),
+        )
+        _CLIENTS.add(self)
+
+    def configure(self, host=None, port=None, version=None):
+        """
+        Set BlueBird host, port and version parameters. Default values are
+        taken from the config file.
+
+        Returns
+        -------
+        TRUE if successful. Otherwise an exception is thrown.
+        """
+        host = config.host if host is None else host
+        port = config.port if port is None else port
+        version = config.api_version if version is None else version
+        with self._lock:
+            self.host, self.port, self.version = host, port, version
+            self._url = "http://{}:{}/{}/{}".format(host, port, config.api_path, version)
+            # what the position requests have learnt about this BlueBird instance
+            self._multi_callsign_supported = None
+            self._n_aircraft = None
+        return True
+
+    @property
+    def url(self):
+        """The URL of the BlueBird API."""
+        return self._url
+
+    def construct_endpoint_url(self, endpoint):
+        """Construct a BlueBird endpoint URL."""
+        return "{}/{}".format(self._url, endpoint)
+
+    @property
+    def position_cache(self):
+        """The client's ``PositionCache``, None if positions are not cached."""
+        return self._position_cache
+
+    @property
+    def sector(self):
+        """The ``Sector`` last uploaded with ``upload_sector()``, None if none."""
+        return self._sector
+
+    def set_position_cache(self, enabled=True, max_age=None):
+        """
+        Enable or disable caching of aircraft positions.
+
+        Parameters
+        ----------
+        enabled : bool, optional
+            If True, ``all_positions()`` and ``aircraft_position()`` are served
+            from a snapshot of all aircraft positions until a command is sent to
+            BlueBird or the snapshot is older than max_age.
+        max_age : double, optional
+            Maximum age of the snapshot in seconds. The default is set in the
+            config file.
+
+        Returns
+        -------
+        TRUE if successful. Otherwise an exception is thrown.
+        """
+        cache = PositionCache(max_age) if enabled else None
+        with self._lock:
+            self._position_cache = cache
+        return True
+
+    @property
+    def session(self):
+        """The pooled HTTP session, created on first use."""
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = _create_session(**self._session_kwargs)
+                session = self._session
+        return session
+
+    def get_async_session(self):
+        """
+        Get the aiohttp session for the running event loop, created on first
+        use. Must be called from a coroutine.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            session = self._async_sessions.get(loop)
+            if session is None or session.closed:
+                session = _create_async_session(**self._async_session_kwargs)
+                self._async_sessions[loop] = session
+        return session
+
+    async def close_async_sessions(self):
+        """Close the aiohttp session of the running event loop."""
+        with self._lock:
+            session = self._async_sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+        return True
+
+    def close(self):
+        """
+        Close the pooled HTTP session. A new session is created on the next
+        request.
+        """
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+        return True
+
+    def __enter__(self):
+        self._tokens.append(_CURRENT_CLIENT.set(self))
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _CURRENT_CLIENT.reset(self._tokens.pop())
+
+    @property
+    def aio(self):
+        """An ``AsyncDodo`` client talking to the same BlueBird instance."""
+        from .async_client import AsyncDodo
+
+        return AsyncDodo(client=self)
+
+    def _api(self):
+        import pydodo
+
+        return pydodo
+
+    def __getattr__(self, name):
+        # only called for names that are not client attributes: the PyDodo API
+        pydodo = self._api()
+        if name.startswith("_") or name not in pydodo.__all__:
+            raise AttributeError(
+                "'{}' object has no attribute '{}'".format(type(self).__name__, name)
+            )
+        bound = _bind(self, getattr(pydodo, name))
+        self.__dict__[name] = bound
+        return bound
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._api().__all__))
+
+    def __repr__(self):
+        return "Dodo({!r})".format(self._url)
+
+
+_CURRENT_CLIENT = contextvars.ContextVar("pydodo_client", default=None)
+# all live clients, so their sessions can be closed on exit
+_CLIENTS = weakref.WeakSet()
+_DEFAULT_CLIENT = Dodo()
+
+
+def get_client():
+    """
+    Get the current Dodo client: the client of the enclosing ``with`` block or
+    client method call, otherwise the default client.
+
+    Returns
+    -------
+    Dodo
+    """
+    client = _CURRENT_CLIENT.get()
+    return _DEFAULT_CLIENT if client is None else client
@@ -1,4 +1,8 @@
+import os
+import threading
 from os.path import abspath, dirname, join, exists
+from types import MappingProxyType
+
 import yaml
 
 
@@ -25,7 +29,229 @@ def find_config(config_filename):
     return cfg_file
 
 
-def config_param(param, config="default", cfg_file=find_config("config.yml")):
+# Defaults of the PyDodo client parameters, which are not part of the shared
+# config file (so that config files without them, e.g. the one installed by
+# setup.py, keep working). Any of them set in the config file overrides the
+# default here.
+_DEFAULTS = {
+    # aircraft_position() requests only the listed callsigns (comma separated)
+    # if BlueBird supports it and there are at most position_filter_max_ids of
+    # them, making up at most position_filter_max_fraction of the aircraft in
+    # the simulation; otherwise all positions are requested
+    "position_filter_max_ids": 100,
+    "position_filter_max_fraction": 0.25,
+    # HTTP connection pool (one pool per BlueBird URL)
+    "http_pool_connections": 4,
+    "http_pool_maxsize": 32,
+    "http_keep_alive": True,
+    "http_timeout": 30,
+    # aiohttp connector used by the async_ commands (one per event loop and
+    # BlueBird URL)
+    "async_connector_limit": 100,
+    "async_limit_per_host": 32,
+    "async_dns_cache_ttl": 300,
+    "batch_max_concurrency": 64,
+    "metrics_max_concurrency": 16,
+    # opt-in cache of aircraft positions (invalidated by any command sent to
+    # BlueBird)
+    "position_cache": False,
+    "position_cache_max_age": 1,
+    # wait_until() polling interval in seconds: adapted to the observed
+    # simulation rate so that the simulation advances about
+    # wait_sim_resolution seconds between polls, and doubled while the
+    # simulation time does not advance
+    "wait_min_interval": 0.05,
+    "wait_max_interval": 1,
+    "wait_sim_resolution": 1,
+    # TrajectoryStore rows per chunk and memory cap in MB (oldest snapshots
+    # evicted)
+    "trajectory_store_chunk_size": 65536,
+    "trajectory_store_max_mb": 256,
+    # TrajectoryRecorder file format ("arrow" can be memory-mapped without
+    # copying, "parquet" is compressed), rows per record batch / row group and
+    # rows per part file
+    "trajectory_file_format": "arrow",
+    "trajectory_file_batch_rows": 65536,
+    "trajectory_file_part_rows": 8388608,
+    # local loss of separation score thresholds (lateral in nautical miles,
+    # vertical in feet): -1 below the lower, 0 above the upper threshold
+    "los_lateral_lower_threshold": 5,
+    "los_lateral_upper_threshold": 10,
+    "los_vertical_lower_threshold": 1000,
+    "los_vertical_upper_threshold": 2000,
+    # ProximityTracker safety skins in metres: candidate pairs are kept until
+    # the aircraft have moved far enough to close the skin
+    "proximity_lateral_skin": 5000,
+    "proximity_vertical_skin": 300,
+    # separation_matrix() tiles: rows/columns per tile and number of worker
+    # processes (None for the number of CPUs)
+    "separation_tile_size": 1024,
+    "separation_processes": None,
+    # FuelEfficiencyAccumulator: scenario seconds between reconciliations with
+    # the BlueBird metric (None to never reconcile), fuel burnt per second in
+    # level flight, additional fuel per second per 1000 ft/min of climb and
+    # fraction of the level flight burn saved per 1000 ft of altitude
+    "fuel_reconcile_interval": 300,
+    "fuel_burn_rate": 1,
+    "fuel_climb_burn_rate": 0.5,
+    "fuel_altitude_burn_rate": 0.015,
+}
+
+
+class Config:
+    """
+    Read-only, attribute-addressable view of one section of the config file.
+
+    The file is parsed once on construction and again only when ``reload()``
+    is called or, if ``hot_reload`` is set, when the file modification time
+    changes. Parameters missing from the file take their default value (see
+    ``_DEFAULTS``).
+
+    Parameters
+    ----------
+    cfg_file : str
+        The configuration file to read from.
+    section : str, optional
+        The key indicating which configuration parameters to retrieve (e.g., "default").
+    hot_reload : bool, optional
+        If True, check the file modification time on every parameter lookup
+        and re-parse the file when it has changed. Default is False.
+
+    Examples
+    --------
+    >>> pydodo.config.endpoint_aircraft_position
+    'pos'
+    >>> pydodo.config["endpoint_aircraft_position"]
+    'pos'
+    """
+
+    __slots__ = ("_cfg_file", "_section", "_hot_reload", "_mtime", "_params", "_lock")
+
+    def __init__(self, cfg_file, section="default", hot_reload=False):
+        object.__setattr__(self, "_cfg_file", cfg_file)
+        object.__setattr__(self, "_section", section)
+        object.__setattr__(self, "_hot_reload", hot_reload)
+        object.__setattr__(self, "_lock", threading.Lock())
+        self.reload()
+
+    def reload(self):
+        """
+        Re-read the config file.
+
+        Returns
+        -------
+        TRUE if successful. Otherwise an exception is thrown.
+        """
+        with self._lock:
+            mtime = os.stat(self._cfg_file).st_mtime
+            with open(self._cfg_file) as ymlfile:
+                cfg = yaml.safe_load(ymlfile)
+            assert self._section in cfg, "Config section {} not found".format(
+                self._section
+            )
+            params = dict(_DEFAULTS, **cfg[self._section])
+            object.__setattr__(self, "_params", MappingProxyType(params))
+            object.__setattr__(self, "_mtime", mtime)
+        return True
+
+    def set_hot_reload(self, hot_reload):
+        """
+        Enable or disable reloading the config file when it changes on disk.
+
+        Parameters
+        ----------
+        hot_reload : bool
+            If True, the file modification time is checked on every lookup.
+        """
+        object.__setattr__(self, "_hot_reload", bool(hot_reload))
+
+    def _maybe_reload(self):
+        """Re-read the config file if hot reload is on and the file changed."""
+        if self._hot_reload and os.stat(self._cfg_file).st_mtime != self._mtime:
+            self.reload()
+
+    @property
+    def cfg_file(self):
+        """The path of the config file backing this object."""
+        return self._cfg_file
+
+    @property
+    def section(self):
+        """The config file section backing this object."""
+        return self._section
+
+    def as_dict(self):
+        """Return a copy of the config parameters as a dictionary."""
+        self._maybe_reload()
+        return dict(self._params)
+
+    def __getattr__(self, param):
+        # only called when normal attribute lookup fails, i.e. for config params
+        if param.startswith("__"):
+            raise AttributeError(param)
+        self._maybe_reload()
+        try:
+            return self._params[param]
+        except KeyError:
+            raise AttributeError("Config parameter {} not found".format(param)) from None
+
+    def __getitem__(self, param):
+        self._maybe_reload()
+        return self._params[param]
+
+    def __contains__(self, param):
+        self._maybe_reload()
+        return param in self._params
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Config is read-only, edit the config file and call reload()")
+
+    def __delattr__(self, name):
+        raise AttributeError("Config is read-only, edit the config file and call reload()")
+
+    def __repr__(self):
+        return "Config({!r}, section={!r})".format(self._cfg_file, self._section)
+
+
+_DEFAULT_CFG_FILE = find_config("config.yml")
+
+# Config objects for any (file, section) pairs requested through config_param()
+_CONFIGS = {}
+_CONFIGS_LOCK = threading.Lock()
+
+
+def get_config(section="default", cfg_file=_DEFAULT_CFG_FILE):
+    """
+    Get the (cached) config object for a config file section.
+
+    Parameters
+    ----------
+    section : str, optional
+        The key indicating which configuration parameters to retrieve (e.g., "default").
+    cfg_file : str, optional
+        The configuration file to read from.
+
+    Returns
+    -------
+    Config
+        The parsed configuration, shared by all callers asking for the same
+        file and section.
+    """
+    key = (abspath(cfg_file), section)
+    cfg = _CONFIGS.get(key)
+    if cfg is None:
+        with _CONFIGS_LOCK:
+            cfg = _CONFIGS.get(key)
+            if cfg is None:
+                cfg = Config(cfg_file, section)
+                _CONFIGS[key] = cfg
+    return cfg
+
+
+config = get_config()
+
+
+def config_param(param, config="default", cfg_file=_DEFAULT_CFG_FILE):
     """
     Get a configuration parameter.
 
@@ -42,10 +268,14 @@ def config_param(param, config="default", cfg_file=find_config("config.yml")):
     -------
     The value of the requested configuration parameter. An error is thrown if
     the given parameter name is not found in the config file.
+
+    Notes
+    -----
+    The config file is only parsed the first time it is requested, see
+    ``Config.reload()`` to pick up changes to the file.
     """
-    with open(cfg_file) as ymlfile:
-        cfg = yaml.safe_load(ymlfile)
+    cfg = get_config(config, cfg_file)
 
-    assert param in cfg[config], "Config parameter {} not found".format(param)
+    assert param in cfg, "Config parameter {} not found".format(param)
 
-    return cfg[config][param]
+    return cfg[param]
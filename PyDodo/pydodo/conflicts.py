@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+from . import utils
+from .config_param import config
+from .derived_positions import _derived_positions, _filter_positions
+from .distance_measures import _EARTH_RADIUS, _FLATTENING, _altitude_to_metres
+from .local_metrics import _FOOT, _NAUTICAL_MILE
+from .proximity import _proximity_from_pos
+from .request_position import aircraft_position, all_positions
+
+_KNOT = _NAUTICAL_MILE / 3600  # metres per second
+_FEET_PER_MINUTE = _FOOT / 60  # metres per second
+
+_CONFLICT_COLUMNS = [
+    "from_aircraft_id",
+    "to_aircraft_id",
+    "time_to_conflict",
+    "time_to_cpa",
+    "lateral_cpa",
+    "vertical_cpa",
+]
+
+
+def predict_conflicts(lookahead_s, lateral_min=None, vertical_min=None, aircraft_id=None):
+    """
+    Predict the pairs of aircraft which will lose separation within a time
+    horizon, assuming they keep their current velocity.
+
+    Parameters
+    ----------
+    lookahead_s : double
+        A non-negative double. Time horizon in seconds.
+    lateral_min : double, optional
+        A non-negative double. Minimum lateral separation in metres. The default
+        is the lower lateral loss of separation threshold in the config file.
+    vertical_min : double, optional
+        A non-negative double. Minimum vertical separation in metres. The
+        default is the lower vertical loss of separation threshold in the config
+        file.
+    aircraft_id : str, [str], optional
+        A string or list of strings of aircraft IDs to consider. If not
+        provided, all aircraft in the simulation are considered.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with one row per pair of aircraft in conflict (each pair
+        appears once), ordered by ``time_to_conflict``, with columns:
+    | - ``from_aircraft_id``: A string aircraft identifier.
+    | - ``to_aircraft_id``: A string aircraft identifier.
+    | - ``time_to_conflict``: Time in seconds until both the lateral and vertical separation are below their minimum (0 if they already are).
+    | - ``time_to_cpa``: Time in seconds until the lateral closest point of approach within the horizon.
+    | - ``lateral_cpa``: The lateral separation at the closest point of approach in metres.
+    | - ``vertical_cpa``: The vertical separation at the closest point of approach in metres.
+
+    Notes
+    -----
+    Each pair is projected linearly in the local tangent (east, north, up)
+    plane of its ``from`` aircraft, with velocities from the ``heading``,
+    ``ground_speed`` (knots) and ``vertical_speed`` (feet/min) columns of the
+    aircraft positions. A pair is in conflict if, at some time within the
+    horizon, it is within both minima at once.
+
+    Candidate pairs are those which could come within the minima given the
+    fastest aircraft, found with ``proximity_pairs()``; the closest point of
+    approach is computed for all of them at once. Aircraft without a position,
+    heading or ground speed are ignored and a missing vertical speed is taken
+    to be 0. An exception is thrown if BlueBird does not return headings.
+
+    Examples
+    --------
+    >>> pydodo.predict_conflicts(lookahead_s = 300)
+    >>> pydodo.predict_conflicts(120, lateral_min = 9260, vertical_min = 304.8)
+    """
+    if aircraft_id is None:
+        pos_df = all_positions()
+    else:
+        utils._validate_id_list(aircraft_id)
+        if not isinstance(aircraft_id, list):
+            aircraft_id = [aircraft_id]
+        pos_df = aircraft_position(aircraft_id)
+
+    return _conflicts_from_pos(
+        _altitude_to_metres(pos_df), lookahead_s, lateral_min, vertical_min
+    )
+
+
+def _velocities(pos_df):
+    """East, north and up velocities of the aircraft in metres per second."""
+    heading = np.radians(pos_df[config.heading].to_numpy(dtype=float))
+    ground_speed = pos_df[config.ground_speed].to_numpy(dtype=float) * _KNOT
+    vertical_speed = np.nan_to_num(
+        pos_df[config.vertical_speed].to_numpy(dtype=float) * _FEET_PER_MINUTE
+    )
+    return ground_speed * np.sin(heading), ground_speed * np.cos(heading), vertical_speed
+
+
+def _local_offsets(sin_lat, cos_lat, sin_lon, cos_lon, from_xyz, to_xyz):
+    """
+    East and north components of the ECEF offsets between pairs of points, in
+    the tangent planes at the ``from`` points (given by the sines and cosines
+    of their latitude and longitude).
+    """
+    d = to_xyz - from_xyz
+    east = -sin_lon * d[0] + cos_lon * d[1]
+    north = -sin_lat * cos_lon * d[0] - sin_lat * sin_lon * d[1] + cos_lat * d[2]
+    return east, north
+
+
+def _within_interval(offset, rate, limit, lookahead_s):
+    """
+    Times (clipped to ``[0, lookahead_s]``) between which |offset + rate * t|
+    is below limit, for arrays of 1D offsets and rates. Empty intervals have
+    start > end.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (-limit - offset) / rate
+        t2 = (limit - offset) / rate
+    start, end = np.minimum(t1, t2), np.maximum(t1, t2)
+    # pairs without relative motion are within the limit at all or no times
+    static = rate == 0
+    within = np.abs(offset) < limit
+    start = np.where(static, np.where(within, 0, np.inf), start)
+    end = np.where(static, np.where(within, lookahead_s, -np.inf), end)
+    return np.maximum(start, 0), np.minimum(end, lookahead_s)
+
+
+def _lateral_within_interval(dx, dy, dvx, dvy, limit, lookahead_s):
+    """
+    Times (clipped to ``[0, lookahead_s]``) between which the lateral offset
+    (dx, dy) + (dvx, dvy) * t is shorter than limit. Empty intervals have
+    start > end.
+    """
+    a = dvx ** 2 + dvy ** 2
+    b = 2 * (dx * dvx + dy * dvy)
+    c = dx ** 2 + dy ** 2 - limit ** 2
+    disc = b ** 2 - 4 * a * c
+    with np.errstate(divide="ignore", invalid="ignore"):
+        root = np.sqrt(disc)
+        start = (-b - root) / (2 * a)
+        end = (-b + root) / (2 * a)
+    crossing = (a > 0) & (disc > 0)
+    start = np.where(crossing, start, np.where((a == 0) & (c < 0), 0, np.inf))
+    end = np.where(crossing, end, np.where((a == 0) & (c < 0), lookahead_s, -np.inf))
+    return np.maximum(start, 0), np.minimum(end, lookahead_s)
+
+
+def _conflicts_from_pos(pos_df, lookahead_s, lateral_min, vertical_min):
+    """
+    Predict the pairs of aircraft in conflict from a dataframe of positions
+    (with altitude in metres). See ``predict_conflicts()``.
+    """
+    if lateral_min is None:
+        lateral_min = config.los_lateral_lower_threshold * _NAUTICAL_MILE
+    if vertical_min is None:
+        vertical_min = config.los_vertical_lower_threshold * _FOOT
+    utils._validate_is_positive(lookahead_s, "lookahead_s")
+    utils._validate_is_positive(lateral_min, "lateral_min")
+    utils._validate_is_positive(vertical_min, "vertical_min")
+
+    if pos_df.empty:
+        return pd.DataFrame({col: [] for col in _CONFLICT_COLUMNS})
+    assert config.heading in pos_df, "BlueBird did not return the aircraft headings"
+    pos_df = _filter_positions(
+        pos_df, pos_df[[config.heading, config.ground_speed]].notna().all(axis=1)
+    )
+    if not len(pos_df):
+        return pd.DataFrame({col: [] for col in _CONFLICT_COLUMNS})
+    vx, vy, vz = _velocities(pos_df)
+
+    # pairs which can come within the minima: at most the two fastest
+    # aircraft closing head on
+    max_closing = 2 * np.hypot(vx, vy).max() * lookahead_s
+    max_climbing = 2 * np.abs(vz).max() * lookahead_s
+    candidates = _proximity_from_pos(
+        pos_df,
+        lateral_min + max_closing,
+        vertical_min + max_climbing,
+        _EARTH_RADIUS,
+        _FLATTENING,
+    )
+
+    i = pos_df.index.get_indexer(candidates["from_aircraft_id"])
+    j = pos_df.index.get_indexer(candidates["to_aircraft_id"])
+    alt = pos_df[config.current_flight_level].to_numpy(dtype=float)
+    derived = _derived_positions(pos_df)
+    xyz = np.array(derived.ecef(alt, _EARTH_RADIUS, _FLATTENING))
+
+    dx, dy = _local_offsets(
+        derived.sin_lat[i],
+        derived.cos_lat[i],
+        derived.sin_lon[i],
+        derived.cos_lon[i],
+        xyz[:, i],
+        xyz[:, j],
+    )
+    dz = alt[j] - alt[i]
+    dvx, dvy, dvz = vx[j] - vx[i], vy[j] - vy[i], vz[j] - vz[i]
+
+    lateral_start, lateral_end = _lateral_within_interval(
+        dx, dy, dvx, dvy, lateral_min, lookahead_s
+    )
+    vertical_start, vertical_end = _within_interval(dz, dvz, vertical_min, lookahead_s)
+    start = np.maximum(lateral_start, vertical_start)
+    conflict = start <= np.minimum(lateral_end, vertical_end)
+
+    speed_sq = dvx ** 2 + dvy ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        time_to_cpa = np.where(speed_sq > 0, -(dx * dvx + dy * dvy) / speed_sq, 0)
+    time_to_cpa = np.clip(time_to_cpa, 0, lookahead_s)
+
+    conflicts = pd.DataFrame(
+        {
+            "from_aircraft_id": candidates["from_aircraft_id"].to_numpy(),
+            "to_aircraft_id": candidates["to_aircraft_id"].to_numpy(),
+            "time_to_conflict": start,
+            "time_to_cpa": time_to_cpa,
+            "lateral_cpa": np.hypot(dx + dvx * time_to_cpa, dy + dvy * time_to_cpa),
+            "vertical_cpa": np.abs(dz + dvz * time_to_cpa),
+        },
+        columns=_CONFLICT_COLUMNS,
+    )[conflict]
+    return conflicts.sort_values("time_to_conflict", kind="stable").reset_index(
+        drop=True
+    )
@@ -1,6 +1,6 @@
 from . import utils
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
 
 
 def create_aircraft(
@@ -58,7 +58,18 @@ def create_aircraft(
     --------
     >>> pydodo.create_aircraft("BAW123", "B744", 0, 0, 0, flight_level = 250, speed = 200)
     """
+    body = _create_aircraft_body(
+        aircraft_id, type, latitude, longitude, heading, speed, altitude, flight_level
+    )
+    return post_request(config.endpoint_create_aircraft, body)
 
+
+def _create_aircraft_body(
+    aircraft_id, type, latitude, longitude, heading, speed, altitude, flight_level
+):
+    """
+    Validate the ``create_aircraft()`` inputs and return the request body.
+    """
     utils._validate_id(aircraft_id)
     utils._validate_string(type, "aircraft type")
     utils._validate_latitude(latitude)
@@ -72,7 +83,7 @@ def create_aircraft(
     alt = utils._parse_alt(altitude, flight_level)
 
     body = {
-        config_param("query_aircraft_id"): aircraft_id,
+        config.query_aircraft_id: aircraft_id,
         "type": type,
         "lat": latitude,
         "lon": longitude,
@@ -80,5 +91,4 @@ def create_aircraft(
         "alt": alt,
         "gspd": speed,
     }
-
-    return post_request(config_param("endpoint_create_aircraft"), body)
+    return body
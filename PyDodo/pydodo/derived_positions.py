@@ -0,0 +1,242 @@
+import numpy as np
+import pandas as pd
+
+from .config_param import config
+
+
+def _ecef_from_trig(sin_lat, cos_lat, sin_lon, cos_lon, alt, radius, f):
+    """
+    ECEF coordinates from the sines and cosines of latitudes and longitudes
+    and altitudes in metres. See ``distance_measures._lla_to_ECEF()``.
+    """
+    e2 = 1 - (1 - f) * (1 - f)
+    N = radius / np.sqrt(1 - e2 * np.power(sin_lat, 2))
+
+    x = (N + alt) * cos_lat * cos_lon
+    y = (N + alt) * cos_lat * sin_lon
+    z = ((1 - e2) * N + alt) * sin_lat
+
+    return (x, y, z)
+
+
+# how each derived value is computed from the coordinates (and other values)
+_DERIVED = {
+    "lat_rad": lambda d: np.deg2rad(d.lat),
+    "lon_rad": lambda d: np.deg2rad(d.lon),
+    "sin_lat": lambda d: np.sin(d.lat_rad),
+    "cos_lat": lambda d: np.cos(d.lat_rad),
+    "sin_lon": lambda d: np.sin(d.lon_rad),
+    "cos_lon": lambda d: np.cos(d.lon_rad),
+    # reduced latitude on an ellipsoid of flattening f
+    "reduced_lat": lambda d, f: np.arctan((1 - f) * np.tan(d.lat_rad)),
+    "sin_reduced_lat": lambda d, f: np.sin(d.reduced_latitude(f)),
+    "cos_reduced_lat": lambda d, f: np.cos(d.reduced_latitude(f)),
+}
+
+
+def _take(values, index, missing):
+    """Index an array of derived values, with NaN where index is -1."""
+    values = values[index]
+    if missing is not None:
+        values = values.astype(float)
+        values[missing] = np.nan
+    return values
+
+
+class _DerivedPositions:
+    """
+    Coordinates derived from the latitudes and longitudes (in degrees) of the
+    aircraft in a position snapshot: radians, sines and cosines, reduced
+    latitudes and ECEF coordinates.
+
+    Each value is computed for all aircraft on first use and kept, so that the
+    distance measures and proximity queries on a snapshot share them. A view
+    (see ``take()``) indexes the values of the snapshot it was taken from, so
+    selecting aircraft from a snapshot does not repeat the conversions.
+
+    Parameters
+    ----------
+    lat : numpy.ndarray
+        Latitudes in degrees.
+    lon : numpy.ndarray
+        Longitudes in degrees.
+    """
+
+    def __init__(self, lat, lon, parent=None, index=None, missing=None):
+        # the coordinates may be views of dataframe columns changed later
+        self.lat = np.array(lat, dtype=float)
+        self.lon = np.array(lon, dtype=float)
+        self._parent = parent
+        self._index = index
+        self._missing = missing
+        self._values = {}
+        self._ecef = {}
+
+    def __len__(self):
+        return len(self.lat)
+
+    def __getstate__(self):
+        # views are sent (e.g., to worker processes) with the values computed
+        # so far rather than the whole snapshot
+        if self._parent is not None:
+            for key in self._parent._values:
+                self.get(*key)
+        state = dict(self.__dict__)
+        state["_parent"] = state["_index"] = state["_missing"] = None
+        return state
+
+    def get(self, name, *args):
+        """Get a derived value (see ``_DERIVED``), computing it if needed."""
+        key = (name,) + args
+        value = self._values.get(key)
+        if value is None:
+            if self._parent is not None:
+                value = _take(self._parent.get(*key), self._index, self._missing)
+            else:
+                value = _DERIVED[name](self, *args)
+            self._values[key] = value
+        return value
+
+    @property
+    def lat_rad(self):
+        return self.get("lat_rad")
+
+    @property
+    def lon_rad(self):
+        return self.get("lon_rad")
+
+    @property
+    def sin_lat(self):
+        return self.get("sin_lat")
+
+    @property
+    def cos_lat(self):
+        return self.get("cos_lat")
+
+    @property
+    def sin_lon(self):
+        return self.get("sin_lon")
+
+    @property
+    def cos_lon(self):
+        return self.get("cos_lon")
+
+    def reduced_latitude(self, flattening):
+        """The reduced latitudes in radians on an ellipsoid."""
+        return self.get("reduced_lat", flattening)
+
+    def reduced_coordinates(self, flattening, index=slice(None)):
+        """
+        The longitudes in radians and the sines and cosines of the reduced
+        latitudes on an ellipsoid, as used by the geodesic distance (see
+        ``geodesic._vincenty_reduced()``), indexed by index.
+        """
+        return (
+            self.lon_rad[index],
+            self.get("sin_reduced_lat", flattening)[index],
+            self.get("cos_reduced_lat", flattening)[index],
+        )
+
+    def ecef(self, alt, major_semiaxis, flattening):
+        """
+        The (x, y, z) ECEF coordinates of the aircraft at altitudes alt (in
+        metres). They are kept for the last altitudes given per ellipsoid.
+        """
+        alt = np.asarray(alt, dtype=float)
+        key = (major_semiaxis, flattening)
+        cached = self._ecef.get(key)
+        if cached is not None and np.array_equal(cached[0], alt, equal_nan=True):
+            return cached[1]
+        xyz = _ecef_from_trig(
+            self.sin_lat,
+            self.cos_lat,
+            self.sin_lon,
+            self.cos_lon,
+            alt,
+            major_semiaxis,
+            flattening,
+        )
+        self._ecef[key] = (alt.copy(), xyz)
+        return xyz
+
+    def matches(self, lat, lon):
+        """Check if the values were derived from these coordinates."""
+        return np.array_equal(self.lat, lat, equal_nan=True) and np.array_equal(
+            self.lon, lon, equal_nan=True
+        )
+
+    def take(self, index):
+        """
+        A view of the values of some of the aircraft.
+
+        Parameters
+        ----------
+        index : slice, numpy.ndarray
+            A slice or an array of positions, -1 for missing aircraft (whose
+            values are NaN).
+        """
+        missing = None
+        if isinstance(index, np.ndarray) and (index < 0).any():
+            missing = index < 0
+        return _DerivedPositions(
+            _take(self.lat, index, missing),
+            _take(self.lon, index, missing),
+            self,
+            index,
+            missing,
+        )
+
+
+def _coordinates(pos_df):
+    """The latitudes and longitudes of a dataframe of positions as arrays."""
+    return (
+        pos_df[config.latitude].to_numpy(dtype=float),
+        pos_df[config.longitude].to_numpy(dtype=float),
+    )
+
+
+def _derived_positions(pos_df):
+    """
+    Get the derived coordinates of a dataframe of positions.
+
+    They are kept as the ``_derived`` attribute of the dataframe (like its
+    ``sim_t`` attribute) and recomputed if its coordinates have changed.
+    """
+    lat, lon = _coordinates(pos_df)
+    derived = getattr(pos_df, "_derived", None)
+    if derived is None or not derived.matches(lat, lon):
+        derived = _DerivedPositions(lat, lon)
+        pos_df._derived = derived
+    return derived
+
+
+def _share_derived_positions(pos_df, cache):
+    """
+    Attach to a snapshot of all positions the derived coordinates kept by a
+    position cache, so that all the snapshots of a cached response share them.
+    """
+    if cache is not None and isinstance(pos_df, pd.DataFrame):
+        pos_df._derived = cache.derived_positions(*_coordinates(pos_df))
+    return pos_df
+
+
+def _select_derived_positions(all_pos_df, pos_df, aircraft_id):
+    """
+    Attach to the rows of a list of aircraft IDs selected from a dataframe of
+    positions a view of the derived coordinates of the whole dataframe.
+    """
+    if config.latitude in all_pos_df and all_pos_df.index.is_unique:
+        index = all_pos_df.index.get_indexer(aircraft_id)
+        pos_df._derived = _derived_positions(all_pos_df).take(index)
+    return pos_df
+
+
+def _filter_positions(pos_df, mask):
+    """
+    Get the rows of a dataframe of positions where a boolean mask is TRUE,
+    with a view of the derived coordinates of the whole dataframe.
+    """
+    mask = np.asarray(mask, dtype=bool)
+    selected = pos_df[mask]
+    selected._derived = _derived_positions(pos_df).take(np.flatnonzero(mask))
+    return selected
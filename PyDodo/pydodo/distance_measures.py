@@ -1,9 +1,10 @@
 import pandas as pd
 import numpy as np
 from geopy import distance
-from scipy.spatial.distance import euclidean
 
-from .config_param import config_param
+from .config_param import config
+from .derived_positions import _derived_positions, _ecef_from_trig
+from .geodesic import _ellipsoid_distance_reduced, ellipsoid_distance
 from .request_position import aircraft_position
 from . import utils
 
@@ -18,13 +19,13 @@ def geodesic_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
 
     Parameters
     ----------
-    from_lat : double
+    from_lat : double, array_like
         A double in the range ``[-90, 90]``. The `from` point's latitude.
-    from_lon : double
+    from_lon : double, array_like
         A double in the range ``[-180, 180)``. The `from` point's longitude.
-    to_lat : double
+    to_lat : double, array_like
         A double in the range ``[-90, 90]``. The `to` point's latitude.
-    to_lon : double
+    to_lon : double, array_like
         A double in the range ``[-180, 180)``. The `to` point's longitude.
     **kwargs:
         major_semiaxis : double, optional
@@ -34,12 +35,18 @@ def geodesic_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
 
     Returns
     -------
-    geodesic_distance : double
-        The geodesic distance between two points.
+    geodesic_distance : double, numpy.ndarray, pandas.Series
+        The geodesic distance between two points. Array inputs are broadcast
+        against each other (see ``_broadcast_result()`` for the return type).
+
+    Notes
+    -----
+    Distances are computed with ``pydodo.geodesic.ellipsoid_distance()``.
 
     Examples
     --------
-    >>> >>> pydodo.geodesic_distance(from_lat = 51.5 , from_lon = 0.12, to_lat = 50.6, to_lon = -1.9)
+    >>> pydodo.geodesic_distance(from_lat = 51.5 , from_lon = 0.12, to_lat = 50.6, to_lon = -1.9)
+    >>> pydodo.geodesic_distance(log_df["lat"], log_df["lon"], 50.6, -1.9)
     """
     major_semiaxis = (
         _EARTH_RADIUS if "major_semiaxis" not in kwargs else kwargs["major_semiaxis"]
@@ -53,13 +60,10 @@ def geodesic_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
     utils._validate_is_positive(major_semiaxis, "major_semiaxis")
     utils._validate_is_positive(flattening, "flattening")
 
-    # For GeoPy need to provide (major_semiaxis, minor_semiaxis, flattening) but
-    # only major_semiaxis & flattening vals are used --> ignore minor_semiaxis
-    return distance.geodesic(
-        (from_lat, from_lon),
-        (to_lat, to_lon),
-        ellipsoid=(major_semiaxis / 1000, minor_semiaxis, flattening),  # convert to km
-    ).meters
+    result = ellipsoid_distance(
+        from_lat, from_lon, to_lat, to_lon, major_semiaxis, flattening
+    )
+    return _broadcast_result(result, from_lat, from_lon, to_lat, to_lon)
 
 
 def great_circle_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
@@ -68,13 +72,13 @@ def great_circle_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
 
     Parameters
     ----------
-    from_lat : double
+    from_lat : double, array_like
         A double in the range ``[-90, 90]``. The `from` point's latitude.
-    from_lon : double
+    from_lon : double, array_like
         A double in the range ``[-180, 180)``. The `from` point's longitude.
-    to_lat : double
+    to_lat : double, array_like
         A double in the range ``[-90, 90]``. The `to` point's latitude.
-    to_lon : double
+    to_lon : double, array_like
         A double in the range ``[-180, 180)``. The `to` point's longitude.
     **kwargs
         radius : double, optional
@@ -82,8 +86,10 @@ def great_circle_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
 
     Returns
     -------
-    great_circle_distance : double
-        The great-circle distance between two points.
+    great_circle_distance : double, numpy.ndarray, pandas.Series
+        The great-circle distance between two points. Array inputs are
+        broadcast against each other (see ``_broadcast_result()`` for the
+        return type).
 
     Examples
     --------
@@ -97,9 +103,44 @@ def great_circle_distance(from_lat, from_lon, to_lat, to_lon, **kwargs):
     utils._validate_longitude(to_lon)
     utils._validate_is_positive(radius, "radius")
 
-    return distance.great_circle(
-        (from_lat, from_lon), (to_lat, to_lon), radius=radius / 1000  # convert to km
-    ).meters
+    result = _great_circle(from_lat, from_lon, to_lat, to_lon, radius)
+    return _broadcast_result(result, from_lat, from_lon, to_lat, to_lon)
+
+
+def _great_circle(from_lat, from_lon, to_lat, to_lon, radius):
+    """
+    Great-circle distance in metres between (arrays of) points, using the same
+    (Vincenty sphere) formula as ``geopy.distance.great_circle``.
+    """
+    from_lat = np.radians(from_lat)
+    to_lat = np.radians(to_lat)
+    delta_lon = np.radians(to_lon) - np.radians(from_lon)
+    central_angle = _central_angle(
+        np.sin(from_lat),
+        np.cos(from_lat),
+        np.sin(to_lat),
+        np.cos(to_lat),
+        np.sin(delta_lon),
+        np.cos(delta_lon),
+    )
+    return radius * central_angle
+
+
+def _central_angle(
+    sin_from_lat, cos_from_lat, sin_to_lat, cos_to_lat, sin_delta_lon, cos_delta_lon
+):
+    """
+    Central angle in radians between (arrays of) points from the sines and
+    cosines of their latitudes and of their difference in longitude.
+    """
+    return np.arctan2(
+        np.sqrt(
+            (cos_to_lat * sin_delta_lon) ** 2
+            + (cos_from_lat * sin_to_lat - sin_from_lat * cos_to_lat * cos_delta_lon)
+            ** 2
+        ),
+        sin_from_lat * sin_to_lat + cos_from_lat * cos_to_lat * cos_delta_lon,
+    )
 
 
 def vertical_distance(from_alt, to_alt, **kwargs):
@@ -108,15 +149,16 @@ def vertical_distance(from_alt, to_alt, **kwargs):
 
     Parameters
     ----------
-    from_alt : double
+    from_alt : double, array_like
         A non-negatige double. The `from` point's altitude in metres.
-    to_alt : double
+    to_alt : double, array_like
         A non-negatige double. The `to` point's altitude in metres.
 
     Returns
     -------
-    vertical_distance : double
-        The verticle distance between two points.
+    vertical_distance : double, numpy.ndarray, pandas.Series
+        The verticle distance between two points. Array inputs are broadcast
+        against each other (see ``_broadcast_result()`` for the return type).
 
     Examples
     --------
@@ -125,7 +167,8 @@ def vertical_distance(from_alt, to_alt, **kwargs):
     utils._validate_is_positive(from_alt, "altitude")
     utils._validate_is_positive(to_alt, "altitude")
 
-    return abs(from_alt - to_alt)
+    result = np.abs(np.asarray(from_alt, dtype=float) - np.asarray(to_alt, dtype=float))
+    return _broadcast_result(result, from_alt, to_alt)
 
 
 def _lla_to_ECEF(lat, lon, alt=0, radius=_EARTH_RADIUS, f=_FLATTENING):
@@ -135,11 +178,11 @@ def _lla_to_ECEF(lat, lon, alt=0, radius=_EARTH_RADIUS, f=_FLATTENING):
     Parameters
     ----------
 
-    lat : double
+    lat : double, array_like
 
-    lon : double
+    lon : double, array_like
 
-    alt : int
+    alt : int, array_like
         Altitude in meters
     radius : double, optional
         Earth radius in metres (WGS84).
@@ -149,7 +192,8 @@ def _lla_to_ECEF(lat, lon, alt=0, radius=_EARTH_RADIUS, f=_FLATTENING):
     Returns
     -------
     (double, double, double)
-        The (x, y, z) ECEF coordinates.
+        The (x, y, z) ECEF coordinates. For array inputs, each coordinate is a
+        numpy.ndarray of the inputs' broadcast shape.
 
     Notes
     -----
@@ -160,17 +204,13 @@ def _lla_to_ECEF(lat, lon, alt=0, radius=_EARTH_RADIUS, f=_FLATTENING):
     >>> pydodo.distance_measures.lla_to_ECEF(lat = 51.5 , lon = 0.12, alt = 200)
     """
 
-    lat_r = np.deg2rad(lat)
-    lon_r = np.deg2rad(lon)
+    lat_r = np.deg2rad(np.asarray(lat, dtype=float))
+    lon_r = np.deg2rad(np.asarray(lon, dtype=float))
+    alt = np.asarray(alt, dtype=float)
 
-    e2 = 1 - (1 - f) * (1 - f)
-    N = radius / np.sqrt(1 - e2 * np.power(np.sin(lat_r), 2))
-
-    x = (N + alt) * np.cos(lat_r) * np.cos(lon_r)
-    y = (N + alt) * np.cos(lat_r) * np.sin(lon_r)
-    z = ((1 - e2) * N + alt) * np.sin(lat_r)
-
-    return (x, y, z)
+    return _ecef_from_trig(
+        np.sin(lat_r), np.cos(lat_r), np.sin(lon_r), np.cos(lon_r), alt, radius, f
+    )
 
 
 def euclidean_distance(from_lat, from_lon, from_alt, to_lat, to_lon, to_alt, **kwargs):
@@ -180,17 +220,17 @@ def euclidean_distance(from_lat, from_lon, from_alt, to_lat, to_lon, to_alt, **k
 
     Parameters
     ----------
-    from_lat : double
+    from_lat : double, array_like
         A double in the range ``[-90, 90]``. The `from` point's latitude.
-    from_lon : double
+    from_lon : double, array_like
         A double in the range ``[-180, 180)``. The `from` point's longitude.
-    from_alt : double
+    from_alt : double, array_like
         A non-negatige double. The from point's altitude in metres.
-    to_lat : double
+    to_lat : double, array_like
          A double in the range ``[-90, 90]``. The `to` point's latitude.
-    to_lon : double
+    to_lon : double, array_like
         A double in the range ``[-180, 180)``. The `to` point's longitude.
-    to_alt : double
+    to_alt : double, array_like
         A non-negatige double. The `to` point's altitude in metres.
     **kwargs:
         major_semiaxis : double, optional
@@ -200,8 +240,9 @@ def euclidean_distance(from_lat, from_lon, from_alt, to_lat, to_lon, to_alt, **k
 
     Returns
     -------
-    euclidean_distance : double
-        The euclidean distance between two points.
+    euclidean_distance : double, numpy.ndarray, pandas.Series
+        The euclidean distance between two points. Array inputs are broadcast
+        against each other (see ``_broadcast_result()`` for the return type).
 
     Notes
     -----
@@ -227,7 +268,30 @@ def euclidean_distance(from_lat, from_lon, from_alt, to_lat, to_lon, to_alt, **k
     from_ECEF = _lla_to_ECEF(from_lat, from_lon, from_alt, major_semiaxis, flattening)
     to_ECEF = _lla_to_ECEF(to_lat, to_lon, to_alt, major_semiaxis, flattening)
 
-    return euclidean(from_ECEF, to_ECEF)
+    result = _ECEF_distance(from_ECEF, to_ECEF)
+    return _broadcast_result(
+        result, from_lat, from_lon, from_alt, to_lat, to_lon, to_alt
+    )
+
+
+def _ECEF_distance(from_ECEF, to_ECEF):
+    """Euclidean distance between (arrays of) (x, y, z) ECEF coordinates."""
+    return np.sqrt(sum((f - t) ** 2 for f, t in zip(from_ECEF, to_ECEF)))
+
+
+def _broadcast_result(result, *inputs):
+    """
+    Return the result of a distance function in the type of its inputs: a
+    double if all inputs are scalars, a pandas.Series (with the index of the
+    first Series input) if any input is a Series of the same length as the
+    result, and a numpy.ndarray otherwise.
+    """
+    if np.ndim(result) == 0:
+        return float(result)
+    for x in inputs:
+        if isinstance(x, pd.Series) and np.shape(result) == x.shape:
+            return pd.Series(result, index=x.index)
+    return result
 
 
 def _get_pos_df(from_aircraft_id, to_aircraft_id):
@@ -252,11 +316,20 @@ def _get_pos_df(from_aircraft_id, to_aircraft_id):
     >>> pydodo.distance_measures.get_pos_df(from_aircraft_id = ["BAW123"], to_aircraft_id = ["KLM456"])
     """
 
+    pos_df = aircraft_position(_unique_ids(from_aircraft_id, to_aircraft_id))
+    return _altitude_to_metres(pos_df)
+
+
+def _unique_ids(from_aircraft_id, to_aircraft_id):
+    """Validate the aircraft ID lists and return all unique IDs in a list."""
     utils._validate_id_list(from_aircraft_id)
     utils._validate_id_list(to_aircraft_id)
 
-    ids = list(set(from_aircraft_id + to_aircraft_id))
-    pos_df = aircraft_position(ids)
+    return list(set(from_aircraft_id + to_aircraft_id))
+
+
+def _altitude_to_metres(pos_df):
+    """Convert the ``current_flight_level`` column of pos_df from feet to metres."""
     SCALE_FEET_TO_METRES = 0.3048
     pos_df.loc[:, "current_flight_level"] = SCALE_FEET_TO_METRES * pos_df["current_flight_level"]
     return pos_df
@@ -297,44 +370,168 @@ def _get_separation(from_aircraft_id, to_aircraft_id, distance_f, **kwargs):
     >>> pydodo.distance_measures.get_separation(from_aircraft_id = "BAW123", to_aircraft_id = "KLM456", measure = "euclidean")
     >>> pydodo.distance_measures.get_separation(from_aircraft_id = ["BAW123", "KLM456"], measure = "great_circle")
     """
-    major_semiaxis = (
-        _EARTH_RADIUS if "major_semiaxis" not in kwargs else kwargs["major_semiaxis"]
+    from_aircraft_id, to_aircraft_id = _parse_id_lists(from_aircraft_id, to_aircraft_id)
+    pos_df = _get_pos_df(from_aircraft_id, to_aircraft_id)
+    return _separation_from_pos(
+        pos_df, from_aircraft_id, to_aircraft_id, distance_f, **kwargs
     )
-    radius = _EARTH_RADIUS if "radius" not in kwargs else kwargs["radius"]
-    flattening = _FLATTENING if "flattening" not in kwargs else kwargs["flattening"]
 
+
+def _parse_id_lists(from_aircraft_id, to_aircraft_id):
+    """
+    Return from_aircraft_id and to_aircraft_id as lists. If to_aircraft_id is
+    None, it is a copy of from_aircraft_id.
+    """
     if not isinstance(from_aircraft_id, list):
         from_aircraft_id = [from_aircraft_id]
     if to_aircraft_id == None:
         to_aircraft_id = from_aircraft_id.copy()
     if not isinstance(to_aircraft_id, list):
         to_aircraft_id = [to_aircraft_id]
+    return from_aircraft_id, to_aircraft_id
 
-    pos_df = _get_pos_df(from_aircraft_id, to_aircraft_id)
-    all_distances = []
-    for from_id in from_aircraft_id:
-        if pos_df.loc[from_id][["current_flight_level", "longitude", "latitude"]].isnull().any():
-            distances = [np.nan] * len(to_aircraft_id)
-        else:
-            distances = [
-                distance_f(
-                    from_lat=pos_df.loc[from_id]["latitude"],
-                    from_lon=pos_df.loc[from_id]["longitude"],
-                    from_alt=pos_df.loc[from_id]["current_flight_level"],
-                    to_lat=pos_df.loc[to_id]["latitude"],
-                    to_lon=pos_df.loc[to_id]["longitude"],
-                    to_alt=pos_df.loc[to_id]["current_flight_level"],
-                    major_semiaxis=major_semiaxis,
-                    radius=radius,
-                    flattening=flattening,
-                )
-                if not pos_df.loc[to_id][["current_flight_level", "longitude", "latitude"]].isnull().any()
-                else np.nan
-                for to_id in to_aircraft_id
-            ]
-        all_distances.append(distances)
-
-    return pd.DataFrame(all_distances, columns=to_aircraft_id, index=from_aircraft_id)
+
+def _separation_from_pos(pos_df, from_aircraft_id, to_aircraft_id, distance_f, **kwargs):
+    """
+    Get separation between all pairs of "from" and "to" aircraft from a
+    dataframe of positions (as returned by ``_get_pos_df()``).
+
+    Parameters
+    ----------
+    pos_df : pandas.DataFrame
+        A dataframe of positions indexed by aircraft ID with altitude in metres.
+    from_aircraft_id : [str]
+        A list of strings of aircraft IDs.
+    to_aircraft_id : [str]
+       A list of strings of aircraft IDs.
+    distance_f : function
+        One of ``[geodesic_distance, great_circle_distance, vertical_distance, euclidean_distance]``.
+    **kwargs:
+        See ``_get_separation()``.
+
+    Returns
+    -------
+    sep_df : pandas.DataFrame
+       A dataframe with separation between all from_aircraft_id and to_aircraft_id pairs of aircraft.
+    """
+    major_semiaxis = (
+        _EARTH_RADIUS if "major_semiaxis" not in kwargs else kwargs["major_semiaxis"]
+    )
+    radius = _EARTH_RADIUS if "radius" not in kwargs else kwargs["radius"]
+    flattening = _FLATTENING if "flattening" not in kwargs else kwargs["flattening"]
+
+    from_pos = _position_arrays(pos_df, from_aircraft_id)
+    to_pos = _position_arrays(pos_df, to_aircraft_id)
+    valid = from_pos["valid"][:, np.newaxis] & to_pos["valid"][np.newaxis, :]
+
+    kernel = _SEPARATION_KERNELS[distance_f]
+    _validate_positions(kernel, from_pos, to_pos)
+    with np.errstate(invalid="ignore"):
+        distances = kernel(
+            from_pos,
+            to_pos,
+            valid,
+            major_semiaxis=major_semiaxis,
+            radius=radius,
+            flattening=flattening,
+        )
+
+    return pd.DataFrame(
+        np.where(valid, distances, np.nan), columns=to_aircraft_id, index=from_aircraft_id
+    )
+
+
+def _position_arrays(pos_df, aircraft_id):
+    """
+    Get the latitude, longitude and altitude of the aircraft in a list of IDs
+    as arrays (in the order of the list), a mask of the aircraft with a known
+    position and their derived coordinates (a view of those of pos_df, see
+    ``derived_positions._derived_positions()``).
+    """
+    pos = pos_df.reindex(aircraft_id)
+    lat = pos["latitude"].to_numpy(dtype=float)
+    lon = pos["longitude"].to_numpy(dtype=float)
+    alt = pos["current_flight_level"].to_numpy(dtype=float)
+    valid = ~(np.isnan(lat) | np.isnan(lon) | np.isnan(alt))
+    derived = _derived_positions(pos_df).take(pos_df.index.get_indexer(aircraft_id))
+    return {"lat": lat, "lon": lon, "alt": alt, "valid": valid, "derived": derived}
+
+
+def _validate_positions(kernel, *positions):
+    """
+    Validate all known positions (rather than each pair) with the checks the
+    corresponding distance function makes.
+    """
+    for pos in positions:
+        valid = pos["valid"]
+        if kernel is not _vertical_matrix:
+            utils._validate_latitude(pos["lat"][valid])
+            utils._validate_longitude(pos["lon"][valid])
+        if kernel in (_vertical_matrix, _euclidean_matrix):
+            utils._validate_is_positive(pos["alt"][valid], "altitude")
+
+
+def _geodesic_matrix(from_pos, to_pos, valid, major_semiaxis, flattening, **kwargs):
+    """Geodesic distance between all from/to position pairs."""
+    utils._validate_is_positive(major_semiaxis, "major_semiaxis")
+    utils._validate_is_positive(flattening, "flattening")
+
+    return _ellipsoid_distance_reduced(
+        from_pos["lat"][:, np.newaxis],
+        from_pos["lon"][:, np.newaxis],
+        to_pos["lat"][np.newaxis, :],
+        to_pos["lon"][np.newaxis, :],
+        from_pos["derived"].reduced_coordinates(flattening, (slice(None), np.newaxis)),
+        to_pos["derived"].reduced_coordinates(flattening, np.newaxis),
+        major_semiaxis,
+        flattening,
+    )
+
+
+def _great_circle_matrix(from_pos, to_pos, valid, radius, **kwargs):
+    """Great-circle distance between all from/to position pairs."""
+    utils._validate_is_positive(radius, "radius")
+
+    from_d, to_d = from_pos["derived"], to_pos["derived"]
+    sin_from_lon, cos_from_lon = from_d.sin_lon[:, np.newaxis], from_d.cos_lon[:, np.newaxis]
+    sin_to_lon, cos_to_lon = to_d.sin_lon[np.newaxis, :], to_d.cos_lon[np.newaxis, :]
+    # the longitude differences from the per aircraft sines and cosines
+    return radius * _central_angle(
+        from_d.sin_lat[:, np.newaxis],
+        from_d.cos_lat[:, np.newaxis],
+        to_d.sin_lat[np.newaxis, :],
+        to_d.cos_lat[np.newaxis, :],
+        sin_to_lon * cos_from_lon - cos_to_lon * sin_from_lon,
+        cos_to_lon * cos_from_lon + sin_to_lon * sin_from_lon,
+    )
+
+
+def _vertical_matrix(from_pos, to_pos, valid, **kwargs):
+    """Vertical distance between all from/to position pairs."""
+    return np.abs(from_pos["alt"][:, np.newaxis] - to_pos["alt"][np.newaxis, :])
+
+
+def _euclidean_matrix(from_pos, to_pos, valid, major_semiaxis, flattening, **kwargs):
+    """Euclidean distance between all from/to position pairs in ECEF coordinates."""
+    utils._validate_is_positive(major_semiaxis, " major_semiaxis")
+
+    from_x, from_y, from_z = from_pos["derived"].ecef(
+        from_pos["alt"], major_semiaxis, flattening
+    )
+    to_x, to_y, to_z = to_pos["derived"].ecef(to_pos["alt"], major_semiaxis, flattening)
+    return _ECEF_distance(
+        (from_x[:, np.newaxis], from_y[:, np.newaxis], from_z[:, np.newaxis]),
+        (to_x[np.newaxis, :], to_y[np.newaxis, :], to_z[np.newaxis, :]),
+    )
+
+
+# whole-matrix implementation of each distance function
+_SEPARATION_KERNELS = {
+    geodesic_distance: _geodesic_matrix,
+    great_circle_distance: _great_circle_matrix,
+    vertical_distance: _vertical_matrix,
+    euclidean_distance: _euclidean_matrix,
+}
 
 
 def geodesic_separation(
@@ -3,9 +3,9 @@ import json
 import os
 
 from . import utils
-from .bluebird_connect import construct_endpoint_url
+from .bluebird_connect import construct_endpoint_url, get_session
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
 
 
 def episode_log():
@@ -26,13 +26,29 @@ def episode_log():
     --------
     >>> pydodo.episode_log()
     """
-    endpoint = config_param("endpoint_episode_log")
+    endpoint = config.endpoint_episode_log
     url = construct_endpoint_url(endpoint)
 
-    resp = requests.get(url)
+    resp = get_session().get(url)
     resp.raise_for_status()
 
-    content = json.loads(resp.text)
+    return _save_episode_log(json.loads(resp.text))
+
+
+def _save_episode_log(content):
+    """
+    Save the lines of a BlueBird EPLOG response to the log file path it names.
+
+    Parameters
+    ----------
+    content : JSON <dict>
+        BlueBird response from the EPLOG endpoint.
+
+    Returns
+    -------
+    log : str
+        A string, the relative path to the log file.
+    """
     ep_log = content["lines"]
     file_path = content["cur_ep_file"].split("bluebird/")[-1]
     directory = "/".join(file_path.split("/")[:-1])
@@ -0,0 +1,259 @@
+import numpy as np
+import pandas as pd
+
+from . import utils
+from .config_param import config
+from .metrics import fuel_efficiency
+from .request_position import all_positions
+from .trajectory_store import _is_next_snapshot, _snapshot_arrays
+
+_SECONDS_PER_HOUR = 3600
+
+# per aircraft arrays of FuelEfficiencyAccumulator
+_ACCUMULATOR_ARRAYS = {
+    "ground_speed": np.nan,
+    "vertical_speed": np.nan,
+    "altitude": np.nan,
+    "last_seen": -1,
+    "distance": 0.0,
+    "fuel": 0.0,
+    "scale": 1.0,
+}
+
+
+class FuelEfficiencyAccumulator:
+    """
+    Estimate the fuel efficiency of all aircraft over an episode from
+    snapshots of their positions, reconciled periodically with the BlueBird
+    ``fuel_efficiency`` metric.
+
+    Parameters
+    ----------
+    reconcile_interval : double, optional
+        A non-negative double. Scenario time in seconds between
+        reconciliations with BlueBird (see ``reconcile()``). If None,
+        ``update()`` never reconciles. The default is set in the config file.
+    burn_rate : double, optional
+        A non-negative double. Fuel burnt per second in level flight, in
+        arbitrary units. The default is set in the config file.
+    climb_burn_rate : double, optional
+        A non-negative double. Additional fuel burnt per second per 1000
+        feet/min of climb. The default is set in the config file.
+    altitude_burn_rate : double, optional
+        A non-negative double. Fraction of the level flight burn saved per
+        1000 feet of altitude. The default is set in the config file.
+
+    Notes
+    -----
+    Each update integrates, for each aircraft in two consecutive snapshots,
+    the distance flown (from the ground speed in knots) and the fuel burnt
+    (from the altitude in feet and the vertical speed in feet/min) with the
+    trapezoidal rule. The fuel burnt per second is
+
+        burn_rate * max(1 - altitude_burn_rate * altitude / 1000, 0)
+        + climb_burn_rate * max(vertical_speed, 0) / 1000
+
+    i.e. less fuel is burnt in the thinner air at altitude. The
+    estimate of an aircraft is the distance flown in nautical miles per unit
+    of fuel, times a per aircraft scale. Each reconciliation sets the scale so
+    that the estimates match the BlueBird scores; aircraft without a score
+    keep their scale.
+
+    The state is kept in arrays with one element per aircraft seen, so an
+    update costs O(n) in the number of aircraft of the snapshot.
+
+    Examples
+    --------
+    >>> accumulator = pydodo.FuelEfficiencyAccumulator(reconcile_interval = 600)
+    >>> for _ in range(100):
+    >>>     pydodo.simulation_step()
+    >>>     efficiency = accumulator.update()
+    """
+
+    def __init__(
+        self,
+        reconcile_interval=None,
+        burn_rate=None,
+        climb_burn_rate=None,
+        altitude_burn_rate=None,
+    ):
+        if reconcile_interval is None:
+            reconcile_interval = config.fuel_reconcile_interval
+        if burn_rate is None:
+            burn_rate = config.fuel_burn_rate
+        if climb_burn_rate is None:
+            climb_burn_rate = config.fuel_climb_burn_rate
+        if altitude_burn_rate is None:
+            altitude_burn_rate = config.fuel_altitude_burn_rate
+        if reconcile_interval is not None:
+            utils._validate_is_positive(reconcile_interval, "reconcile_interval")
+        utils._validate_is_positive(burn_rate, "burn_rate")
+        utils._validate_is_positive(climb_burn_rate, "climb_burn_rate")
+        utils._validate_is_positive(altitude_burn_rate, "altitude_burn_rate")
+
+        self.reconcile_interval = reconcile_interval
+        self.burn_rate = burn_rate
+        self.climb_burn_rate = climb_burn_rate
+        self.altitude_burn_rate = altitude_burn_rate
+        self.clear()
+
+    def clear(self):
+        """Drop the estimates of all aircraft."""
+        self._aircraft_index = pd.Index([], dtype=object)
+        self._arrays = {
+            name: np.full(0, value, dtype=type(value))
+            for name, value in _ACCUMULATOR_ARRAYS.items()
+        }
+        self._step = 0
+        self._last_t = None
+        self._reconciled_t = None
+
+    def __len__(self):
+        return len(self._aircraft_index)
+
+    def update(self, snapshot=None):
+        """
+        Add a snapshot of aircraft positions to the estimates, and reconcile
+        them with BlueBird if the reconciliation interval has elapsed.
+
+        Parameters
+        ----------
+        snapshot : pandas.DataFrame or dict, optional
+            Aircraft positions as returned by ``all_positions()``, or in its
+            ``"arrays"`` format. Must have a scenario time (``sim_t``). If not
+            provided, the positions of all aircraft are requested.
+
+        Returns
+        -------
+        pandas.Series
+            The fuel efficiency estimates of the aircraft in the snapshot,
+            indexed by aircraft ID (NaN before an aircraft has burnt fuel).
+        """
+        if snapshot is None:
+            snapshot = all_positions(output="arrays")
+        sim_t, aircraft_id, _, values = _snapshot_arrays(
+            snapshot,
+            [config.ground_speed, config.vertical_speed, config.current_flight_level],
+        )
+        slots = self._slots(aircraft_id)
+        if _is_next_snapshot(sim_t, self._last_t):
+            self._integrate(sim_t, slots, values)
+            if self._reconciled_t is None:
+                self._reconciled_t = sim_t
+            elif (
+                self.reconcile_interval is not None
+                and sim_t - self._reconciled_t >= self.reconcile_interval
+            ):
+                self.reconcile(list(aircraft_id))
+                self._reconciled_t = sim_t
+        return pd.Series(self._estimates(slots), index=aircraft_id)
+
+    def _slots(self, aircraft_id):
+        """Get the array elements of aircraft IDs, adding new aircraft."""
+        slots = self._aircraft_index.get_indexer(aircraft_id)
+        new = slots == -1
+        if new.any():
+            new_id = pd.unique(np.asarray(aircraft_id)[new])
+            n = len(self._aircraft_index)
+            self._aircraft_index = self._aircraft_index.append(pd.Index(new_id))
+            for name, value in _ACCUMULATOR_ARRAYS.items():
+                self._arrays[name] = np.concatenate(
+                    [self._arrays[name], np.full(len(new_id), value, dtype=type(value))]
+                )
+            slots[new] = n + pd.Index(new_id).get_indexer(np.asarray(aircraft_id)[new])
+        return slots
+
+    def _integrate(self, sim_t, slots, values):
+        """Integrate distance and fuel from the last snapshot to this one."""
+        arrays = self._arrays
+        ground_speed = values[config.ground_speed]
+        vertical_speed = values[config.vertical_speed]
+        altitude = values[config.current_flight_level]
+
+        # aircraft also in the previous snapshot
+        seen = arrays["last_seen"][slots] == self._step
+        if self._last_t is not None and seen.any():
+            dt = sim_t - self._last_t
+            prev = slots[seen]
+            mean_speed = (arrays["ground_speed"][prev] + ground_speed[seen]) / 2
+            climb = np.maximum(
+                (arrays["vertical_speed"][prev] + vertical_speed[seen]) / 2, 0
+            )
+            mean_altitude = (arrays["altitude"][prev] + altitude[seen]) / 2
+            # missing speeds do not add to the estimates (nor missing altitudes
+            # reduce them)
+            distance = np.nan_to_num(mean_speed) * dt / _SECONDS_PER_HOUR
+            level_burn = self.burn_rate * np.maximum(
+                1 - self.altitude_burn_rate * np.nan_to_num(mean_altitude) / 1000, 0
+            )
+            burn = level_burn + self.climb_burn_rate * np.nan_to_num(climb) / 1000
+            arrays["distance"][prev] += distance
+            arrays["fuel"][prev] += burn * dt
+
+        self._step += 1
+        arrays["last_seen"][slots] = self._step
+        arrays["ground_speed"][slots] = ground_speed
+        arrays["vertical_speed"][slots] = vertical_speed
+        arrays["altitude"][slots] = altitude
+        self._last_t = sim_t
+
+    def _estimates(self, slots):
+        """The efficiency estimates of the aircraft at some array elements."""
+        fuel = self._arrays["fuel"][slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            efficiency = self._arrays["distance"][slots] / fuel
+        return np.where(fuel > 0, efficiency * self._arrays["scale"][slots], np.nan)
+
+    def reconcile(self, aircraft_id=None):
+        """
+        Request the BlueBird fuel efficiency scores of aircraft and scale
+        their estimates to match them.
+
+        Parameters
+        ----------
+        aircraft_id : [str], optional
+            A list of aircraft IDs. If not provided, all aircraft with an
+            estimate.
+
+        Returns
+        -------
+        pandas.Series
+            The BlueBird scores, indexed by aircraft ID.
+        """
+        if aircraft_id is None:
+            aircraft_id = list(self._aircraft_index)
+        if not aircraft_id:
+            return pd.Series([], dtype=float)
+        scores = fuel_efficiency(aircraft_id)
+
+        slots = self._aircraft_index.get_indexer(scores.index)
+        known = slots != -1
+        slots, values = slots[known], scores.to_numpy(dtype=float)[known]
+        fuel = self._arrays["fuel"][slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            efficiency = self._arrays["distance"][slots] / fuel
+        update = np.isfinite(values) & (fuel > 0) & (efficiency > 0)
+        self._arrays["scale"][slots[update]] = values[update] / efficiency[update]
+        return scores
+
+    def estimates(self):
+        """
+        Get the estimates of all aircraft seen.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe indexed by aircraft ID with columns:
+        | - ``distance``: The distance flown in nautical miles.
+        | - ``fuel``: The fuel burnt, in the units of ``burn_rate``.
+        | - ``efficiency``: The fuel efficiency estimate.
+        """
+        slots = np.arange(len(self._aircraft_index))
+        return pd.DataFrame(
+            {
+                "distance": self._arrays["distance"],
+                "fuel": self._arrays["fuel"],
+                "efficiency": self._estimates(slots),
+            },
+            index=self._aircraft_index,
+        )
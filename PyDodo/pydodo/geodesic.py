@@ -0,0 +1,248 @@
+import numpy as np
+from geopy import distance
+
+# Vincenty's iteration converges to well below a millimetre within a handful of
+# iterations except for nearly antipodal points, where it converges slowly or
+# not at all. Those points are solved with geopy (Karney's algorithm) instead.
+_MAX_ITERATIONS = 200
+_TOLERANCE = 1e-12
+
+
+def vincenty_inverse(
+    from_lat,
+    from_lon,
+    to_lat,
+    to_lon,
+    major_semiaxis,
+    flattening,
+    max_iterations=_MAX_ITERATIONS,
+    tolerance=_TOLERANCE,
+):
+    """
+    Solve the inverse geodesic problem on an ellipsoid for arrays of points
+    using Vincenty's formulae.
+
+    Parameters
+    ----------
+    from_lat : array_like
+        The `from` points' latitudes in degrees.
+    from_lon : array_like
+        The `from` points' longitudes in degrees.
+    to_lat : array_like
+        The `to` points' latitudes in degrees.
+    to_lon : array_like
+        The `to` points' longitudes in degrees.
+    major_semiaxis : double
+        The major (equatorial) radius of the ellipsoid in metres.
+    flattening : double
+        Ellipsoid flattening.
+    max_iterations : int, optional
+        Maximum number of iterations.
+    tolerance : double, optional
+        Convergence threshold for the change in longitude on the auxiliary
+        sphere (in radians).
+
+    Returns
+    -------
+    (numpy.ndarray, numpy.ndarray)
+        The geodesic distances in metres and a boolean mask of the points for
+        which the iteration converged. Distances of points which did not
+        converge are NaN. All inputs are broadcast against each other.
+
+    Notes
+    -----
+    https://en.wikipedia.org/wiki/Vincenty%27s_formulae
+
+    Missing (NaN) coordinates give a NaN distance and are reported as
+    converged.
+    """
+    # the reduced latitudes are computed per point, before broadcasting the
+    # points against each other (e.g., to all pairs of a separation matrix)
+    return _vincenty_reduced(
+        _reduced_coordinates(from_lat, from_lon, flattening),
+        _reduced_coordinates(to_lat, to_lon, flattening),
+        major_semiaxis,
+        flattening,
+        max_iterations,
+        tolerance,
+    )
+
+
+def _reduced_coordinates(lat, lon, flattening):
+    """
+    The longitudes in radians and the sines and cosines of the reduced
+    latitudes of points given in degrees, as used by ``_vincenty_reduced()``.
+    """
+    lat, lon = [np.radians(np.asarray(x, dtype=float)) for x in (lat, lon)]
+    U = np.arctan((1 - flattening) * np.tan(lat))
+    return lon, np.sin(U), np.cos(U)
+
+
+def _vincenty_reduced(
+    from_reduced,
+    to_reduced,
+    major_semiaxis,
+    flattening,
+    max_iterations=_MAX_ITERATIONS,
+    tolerance=_TOLERANCE,
+):
+    """
+    ``vincenty_inverse()`` for points given as (longitude in radians, sine
+    and cosine of reduced latitude), e.g. derived once per aircraft (see
+    ``derived_positions._DerivedPositions.reduced_coordinates()``).
+    """
+    a = major_semiaxis
+    f = flattening
+    b = (1 - f) * a
+
+    from_lon, sin_U1, cos_U1 = from_reduced
+    to_lon, sin_U2, cos_U2 = to_reduced
+    L, sin_U1, cos_U1, sin_U2, cos_U2 = np.broadcast_arrays(
+        to_lon - from_lon, sin_U1, cos_U1, sin_U2, cos_U2
+    )
+
+    lam = L
+    active = ~np.isnan(L + sin_U1 + sin_U2)
+    converged = ~active
+    sin_sigma = cos_sigma = sigma = cos_sq_alpha = cos_2sigma_m = np.zeros(L.shape)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for _ in range(max_iterations):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.sqrt(
+                (cos_U2 * sin_lam) ** 2
+                + (cos_U1 * sin_U2 - sin_U1 * cos_U2 * cos_lam) ** 2
+            )
+            cos_sigma = sin_U1 * sin_U2 + cos_U1 * cos_U2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            # coincident points have sin_sigma == 0
+            sin_alpha = np.where(
+                sin_sigma == 0, 0.0, cos_U1 * cos_U2 * sin_lam / sin_sigma
+            )
+            cos_sq_alpha = 1 - sin_alpha ** 2
+            # equatorial lines have cos_sq_alpha == 0
+            cos_2sigma_m = np.where(
+                cos_sq_alpha == 0, 0.0, cos_sigma - 2 * sin_U1 * sin_U2 / cos_sq_alpha
+            )
+            C = f / 16 * cos_sq_alpha * (4 + f * (4 - 3 * cos_sq_alpha))
+            new_lam = L + (1 - C) * f * sin_alpha * (
+                sigma
+                + C
+                * sin_sigma
+                * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+
+            converged |= active & (np.abs(new_lam - lam) < tolerance)
+            lam = np.where(active, new_lam, lam)
+            # the iteration diverges for some nearly antipodal points
+            active &= ~converged & (np.abs(lam) <= np.pi)
+            if not active.any():
+                break
+
+        u_sq = cos_sq_alpha * (a ** 2 - b ** 2) / b ** 2
+        A = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+        B = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+        delta_sigma = (
+            B
+            * sin_sigma
+            * (
+                cos_2sigma_m
+                + B
+                / 4
+                * (
+                    cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+                    - B
+                    / 6
+                    * cos_2sigma_m
+                    * (-3 + 4 * sin_sigma ** 2)
+                    * (-3 + 4 * cos_2sigma_m ** 2)
+                )
+            )
+        )
+        distances = b * A * (sigma - delta_sigma)
+
+    distances = np.where(converged, distances, np.nan)
+    return distances, converged
+
+
+def ellipsoid_distance(from_lat, from_lon, to_lat, to_lon, major_semiaxis, flattening):
+    """
+    Get the geodesic distance in metres between arrays of (lat, lon) points.
+
+    Parameters
+    ----------
+    from_lat : array_like
+        The `from` points' latitudes in degrees.
+    from_lon : array_like
+        The `from` points' longitudes in degrees.
+    to_lat : array_like
+        The `to` points' latitudes in degrees.
+    to_lon : array_like
+        The `to` points' longitudes in degrees.
+    major_semiaxis : double
+        The major (equatorial) radius of the ellipsoid in metres.
+    flattening : double
+        Ellipsoid flattening.
+
+    Returns
+    -------
+    numpy.ndarray
+        The geodesic distances in metres, with all inputs broadcast against
+        each other. Missing (NaN) coordinates give a NaN distance.
+
+    Notes
+    -----
+    Distances are computed with ``vincenty_inverse()``. On the WGS84 ellipsoid
+    they agree with ``geopy.distance.geodesic`` (Karney's algorithm) to within
+    a millimetre. Points for which Vincenty's iteration does not converge
+    (nearly antipodal points) are solved one by one with geopy.
+    """
+    return _ellipsoid_distance_reduced(
+        from_lat,
+        from_lon,
+        to_lat,
+        to_lon,
+        _reduced_coordinates(from_lat, from_lon, flattening),
+        _reduced_coordinates(to_lat, to_lon, flattening),
+        major_semiaxis,
+        flattening,
+    )
+
+
+def _ellipsoid_distance_reduced(
+    from_lat,
+    from_lon,
+    to_lat,
+    to_lon,
+    from_reduced,
+    to_reduced,
+    major_semiaxis,
+    flattening,
+):
+    """
+    ``ellipsoid_distance()`` with the reduced coordinates of the points (see
+    ``_vincenty_reduced()``) already computed. The coordinates in degrees are
+    only used for the points where Vincenty's iteration does not converge.
+    """
+    distances, converged = _vincenty_reduced(
+        from_reduced, to_reduced, major_semiaxis, flattening
+    )
+    if not converged.all():
+        from_lat, from_lon, to_lat, to_lon = [
+            np.broadcast_to(x, distances.shape).ravel()
+            for x in (from_lat, from_lon, to_lat, to_lon)
+        ]
+        # for geopy need (major_semiaxis, minor_semiaxis, flattening) in km but
+        # only major_semiaxis & flattening vals are used
+        ellipsoid = (
+            major_semiaxis / 1000,
+            (1 - flattening) * major_semiaxis / 1000,
+            flattening,
+        )
+        distances = distances.ravel()
+        for i in np.flatnonzero(~converged):
+            distances[i] = distance.geodesic(
+                (from_lat[i], from_lon[i]), (to_lat[i], to_lon[i]), ellipsoid=ellipsoid
+            ).meters
+        distances = distances.reshape(converged.shape)
+    return distances
@@ -2,7 +2,7 @@ import requests
 import json
 
 from . import utils
-from .config_param import config_param
+from .config_param import config
 from .request_position import aircraft_position
 from .bluebird_connect import construct_endpoint_url
 
@@ -4,10 +4,8 @@ import pandas as pd
 
 from . import utils
 from .post_request import post_request
-from .config_param import config_param
-from .bluebird_connect import construct_endpoint_url
-
-endpoint = config_param("endpoint_list_route")
+from .config_param import config
+from .bluebird_connect import construct_endpoint_url, get_session
 
 
 def _route_call(aircraft_id):
@@ -42,14 +40,35 @@ def _route_call(aircraft_id):
     If the aircraft has no route information, a dictionary with just
     the callsign is returned.
     """
-    url = construct_endpoint_url(endpoint)
-    resp = requests.get(url, params={config_param("query_aircraft_id"): aircraft_id})
-    if resp.status_code == 200:
-        return json.loads(resp.text)
-    elif response.status == config_param("status_code_aircraft_has_no_route"):
-        return {config_param("query_aircraft_id"): aircraft_id}
+    url = construct_endpoint_url(config.endpoint_list_route)
+    resp = get_session().get(url, params={config.query_aircraft_id: aircraft_id})
+    return _handle_route_call(aircraft_id, resp.status_code, resp.text)
+
+
+def _handle_route_call(aircraft_id, status_code, text):
+    """
+    Check the status of a BlueBird LISTROUTE endpoint response and decode it.
+
+    Parameters
+    ----------
+    aircraft_id: str
+        The aircraft identifier the request was made for.
+    status_code : int
+        The HTTP status code of the response.
+    text : str
+        The body of the response.
+
+    Returns
+    -------
+    dict :
+        See ``_route_call()``.
+    """
+    if status_code == 200:
+        return json.loads(text)
+    elif status_code == config.status_code_aircraft_has_no_route:
+        return {config.query_aircraft_id: aircraft_id}
     else:
-        raise requests.HTTPError(resp.text)
+        raise requests.HTTPError(text)
 
 
 def _process_listroute_response(response):
@@ -62,7 +81,7 @@ def _process_listroute_response(response):
     response : JSON <dict>
         BlueBird response returned by _route_call().
     """
-    response["aircraft_id"] = response.pop(config_param("query_aircraft_id"))
+    response["aircraft_id"] = response.pop(config.query_aircraft_id)
     return response
 
 
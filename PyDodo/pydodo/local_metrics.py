@@ -0,0 +1,175 @@
+import numpy as np
+import pandas as pd
+
+from . import utils
+from .config_param import config
+from .distance_measures import (
+    _EARTH_RADIUS,
+    _FLATTENING,
+    _altitude_to_metres,
+    _separation_from_pos,
+    geodesic_distance,
+    vertical_distance,
+)
+from .proximity import _proximity_from_pos
+from .request_position import aircraft_position, all_positions
+
+_NAUTICAL_MILE = 1852  # metres
+_FOOT = 0.3048  # metres
+
+
+def _separation_score(separation, lower_threshold, upper_threshold):
+    """
+    Score (arrays of) separation: -1 at or below the lower threshold, 0 at or
+    above the upper threshold and linear in between. NaN stays NaN.
+    """
+    return np.clip(
+        (separation - upper_threshold) / (upper_threshold - lower_threshold), -1, 0
+    )
+
+
+def _loss_of_separation_score(lateral, vertical):
+    """
+    Aviary pairwise separation score of (arrays of) lateral and vertical
+    separation in metres: the larger of the lateral and vertical scores.
+    """
+    lateral_score = _separation_score(
+        lateral,
+        config.los_lateral_lower_threshold * _NAUTICAL_MILE,
+        config.los_lateral_upper_threshold * _NAUTICAL_MILE,
+    )
+    vertical_score = _separation_score(
+        vertical,
+        config.los_vertical_lower_threshold * _FOOT,
+        config.los_vertical_upper_threshold * _FOOT,
+    )
+    return np.maximum(lateral_score, vertical_score)
+
+
+def _get_los_pos_df(aircraft_id):
+    """
+    Get the positions (with altitude in metres) and the list of IDs of the
+    aircraft to score, all aircraft in the simulation if aircraft_id is None.
+    """
+    if aircraft_id is None:
+        pos_df = all_positions()
+        aircraft_id = list(pos_df.index)
+    else:
+        utils._validate_id_list(aircraft_id)
+        if not isinstance(aircraft_id, list):
+            aircraft_id = [aircraft_id]
+        pos_df = aircraft_position(aircraft_id)
+    return _altitude_to_metres(pos_df), aircraft_id
+
+
+def loss_of_separation_matrix(aircraft_id=None):
+    """
+    Get the loss of separation score between all pairs of aircraft, computed
+    locally from one position snapshot.
+
+    Parameters
+    ----------
+    aircraft_id : str, [str], optional
+        A string or list of strings of aircraft IDs. If not provided, all
+        aircraft in the simulation are scored.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        A symmetric dataframe of doubles in the range ``[-1, 0]`` with aircraft
+        IDs as row and column names. The values are the loss of separation
+        score of each ``[from_aircraft_id, to_aircraft_id]`` pair.
+
+    Notes
+    -----
+    The score is the Aviary pairwise separation metric (as returned by
+    ``loss_of_separation()``). The lateral (geodesic) and vertical separation
+    are each scored -1 below a lower threshold, 0 above an upper threshold and
+    linearly in between; the pair's score is the larger of the two. The
+    thresholds are set in the config file.
+
+    If any of the given aircraft IDs does not exist in the simulation, the
+    returned dataframe contains a row and column of missing values for that ID.
+
+    Examples
+    --------
+    >>> pydodo.loss_of_separation_matrix()
+    >>> pydodo.loss_of_separation_matrix(["BAW123", "KLM456", "EZY789"])
+    """
+    pos_df, aircraft_id = _get_los_pos_df(aircraft_id)
+    return _los_matrix_from_pos(pos_df, aircraft_id)
+
+
+def _los_matrix_from_pos(pos_df, aircraft_id):
+    """
+    Get the loss of separation score between all pairs of aircraft in a list
+    of IDs from a dataframe of positions (with altitude in metres).
+    """
+    lateral = _separation_from_pos(
+        pos_df, aircraft_id, aircraft_id, geodesic_distance
+    ).to_numpy()
+    vertical = _separation_from_pos(
+        pos_df, aircraft_id, aircraft_id, vertical_distance
+    ).to_numpy()
+    return pd.DataFrame(
+        _loss_of_separation_score(lateral, vertical),
+        index=aircraft_id,
+        columns=aircraft_id,
+    )
+
+
+def loss_of_separation_pairs(aircraft_id=None):
+    """
+    Get the pairs of aircraft with a non-zero loss of separation score,
+    computed locally from one position snapshot.
+
+    Parameters
+    ----------
+    aircraft_id : str, [str], optional
+        A string or list of strings of aircraft IDs. If not provided, all
+        aircraft in the simulation are scored.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with one row per pair of aircraft (each pair appears once)
+        and columns:
+    | - ``from_aircraft_id``: A string aircraft identifier.
+    | - ``to_aircraft_id``: A string aircraft identifier.
+    | - ``loss_of_separation``: A double in the range ``[-1, 0)``. The loss of separation score of the pair.
+
+    Notes
+    -----
+    See ``loss_of_separation_matrix()`` for the score. Only pairs within the
+    upper lateral and vertical thresholds can have a non-zero score, so they
+    are found with ``proximity_pairs()`` without scoring all pairs.
+
+    Aircraft IDs which do not exist in the simulation are ignored.
+
+    Examples
+    --------
+    >>> pydodo.loss_of_separation_pairs()
+    """
+    pos_df, _ = _get_los_pos_df(aircraft_id)
+    return _los_pairs_from_pos(pos_df)
+
+
+def _los_pairs_from_pos(pos_df):
+    """
+    Get the pairs of aircraft with a non-zero loss of separation score from a
+    dataframe of positions (with altitude in metres).
+    """
+    pairs = _proximity_from_pos(
+        pos_df,
+        config.los_lateral_upper_threshold * _NAUTICAL_MILE,
+        config.los_vertical_upper_threshold * _FOOT,
+        _EARTH_RADIUS,
+        _FLATTENING,
+    )
+    score = _loss_of_separation_score(
+        pairs["lateral"].to_numpy(dtype=float), pairs["vertical"].to_numpy(dtype=float)
+    )
+    pairs = pairs[["from_aircraft_id", "to_aircraft_id"]].assign(
+        loss_of_separation=score
+    )
+    return pairs[score < 0].reset_index(drop=True)
@@ -2,12 +2,13 @@ import json
 import requests
 
 import numpy as np
+import pandas as pd
 
 from . import utils
-from .bluebird_connect import construct_endpoint_url
-from .config_param import config_param
-
-endpoint = config_param("endpoint_metrics")
+from .batch_executor import batch_results
+from .bluebird_connect import construct_endpoint_url, get_session, get_async_session
+from .client import _bind, get_client
+from .config_param import config
 
 
 def _metrics_call(metric, args):
@@ -27,106 +28,278 @@ def _metrics_call(metric, args):
         Score returned by the metric (NaN if any of the aircraft specified in
         args does not exist in the simulation)
     """
-    url = construct_endpoint_url(endpoint)
-    resp = requests.get(url, params={"name": metric, "args": args})
-    if resp.status_code == 200:
-        json_data = json.loads(resp.text)
+    url = construct_endpoint_url(config.endpoint_metrics)
+    resp = get_session().get(url, params={"name": metric, "args": args})
+    return _handle_metrics_call(metric, resp.status_code, resp.text)
+
+
+async def _async_metrics_call(metric, args):
+    """
+    Make an asynchronous call to the BlueBird METRIC endpoint. See
+    ``_metrics_call()``.
+    """
+    url = construct_endpoint_url(config.endpoint_metrics)
+    session = get_async_session()
+    async with session.get(
+        url, params={"name": metric, "args": args}, raise_for_status=False
+    ) as resp:
+        return _handle_metrics_call(metric, resp.status, await resp.text())
+
+
+def _bulk_metrics_call(metric, args, max_concurrency=None):
+    """
+    Make concurrent calls to the BlueBird METRIC endpoint, one for each
+    element of args.
+
+    Parameters
+    ----------
+    metric: str
+        Name of the metric.
+    args: [str]
+        A list of arguments to pass to the metric function.
+    max_concurrency : int, optional
+        Maximum number of requests in flight at the same time. The default is
+        set in the config file.
+
+    Returns
+    -------
+    dict of {str : double}
+        The score for each of args (NaN if any of the aircraft specified in
+        the argument does not exist in the simulation).
+
+    Notes
+    -----
+    The requests are made on the background batch event loop (see
+    ``batch_results()``) over the current client's connection pool.
+    """
+    if max_concurrency is None:
+        max_concurrency = config.metrics_max_concurrency
+    client = get_client()
+    args = list(dict.fromkeys(args))
+    results = batch_results(
+        [_bind(client, _async_metrics_call)(metric, arg) for arg in args],
+        max_concurrency,
+    )
+    return dict(zip(args, _bulk_scores(results)))
+
+
+def _bulk_scores(results):
+    """Return the scores of a list of metric call results, or raise the first error."""
+    for res in results:
+        if not res.success:
+            raise res.error
+    return [res.result for res in results]
+
+
+def _pair_arg(from_aircraft_id, to_aircraft_id):
+    """Format a pair of aircraft IDs as a metric function argument."""
+    return "{},{}".format(from_aircraft_id, to_aircraft_id)
+
+
+def _pair_args(from_aircraft_id, to_aircraft_id):
+    """Get the metric function arguments of all from/to pairs of aircraft IDs."""
+    return [
+        _pair_arg(from_id, to_id)
+        for from_id in from_aircraft_id
+        for to_id in to_aircraft_id
+    ]
+
+
+def _pair_scores_df(from_aircraft_id, to_aircraft_id, scores):
+    """
+    Arrange the scores of all from/to pairs of aircraft IDs (a dict keyed by
+    metric argument) in a dataframe with from_aircraft_id as row names and
+    to_aircraft_id as column names.
+    """
+    return pd.DataFrame(
+        [
+            [scores[_pair_arg(from_id, to_id)] for to_id in to_aircraft_id]
+            for from_id in from_aircraft_id
+        ],
+        index=from_aircraft_id,
+        columns=to_aircraft_id,
+        dtype=float,
+    )
+
+
+def _scores_series(aircraft_id, scores):
+    """
+    Arrange the scores of a list of aircraft IDs (a dict keyed by aircraft ID)
+    in a series indexed by aircraft ID.
+    """
+    return pd.Series(
+        [scores[aircraft] for aircraft in aircraft_id], index=aircraft_id, dtype=float
+    )
+
+
+def _handle_metrics_call(metric, status_code, text):
+    """
+    Check the status of a BlueBird METRIC endpoint response and return the score.
+
+    Parameters
+    ----------
+    metric: str
+        Name of the metric.
+    status_code : int
+        The HTTP status code of the response.
+    text : str
+        The body of the response.
+
+    Returns
+    -------
+    double:
+        See ``_metrics_call()``.
+    """
+    if status_code == 200:
+        json_data = json.loads(text)
         score = json_data[metric]
-    elif resp.status_code == config_param("status_code_no_aircraft_found"):
+    elif status_code == config.status_code_no_aircraft_found:
         score = np.nan
     else:
-        raise requests.HTTPError(resp.text)
+        raise requests.HTTPError(text)
     return score
 
 
-def loss_of_separation(from_aircraft_id, to_aircraft_id):
+def loss_of_separation(from_aircraft_id, to_aircraft_id, max_concurrency=None):
     """
     Get loss of separation score between two aircraft.
 
     Parameters
     ----------
-    from_aircraft_id: str
-        A string aircraft identifier.
-    to_aircraft_id: str
-        A string aircraft identifier.
+    from_aircraft_id: str, [str]
+        A string aircraft identifier or a list of aircraft identifiers.
+    to_aircraft_id: str, [str]
+        A string aircraft identifier or a list of aircraft identifiers.
+    max_concurrency : int, optional
+        Maximum number of requests in flight at the same time when scoring
+        lists of aircraft. The default is set in the config file.
 
     Returns
     -------
-    double
+    double, pandas.DataFrame
         A loss of separation score between two aircraft (NaN if one of the
-        aircraft IDs does not exist in the simulation).
+        aircraft IDs does not exist in the simulation). If a list of aircraft
+        IDs is given, a dataframe with from_aircraft_id as row names and
+        to_aircraft_id as column names of the score of each pair.
 
     Notes
     -----
     If an invalid ID is given, or the call to Bluebird fails, an exception is
     thrown.
 
+    The scores of lists of aircraft are requested concurrently, one request
+    per pair. See ``loss_of_separation_matrix()`` to compute them locally.
+
     Examples
     --------
     >>> pydodo.loss_of_separation('BAW123', 'KLM456')
+    >>> pydodo.loss_of_separation(['BAW123', 'KLM456'], ['EZY789', 'KLM456'])
     """
-    utils._validate_id(from_aircraft_id)
-    utils._validate_id(to_aircraft_id)
+    if isinstance(from_aircraft_id, str) and isinstance(to_aircraft_id, str):
+        utils._validate_id(from_aircraft_id)
+        utils._validate_id(to_aircraft_id)
 
-    return _metrics_call(
-        config_param("loss_of_separation"),
-        "{},{}".format(from_aircraft_id, to_aircraft_id)
+        return _metrics_call(
+            config.loss_of_separation, _pair_arg(from_aircraft_id, to_aircraft_id)
         )
 
+    from_aircraft_id, to_aircraft_id = _parse_pair_lists(
+        from_aircraft_id, to_aircraft_id
+    )
+    scores = _bulk_metrics_call(
+        config.loss_of_separation,
+        _pair_args(from_aircraft_id, to_aircraft_id),
+        max_concurrency,
+    )
+    return _pair_scores_df(from_aircraft_id, to_aircraft_id, scores)
+
 
-def sector_exit(aircraft_id):
+def _parse_pair_lists(from_aircraft_id, to_aircraft_id):
+    """Validate the from/to aircraft IDs and return them as lists."""
+    utils._validate_id_list(from_aircraft_id)
+    utils._validate_id_list(to_aircraft_id)
+    if not isinstance(from_aircraft_id, list):
+        from_aircraft_id = [from_aircraft_id]
+    if not isinstance(to_aircraft_id, list):
+        to_aircraft_id = [to_aircraft_id]
+    return from_aircraft_id, to_aircraft_id
+
+
+def sector_exit(aircraft_id, max_concurrency=None):
     """
     Return sector exit metric for aircraft.
 
     Parameters
     ----------
-    aircraft_id: str
-        A string aircraft identifier.
+    aircraft_id: str, [str]
+        A string aircraft identifier or a list of aircraft identifiers.
+    max_concurrency : int, optional
+        Maximum number of requests in flight at the same time when scoring a
+        list of aircraft. The default is set in the config file.
 
     Returns
     -------
-    double
+    double, pandas.Series
         A sector exit score for aircraft (NaN if the aircraft_id does not exist
-        in the simulation or the aircraft has not yet exited sector).
+        in the simulation or the aircraft has not yet exited sector). If a list
+        of aircraft IDs is given, a series of scores indexed by aircraft ID.
 
     Notes
     -----
     If an invalid ID is given, or the call to Bluebird fails, an exception is
     thrown.
 
+    The scores of a list of aircraft are requested concurrently.
+
     Examples
     --------
     >>> pydodo.sector_exit('BAW123')
+    >>> pydodo.sector_exit(['BAW123', 'KLM456'])
     """
-    utils._validate_id(aircraft_id)
+    utils._validate_id_list(aircraft_id)
 
-    return _metrics_call(config_param("sector_exit"), aircraft_id)
+    if isinstance(aircraft_id, str):
+        return _metrics_call(config.sector_exit, aircraft_id)
 
+    scores = _bulk_metrics_call(config.sector_exit, aircraft_id, max_concurrency)
+    return _scores_series(aircraft_id, scores)
 
-def fuel_efficiency(aircraft_id):
+
+def fuel_efficiency(aircraft_id, max_concurrency=None):
     """
     Return a fuel_efficiency score for aircraft.
 
     Parameters
     ----------
-    aircraft_id: str
-        A string aircraft identifier.
+    aircraft_id: str, [str]
+        A string aircraft identifier or a list of aircraft identifiers.
+    max_concurrency : int, optional
+        Maximum number of requests in flight at the same time when scoring a
+        list of aircraft. The default is set in the config file.
 
     Returns
     -------
-    double
+    double, pandas.Series
         A fuel efficiency score for aircraft (NaN if the aircraft_id does not exist
-        in the simulation).
+        in the simulation). If a list of aircraft IDs is given, a series of
+        scores indexed by aircraft ID.
 
     Notes
     -----
     If an invalid ID is given, or the call to Bluebird fails, an exception is
     thrown.
 
+    The scores of a list of aircraft are requested concurrently.
+
     Examples
     --------
     >>> pydodo.fuel_efficiency('BAW123')
+    >>> pydodo.fuel_efficiency(['BAW123', 'KLM456'])
     """
-    utils._validate_id(aircraft_id)
+    utils._validate_id_list(aircraft_id)
+
+    if isinstance(aircraft_id, str):
+        return _metrics_call(config.fuel_efficiency, aircraft_id)
 
-    return _metrics_call(config_param("fuel_efficiency"), aircraft_id)
+    scores = _bulk_metrics_call(config.fuel_efficiency, aircraft_id, max_concurrency)
+    return _scores_series(aircraft_id, scores)
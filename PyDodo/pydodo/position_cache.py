@@ -0,0 +1,165 @@
+import time
+import asyncio
+import weakref
+import threading
+
+from .config_param import config
+from .derived_positions import _DerivedPositions
+
+
+class PositionCache:
+    """
+    Cache of the latest all-aircraft response of a BlueBird POS endpoint.
+
+    A cached response is served until a command is sent to BlueBird (any POST
+    request, e.g. ``simulation_step()``, ``reset_simulation()``,
+    ``create_aircraft()`` or an aircraft control command) or until it is older
+    than ``max_age`` seconds of wall-clock time, whichever comes first.
+
+    Parameters
+    ----------
+    max_age : double, optional
+        Maximum age of a cached response in seconds. The default is set in the
+        config file.
+
+    Notes
+    -----
+    Responses are keyed on their scenario time: a response for an earlier
+    scenario time than the cached one, or one requested before the cache was
+    last invalidated, is never cached.
+
+    Concurrent fetches share one request: while a thread (or a task of an
+    event loop) fetches the positions, the others wait for its response.
+    """
+
+    def __init__(self, max_age=None):
+        if max_age is None:
+            max_age = config.position_cache_max_age
+        assert max_age >= 0, "Invalid value {} for max_age".format(max_age)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._response = None
+        self._scenario_time = None
+        self._requested_at = None
+        self._invalidated_at = time.monotonic()
+        self._derived = None
+        self._fetch_lock = threading.Lock()
+        # asyncio locks are bound to the event loop they are used in
+        self._async_fetch_locks = weakref.WeakKeyDictionary()
+
+    def get(self):
+        """
+        Get the cached response, None if there is none or it has expired.
+
+        Returns
+        -------
+        dict of {str : dict}
+            A copy of the cached response (see ``_position_call()``).
+        """
+        with self._lock:
+            if self._response is None:
+                return None
+            if time.monotonic() - self._requested_at > self.max_age:
+                self._response = None
+                return None
+            return dict(self._response)
+
+    def put(self, response, requested_at):
+        """
+        Cache a response.
+
+        Parameters
+        ----------
+        response : dict of {str : dict}
+            A response from the POS endpoint for all aircraft.
+        requested_at : double
+            The ``time.monotonic()`` time the request was sent.
+
+        Returns
+        -------
+        TRUE if the response was cached.
+        """
+        scenario_time = response.get(config.simulator_time)
+        with self._lock:
+            if requested_at < self._invalidated_at:
+                return False
+            if (
+                self._response is not None
+                and scenario_time is not None
+                and self._scenario_time is not None
+                and scenario_time < self._scenario_time
+            ):
+                return False
+            self._response = dict(response)
+            self._scenario_time = scenario_time
+            self._requested_at = requested_at
+        return True
+
+    def invalidate(self):
+        """Drop the cached response."""
+        with self._lock:
+            self._response = None
+            self._scenario_time = None
+            self._derived = None
+            self._invalidated_at = time.monotonic()
+
+    def derived_positions(self, lat, lon):
+        """
+        Get the coordinates derived from the positions of the cached response
+        (see ``derived_positions._DerivedPositions``), shared by all the
+        snapshots built from it.
+
+        Parameters
+        ----------
+        lat : numpy.ndarray
+            The latitudes of the aircraft in a snapshot.
+        lon : numpy.ndarray
+            The longitudes of the aircraft in a snapshot.
+        """
+        with self._lock:
+            derived = self._derived
+            if derived is None or not derived.matches(lat, lon):
+                derived = self._derived = _DerivedPositions(lat, lon)
+        return derived
+
+    @property
+    def scenario_time(self):
+        """The scenario time of the cached response, None if there is none."""
+        return self._scenario_time
+
+    def fetch(self, position_call):
+        """
+        Get the cached response, calling ``position_call()`` (and caching its
+        result) if there is none or it has expired.
+        """
+        response = self.get()
+        if response is None:
+            with self._fetch_lock:
+                # another thread may have fetched while this one waited
+                response = self.get()
+                if response is None:
+                    requested_at = time.monotonic()
+                    response = position_call()
+                    self.put(response, requested_at)
+        return response
+
+    async def async_fetch(self, position_call):
+        """Coroutine version of ``fetch()`` for an asynchronous position_call."""
+        response = self.get()
+        if response is None:
+            async with self._async_fetch_lock():
+                response = self.get()
+                if response is None:
+                    requested_at = time.monotonic()
+                    response = await position_call()
+                    self.put(response, requested_at)
+        return response
+
+    def _async_fetch_lock(self):
+        """Get the fetch lock of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            lock = self._async_fetch_locks.get(loop)
+            if lock is None:
+                lock = self._async_fetch_locks[loop] = asyncio.Lock()
+        return lock
@@ -0,0 +1,187 @@
+import time
+import asyncio
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .client import _bind, get_client
+from .request_position import all_positions
+from .simulation_control import simulation_step
+
+PositionDelta = namedtuple("PositionDelta", ["sim_t", "new", "removed", "changed"])
+PositionDelta.__doc__ = """
+Change in the aircraft positions between two polls of BlueBird.
+
+Attributes
+----------
+sim_t : int
+    The simulator time in seconds since the start of the scenario.
+new : pandas.DataFrame
+    The positions of aircraft which were not in the previous snapshot, with
+    the same index and columns as ``all_positions()``. Missing values are NaN.
+removed : [str]
+    The IDs of aircraft which are no longer in the simulation.
+changed : dict of {str : pandas.Series}
+    For each position column with a changed value, the new values of the
+    aircraft whose value changed, indexed by aircraft ID.
+"""
+
+
+def _changed_mask(previous, current):
+    """Element-wise mask of the values which differ (NaN equals NaN)."""
+    if previous.dtype.kind == "f" and current.dtype.kind == "f":
+        return (previous != current) & ~(np.isnan(previous) & np.isnan(current))
+    return np.asarray(previous != current, dtype=bool)
+
+
+def _position_delta(previous, current):
+    """
+    Get the change between two snapshots of positions in the ``"arrays"``
+    format of ``all_positions()``.
+
+    Returns
+    -------
+    PositionDelta
+        None if neither the positions nor the simulator time changed.
+    """
+    ids = current["aircraft_id"]
+    columns = [col for col in current if col not in ("aircraft_id", "sim_t")]
+
+    if np.array_equal(previous["aircraft_id"], ids):
+        # the common case: the same aircraft in the same order
+        prev_idx = cur_idx = slice(None)
+        is_new = np.zeros(len(ids), dtype=bool)
+        removed = []
+    else:
+        prev_ids = pd.Index(previous["aircraft_id"])
+        cur_ids = pd.Index(ids)
+        match = prev_ids.get_indexer(cur_ids)
+        is_new = match == -1
+        cur_idx = np.flatnonzero(~is_new)
+        prev_idx = match[cur_idx]
+        removed = list(prev_ids[cur_ids.get_indexer(prev_ids) == -1])
+
+    changed = {}
+    for col in columns:
+        cur_values = current[col][cur_idx]
+        if col in previous:
+            is_changed = _changed_mask(previous[col][prev_idx], cur_values)
+        else:
+            is_changed = np.ones(len(cur_values), dtype=bool)
+        if is_changed.any():
+            changed_idx = np.flatnonzero(is_changed)
+            changed[col] = pd.Series(
+                cur_values[changed_idx], index=ids[cur_idx][changed_idx], name=col
+            )
+
+    new = pd.DataFrame(
+        {col: current[col][is_new] for col in columns}, index=ids[is_new]
+    )
+
+    if (
+        not new.empty
+        or removed
+        or changed
+        or current["sim_t"] != previous.get("sim_t")
+    ):
+        return PositionDelta(current["sim_t"], new, removed, changed)
+    return None
+
+
+def _empty_snapshot():
+    """A snapshot with no aircraft, so the first delta holds all aircraft as new."""
+    return {"aircraft_id": np.array([], dtype=str), "sim_t": None}
+
+
+def _validate_stream_args(interval, on_step):
+    assert interval is not None or on_step, "Either interval or on_step must be given"
+    if interval is not None:
+        assert interval >= 0, "Invalid value {} for interval".format(interval)
+
+
+def stream_positions(interval=None, on_step=False):
+    """
+    Poll the aircraft positions and yield what changed since the last poll.
+
+    Parameters
+    ----------
+    interval : double, optional
+        Wall-clock time in seconds between polls. Polls are scheduled at a
+        fixed rate, so the time taken by a poll does not add to the interval.
+    on_step : bool, optional
+        If TRUE, step the simulation forward (see ``simulation_step()``)
+        before every poll but the first. Can only be used if the simulator is
+        in agent mode.
+
+    Returns
+    -------
+    generator of PositionDelta
+        An endless generator of position deltas (see ``PositionDelta``). The
+        first delta holds all aircraft in the simulation as new aircraft.
+        Polls which find neither the positions nor the simulator time changed
+        are skipped.
+
+    Notes
+    -----
+    The previous snapshot is kept as one array per column (see the
+    ``"arrays"`` output of ``all_positions()``), so finding the changes takes a
+    vectorised comparison per column and consumers only process the changes.
+    Flight levels which are not set are NaN rather than None.
+
+    The generator talks to the client that is current when it is created.
+
+    Examples
+    --------
+    >>> for delta in pydodo.stream_positions(interval = 0.5):
+    >>>     print(delta.sim_t, list(delta.new.index), delta.removed)
+    >>> for delta in pydodo.stream_positions(on_step = True):
+    >>>     print(delta.changed.get("latitude"))
+    """
+    _validate_stream_args(interval, on_step)
+
+    client = get_client()
+    poll = _bind(client, all_positions)
+    step = _bind(client, simulation_step)
+    return _stream_positions(poll, step, interval, on_step)
+
+
+def _stream_positions(poll, step, interval, on_step):
+    snapshot = _empty_snapshot()
+    next_poll = time.monotonic()
+    while True:
+        current = poll(output="arrays")
+        delta = _position_delta(snapshot, current)
+        snapshot = current
+        if delta is not None:
+            yield delta
+
+        if interval is not None:
+            next_poll += interval
+            time.sleep(max(0, next_poll - time.monotonic()))
+        if on_step:
+            step()
+
+
+async def _async_stream_positions(poll, step, interval, on_step):
+    """
+    Asynchronous iterator version of ``_stream_positions()`` for coroutine
+    poll and step functions.
+    """
+    _validate_stream_args(interval, on_step)
+
+    snapshot = _empty_snapshot()
+    next_poll = time.monotonic()
+    while True:
+        current = await poll(output="arrays")
+        delta = _position_delta(snapshot, current)
+        snapshot = current
+        if delta is not None:
+            yield delta
+
+        if interval is not None:
+            next_poll += interval
+            await asyncio.sleep(max(0, next_poll - time.monotonic()))
+        if on_step:
+            await step()
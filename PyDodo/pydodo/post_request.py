@@ -1,6 +1,15 @@
 import requests
 
-from .bluebird_connect import construct_endpoint_url
+from .bluebird_connect import construct_endpoint_url, get_session, get_async_session
+from .client import get_client
+
+
+def _invalidate_position_cache():
+    """Drop the current client's cached positions, if any."""
+    client = get_client()
+    client._wait_cache.invalidate()
+    if client.position_cache is not None:
+        client.position_cache.invalidate()
 
 
 def post_request(endpoint, body=None):
@@ -18,17 +27,55 @@ def post_request(endpoint, body=None):
     -------
     TRUE if successful. Otherwise an exception is thrown.
 
+    Notes
+    -----
+    The current client's cached aircraft positions (if any) are invalidated.
+
     Examples
     --------
-    >>> endpoint = pydodo.config_param.config_param("endpoint_create_aircraft")
+    >>> endpoint = pydodo.config.endpoint_create_aircraft
     >>> body = {"callsign"="BAW123", "type"="B744", "lat"=0, "lon"=0, "hdg"=0, "alt"=20000, "spd"=240}
     >>> pydodo.utils.post_request(endpoint = endpoint, body = body)
     """
     url = construct_endpoint_url(endpoint)
-    resp = requests.post(url, json=body)
+    resp = get_session().post(url, json=body)
+    _invalidate_position_cache()
     # if response is 4XX or 5XX, raise exception
     try:
         resp.raise_for_status()
     except requests.exceptions.HTTPError as e:
         raise Exception(f"BlueBird returned '{resp.text}'") from e
     return True
+
+
+async def async_post_request(endpoint, body=None):
+    """
+    Make a POST requests to the BlueBird API using the shared aiohttp session.
+
+    Parameters
+    ----------
+    endpoint : str
+        The Bluebird API endpoing to call.
+    body : str
+        A dictionary.
+
+    Returns
+    -------
+    TRUE if successful. Otherwise an exception is thrown.
+
+    Notes
+    -----
+    The current client's cached aircraft positions (if any) are invalidated.
+
+    Examples
+    --------
+    >>> await pydodo.post_request.async_post_request(endpoint = "step")
+    """
+    url = construct_endpoint_url(endpoint)
+    session = get_async_session()
+    async with session.post(url, json=body, raise_for_status=False) as resp:
+        _invalidate_position_cache()
+        # if response is 4XX or 5XX, raise exception
+        if resp.status >= 400:
+            raise Exception(f"BlueBird returned '{await resp.text()}'")
+    return True
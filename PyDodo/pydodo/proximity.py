@@ -0,0 +1,378 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from . import utils
+from .config_param import config
+from .derived_positions import _derived_positions, _filter_positions
+from .distance_measures import (
+    _EARTH_RADIUS,
+    _FLATTENING,
+    _ECEF_distance,
+    _altitude_to_metres,
+)
+from .geodesic import _ellipsoid_distance_reduced
+from .request_position import aircraft_position, all_positions
+
+_PROXIMITY_COLUMNS = [
+    "from_aircraft_id",
+    "to_aircraft_id",
+    "lateral",
+    "vertical",
+    "euclidean",
+]
+
+
+def proximity_pairs(
+    lateral,
+    vertical=None,
+    aircraft_id=None,
+    major_semiaxis=_EARTH_RADIUS,
+    flattening=_FLATTENING,
+):
+    """
+    Get all pairs of aircraft within a lateral and vertical distance of each
+    other.
+
+    Parameters
+    ----------
+    lateral : double
+        A non-negative double. Maximum lateral (geodesic) distance in metres.
+    vertical : double, optional
+        A non-negative double. Maximum vertical distance in metres. If not
+        provided, pairs are not filtered by vertical distance.
+    aircraft_id : str, [str], optional
+        A string or list of strings of aircraft IDs to consider. If not
+        provided, all aircraft in the simulation are considered.
+    major_semiaxis : double, optional
+        The major (equatorial) radius of the ellipsoid. The default value is for WGS84.
+    flattening : double, optional
+        Ellipsoid flattening. The default value is for WGS84.
+
+    Returns
+    -------
+    pandas.DataFrame
+        A dataframe with one row per pair of aircraft (each pair appears once)
+        and columns:
+    | - ``from_aircraft_id``: A string aircraft identifier.
+    | - ``to_aircraft_id``: A string aircraft identifier.
+    | - ``lateral``: The geodesic distance between the aircraft in metres.
+    | - ``vertical``: The vertical distance between the aircraft in metres.
+    | - ``euclidean``: The euclidean (ECEF) distance between the aircraft in metres.
+
+    Notes
+    -----
+    Candidate pairs are found with a k-d tree of the aircraft ECEF
+    coordinates, so the cost grows with the number of aircraft and of nearby
+    pairs (roughly O(n log n)) rather than with the number of all pairs.
+
+    Aircraft IDs which do not exist in the simulation are ignored.
+
+    Examples
+    --------
+    >>> pydodo.proximity_pairs(lateral = 9260, vertical = 304.8)
+    >>> pydodo.proximity_pairs(lateral = 9260, aircraft_id = ["BAW123", "KLM456"])
+    """
+    if aircraft_id is None:
+        pos_df = all_positions()
+    else:
+        utils._validate_id_list(aircraft_id)
+        if not isinstance(aircraft_id, list):
+            aircraft_id = [aircraft_id]
+        pos_df = aircraft_position(aircraft_id)
+
+    return _proximity_from_pos(
+        _altitude_to_metres(pos_df), lateral, vertical, major_semiaxis, flattening
+    )
+
+
+def _lateral_distance(
+    from_derived, from_idx, to_derived, to_idx, major_semiaxis, flattening
+):
+    """
+    Geodesic distance between the aircraft at from_idx and to_idx of two
+    snapshots, from their derived coordinates (see
+    ``derived_positions._DerivedPositions``).
+    """
+    return _ellipsoid_distance_reduced(
+        from_derived.lat[from_idx],
+        from_derived.lon[from_idx],
+        to_derived.lat[to_idx],
+        to_derived.lon[to_idx],
+        from_derived.reduced_coordinates(flattening, from_idx),
+        to_derived.reduced_coordinates(flattening, to_idx),
+        major_semiaxis,
+        flattening,
+    )
+
+
+def _proximity_from_pos(pos_df, lateral, vertical, major_semiaxis, flattening):
+    """
+    Get all pairs of aircraft within a lateral and vertical distance of each
+    other from a dataframe of positions (with altitude in metres). See
+    ``proximity_pairs()``.
+    """
+    utils._validate_is_positive(lateral, "lateral")
+    if vertical is not None:
+        utils._validate_is_positive(vertical, "vertical")
+    utils._validate_is_positive(major_semiaxis, "major_semiaxis")
+    utils._validate_is_positive(flattening, "flattening")
+
+    pos_df = _located_positions(pos_df)
+    aircraft_id = pos_df.index.to_numpy()
+    lat = pos_df[config.latitude].to_numpy(dtype=float)
+    lon = pos_df[config.longitude].to_numpy(dtype=float)
+    alt = pos_df[config.current_flight_level].to_numpy(dtype=float)
+
+    utils._validate_latitude(lat)
+    utils._validate_longitude(lon)
+    utils._validate_is_positive(alt, "altitude")
+
+    if len(aircraft_id) < 2:
+        return pd.DataFrame({col: [] for col in _PROXIMITY_COLUMNS})
+
+    derived = _derived_positions(pos_df)
+    xyz = np.column_stack(derived.ecef(alt, major_semiaxis, flattening))
+
+    # Search radius bounding the ECEF distance of any pair within the limits:
+    # the chord between the surface points is at most the geodesic, the
+    # normals at them diverge by at most geodesic / (minimum radius of
+    # curvature), and altitudes add at most the vertical distance.
+    min_curvature_radius = major_semiaxis * (1 - flattening) ** 2
+    vertical_bound = np.ptp(alt) if vertical is None else vertical
+    radius = lateral * (1 + alt.max() / min_curvature_radius) + vertical_bound
+
+    pairs = cKDTree(xyz).query_pairs(radius, output_type="ndarray")
+    pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+    from_idx, to_idx = pairs[:, 0], pairs[:, 1]
+
+    lateral_d = _lateral_distance(
+        derived, from_idx, derived, to_idx, major_semiaxis, flattening
+    )
+    vertical_d = np.abs(alt[from_idx] - alt[to_idx])
+    keep = lateral_d <= lateral
+    if vertical is not None:
+        keep &= vertical_d <= vertical
+    from_idx, to_idx = from_idx[keep], to_idx[keep]
+
+    return pd.DataFrame(
+        {
+            "from_aircraft_id": aircraft_id[from_idx],
+            "to_aircraft_id": aircraft_id[to_idx],
+            "lateral": lateral_d[keep],
+            "vertical": vertical_d[keep],
+            "euclidean": _ECEF_distance(xyz[from_idx].T, xyz[to_idx].T),
+        },
+        columns=_PROXIMITY_COLUMNS,
+    )
+
+
+def _located_positions(pos_df):
+    """
+    Get the rows of a dataframe of positions with a known latitude, longitude
+    and altitude, sharing its derived coordinates.
+    """
+    columns = [config.latitude, config.longitude, config.current_flight_level]
+    return _filter_positions(pos_df, pos_df[columns].notna().all(axis=1))
+
+
+def _largest_two_sum(values):
+    """The sum of the two largest values of an array (the largest if only one)."""
+    if len(values) == 0:
+        return 0
+    return sum(heapq.nlargest(2, values))
+
+
+class ProximityTracker:
+    """
+    Track the pairs of aircraft within a lateral and vertical distance of each
+    other across simulation steps.
+
+    The tracker keeps a list of candidate pairs (a Verlet neighbour list): the
+    pairs within the distances plus a safety skin when the list was built.
+    Each update only computes the separation of the candidates, and the list
+    is only rebuilt once the aircraft may have moved far enough to close the
+    skin, or when new aircraft appear.
+
+    Parameters
+    ----------
+    lateral : double
+        A non-negative double. Maximum lateral (geodesic) distance in metres.
+    vertical : double, optional
+        A non-negative double. Maximum vertical distance in metres. If not
+        provided, pairs are not filtered by vertical distance.
+    lateral_skin : double, optional
+        A non-negative double. Lateral safety skin in metres. The default is
+        set in the config file.
+    vertical_skin : double, optional
+        A non-negative double. Vertical safety skin in metres. The default is
+        set in the config file.
+    major_semiaxis : double, optional
+        The major (equatorial) radius of the ellipsoid. The default value is for WGS84.
+    flattening : double, optional
+        Ellipsoid flattening. The default value is for WGS84.
+
+    Attributes
+    ----------
+    n_rebuilds : int
+        Number of times the candidate list was built.
+    n_candidates : int
+        Number of candidate pairs in the current list.
+
+    Notes
+    -----
+    The separation of two aircraft can only have decreased by the sum of their
+    displacements since the list was built, so the list stays valid while the
+    two largest lateral (vertical) displacements add up to at most the lateral
+    (vertical) skin. A larger skin means fewer rebuilds but more candidates.
+
+    Examples
+    --------
+    >>> tracker = pydodo.ProximityTracker(lateral = 9260, vertical = 304.8)
+    >>> for _ in range(100):
+    >>>     pydodo.simulation_step()
+    >>>     pairs = tracker.update()
+    """
+
+    def __init__(
+        self,
+        lateral,
+        vertical=None,
+        lateral_skin=None,
+        vertical_skin=None,
+        major_semiaxis=_EARTH_RADIUS,
+        flattening=_FLATTENING,
+    ):
+        if lateral_skin is None:
+            lateral_skin = config.proximity_lateral_skin
+        if vertical_skin is None:
+            vertical_skin = config.proximity_vertical_skin
+        for name, value in [
+            ("lateral", lateral),
+            ("lateral_skin", lateral_skin),
+            ("vertical_skin", vertical_skin),
+            ("major_semiaxis", major_semiaxis),
+            ("flattening", flattening),
+        ]:
+            utils._validate_is_positive(value, name)
+        if vertical is not None:
+            utils._validate_is_positive(vertical, "vertical")
+
+        self.lateral = lateral
+        self.vertical = vertical
+        self.lateral_skin = lateral_skin
+        self.vertical_skin = vertical_skin
+        self.major_semiaxis = major_semiaxis
+        self.flattening = flattening
+        self.n_rebuilds = 0
+        self._reference = None
+        self._from_id = self._to_id = np.array([], dtype=object)
+
+    @property
+    def n_candidates(self):
+        return len(self._from_id)
+
+    def update(self, pos_df=None):
+        """
+        Get the pairs of aircraft within the lateral and vertical distance.
+
+        Parameters
+        ----------
+        pos_df : pandas.DataFrame, optional
+            Aircraft positions as returned by ``all_positions()``. If not
+            provided, the positions of all aircraft are requested.
+
+        Returns
+        -------
+        pandas.DataFrame
+            The pairs, as returned by ``proximity_pairs()``.
+        """
+        if pos_df is None:
+            pos_df = all_positions()
+        pos_df = _located_positions(pos_df)
+        derived = _derived_positions(pos_df)
+        pos_df = _altitude_to_metres(pos_df.copy())
+        pos_df._derived = derived
+        if self._needs_rebuild(pos_df):
+            self._rebuild(pos_df)
+        return self._candidate_separation(pos_df)
+
+    def _needs_rebuild(self, pos_df):
+        """Check if the candidate list may have missed a pair."""
+        if self._reference is None:
+            return True
+        ref = self._reference
+        idx = ref.index.get_indexer(pos_df.index)
+        if (idx == -1).any():
+            # aircraft which were not screened when the list was built
+            return True
+
+        lateral_d = _lateral_distance(
+            _derived_positions(ref),
+            idx,
+            _derived_positions(pos_df),
+            slice(None),
+            self.major_semiaxis,
+            self.flattening,
+        )
+        if _largest_two_sum(lateral_d) > self.lateral_skin:
+            return True
+        if self.vertical is None:
+            return False
+        vertical_d = np.abs(
+            ref[config.current_flight_level].to_numpy()[idx]
+            - pos_df[config.current_flight_level].to_numpy(dtype=float)
+        )
+        return _largest_two_sum(vertical_d) > self.vertical_skin
+
+    def _rebuild(self, pos_df):
+        """Build the candidate list: the pairs within the distances plus skin."""
+        candidates = _proximity_from_pos(
+            pos_df,
+            self.lateral + self.lateral_skin,
+            None if self.vertical is None else self.vertical + self.vertical_skin,
+            self.major_semiaxis,
+            self.flattening,
+        )
+        self._from_id = candidates["from_aircraft_id"].to_numpy()
+        self._to_id = candidates["to_aircraft_id"].to_numpy()
+        self._reference = pos_df[
+            [config.latitude, config.longitude, config.current_flight_level]
+        ].astype(float)
+        self._reference._derived = _derived_positions(pos_df)
+        self.n_rebuilds += 1
+
+    def _candidate_separation(self, pos_df):
+        """Get the candidate pairs within the distances."""
+        from_idx = pos_df.index.get_indexer(self._from_id)
+        to_idx = pos_df.index.get_indexer(self._to_id)
+        # aircraft may have left the simulation
+        present = (from_idx != -1) & (to_idx != -1)
+        from_idx, to_idx = from_idx[present], to_idx[present]
+
+        alt = pos_df[config.current_flight_level].to_numpy(dtype=float)
+        derived = _derived_positions(pos_df)
+
+        lateral_d = _lateral_distance(
+            derived, from_idx, derived, to_idx, self.major_semiaxis, self.flattening
+        )
+        vertical_d = np.abs(alt[from_idx] - alt[to_idx])
+        keep = lateral_d <= self.lateral
+        if self.vertical is not None:
+            keep &= vertical_d <= self.vertical
+        from_idx, to_idx = from_idx[keep], to_idx[keep]
+
+        xyz = np.array(derived.ecef(alt, self.major_semiaxis, self.flattening))
+        aircraft_id = pos_df.index.to_numpy()
+        return pd.DataFrame(
+            {
+                "from_aircraft_id": aircraft_id[from_idx],
+                "to_aircraft_id": aircraft_id[to_idx],
+                "lateral": lateral_d[keep],
+                "vertical": vertical_d[keep],
+                "euclidean": _ECEF_distance(xyz[:, from_idx], xyz[:, to_idx]),
+            },
+            columns=_PROXIMITY_COLUMNS,
+        )
@@ -5,10 +5,21 @@ import numpy as np
 import pandas as pd
 
 from . import utils
-from .config_param import config_param
-from .bluebird_connect import construct_endpoint_url
+from .config_param import config
+from .bluebird_connect import construct_endpoint_url, get_session
+from .client import get_client
+from .derived_positions import _select_derived_positions, _share_derived_positions
 
-endpoint = config_param("endpoint_aircraft_position")
+try:
+    # orjson decodes large POS responses several times faster
+    import orjson
+
+    _fast_json_loads = orjson.loads
+except ImportError:
+    _fast_json_loads = json.loads
+
+# the formats _process_pos_response() can return
+_POS_OUTPUTS = ["dataframe", "arrays", "structured"]
 
 
 def _position_call(aircraft_id=None):
@@ -41,27 +52,104 @@ def _position_call(aircraft_id=None):
     >>> pydodo.request_position.position_call()
     >>> pydodo.request_position.position_call("BAW123")
     """
-    url = construct_endpoint_url(endpoint)
+    url = construct_endpoint_url(config.endpoint_aircraft_position)
 
     if aircraft_id == None:
-        resp = requests.get(url)
+        resp = get_session().get(url)
     else:
-        resp = requests.get(
-            url, params={config_param("query_aircraft_id"): aircraft_id}
+        resp = get_session().get(
+            url, params={config.query_aircraft_id: aircraft_id}
         )
-    if resp.status_code == 200:
-        return json.loads(resp.text)
-    elif resp.status_code == config_param("status_code_aircraft_id_not_found") and bool(
-        re.search(config_param("err_msg_aircraft_does_not_exist"), resp.text)
+    return _handle_position_call(resp.status_code, resp.text, aircraft_id)
+
+
+def _handle_position_call(status_code, text, aircraft_id=None):
+    """
+    Check the status of a BlueBird POS endpoint response and decode it.
+
+    Parameters
+    ----------
+    status_code : int
+        The HTTP status code of the response.
+    text : str
+        The body of the response.
+    aircraft_id: str, optional
+        The aircraft identifier the request was made for, or None (the default).
+
+    Returns
+    -------
+    dict of {str : dict}
+        See ``_position_call()``.
+    """
+    if status_code == 200:
+        return _json_loads(text)
+    elif status_code == config.status_code_aircraft_id_not_found and bool(
+        re.search(config.err_msg_aircraft_does_not_exist, text)
     ):
         return {aircraft_id: {}}
-    elif resp.status_code == config_param("status_code_no_aircraft_found"):
+    elif status_code == config.status_code_no_aircraft_found:
         return {}
     else:
-        raise requests.HTTPError(resp.text)
+        raise requests.HTTPError(text)
+
+
+def _json_loads(text):
+    """
+    Decode a JSON document, with orjson if it is installed. Documents orjson
+    rejects (e.g., containing NaN) are decoded with the json module.
+    """
+    try:
+        return _fast_json_loads(text)
+    except ValueError:
+        return json.loads(text)
+
+
+def _pos_col_map():
+    """Map between BlueBird pos names and our pos column names."""
+    return {
+        "actype": config.aircraft_type,
+        "gs": config.ground_speed,
+        "lat": config.latitude,
+        "lon": config.longitude,
+        "vs": config.vertical_speed,
+        "hdg": config.heading,
+        "current_fl": config.current_flight_level,
+        "requested_fl": config.requested_flight_level,
+        "cleared_fl": config.cleared_flight_level,
+    }
+
+
+def _pos_columns(response):
+    """
+    Transpose a BlueBird POS response (without the scenario time) into one
+    list of values per column, in a single pass over the aircraft.
+
+    Returns
+    -------
+    ([str], dict of {str : list})
+        The aircraft IDs and the values of each column (named as in our pos
+        column names). Missing values are NaN.
+    """
+    col_map = _pos_col_map()
+    aircraft_id = list(response.keys())
+    records = list(response.values())
+
+    keys = {}
+    for record in records:
+        if record.keys() != keys.keys():
+            keys.update(dict.fromkeys(record))
+    if not keys:
+        # no position information for any aircraft
+        keys = dict.fromkeys(col_map)
+
+    columns = {
+        col_map.get(key, key): [record.get(key, np.nan) for record in records]
+        for key in keys
+    }
+    return aircraft_id, columns
 
 
-def _process_pos_response(response):
+def _process_pos_response(response, output="dataframe"):
     """
     Process JSON response from BlueBird POS enndpoint request and return the
     aircraft position information as a data frame.
@@ -70,6 +158,9 @@ def _process_pos_response(response):
     ----------
     response : JSON <dict>
         BlueBird response returned by position_call().
+    output : str, optional
+        One of ``["dataframe", "arrays", "structured"]``, see
+        ``all_positions()``.
 
     Returns
     -------
@@ -94,48 +185,199 @@ def _process_pos_response(response):
     If response doesn't contain position information for an aircraft ID, the
     returned dataframe contains a row of missing values for that ID.
     """
-    # map between BlueBird pos names and our pos column names
-    _POS_COL_MAP = {
-        "actype": config_param("aircraft_type"),
-        "gs": config_param("ground_speed"),
-        "lat": config_param("latitude"),
-        "lon": config_param("longitude"),
-        "vs": config_param("vertical_speed"),
-        "hdg": config_param("heading"),
-        "current_fl": config_param("current_flight_level"),
-        "requested_fl": config_param("requested_flight_level"),
-        "cleared_fl": config_param("cleared_flight_level"),
-    }
+    assert output in _POS_OUTPUTS, "Invalid value {} for output".format(output)
 
-    if not bool(response):
-        return pd.DataFrame({col: [] for col in _POS_COL_MAP.values()})
+    response = dict(response)
+    sim_t = response.pop(config.simulator_time, None)
 
-    sim_t = response.pop(config_param("simulator_time"), None)
+    if bool(response):
+        aircraft_id, columns = _pos_columns(response)
+    else:
+        aircraft_id, columns = [], {col: [] for col in _pos_col_map().values()}
+
+    if output == "dataframe":
+        pos_df = pd.DataFrame(columns, index=aircraft_id)
+        if sim_t is not None:
+            pos_df.sim_t = sim_t
+        return pos_df
+
+    arrays = {"aircraft_id": np.array(aircraft_id, dtype=str)}
+    for col, values in columns.items():
+        if col == config.aircraft_type:
+            values = [val if isinstance(val, str) else "" for val in values]
+            arrays[col] = np.array(values, dtype=str)
+        else:
+            try:
+                arrays[col] = np.array(values, dtype=float)
+            except (TypeError, ValueError):
+                arrays[col] = np.array(values, dtype=object)
+
+    if output == "arrays":
+        arrays["sim_t"] = sim_t
+        return arrays
+
+    pos_arr = np.empty(
+        len(aircraft_id), dtype=[(col, arr.dtype) for col, arr in arrays.items()]
+    )
+    for col, arr in arrays.items():
+        pos_arr[col] = arr
+    return pos_arr
+
+
+def _all_positions_call():
+    """
+    Make a call to the BlueBird POS endpoint for all aircraft, or get the
+    response from the current client's position cache if enabled and valid.
+    """
+    client = get_client()
+    cache = client.position_cache
+    if cache is None:
+        response = _position_call()
+    else:
+        response = cache.fetch(_position_call)
+    _record_aircraft_count(client, response)
+    return response
+
+
+def _record_aircraft_count(client, response):
+    """Remember the number of aircraft in an all-aircraft POS response."""
+    client._n_aircraft = len(response) - int(config.simulator_time in response)
+
+
+def _use_filtered_call(client, aircraft_id):
+    """
+    Decide whether to request the positions of a list of aircraft IDs with one
+    filtered call (rather than one call for all aircraft).
+    """
+    if client.position_cache is not None or client._multi_callsign_supported is False:
+        return False
+    n_ids = len(set(aircraft_id))
+    if n_ids > config.position_filter_max_ids:
+        return False
+    return (
+        client._n_aircraft is None
+        or n_ids <= config.position_filter_max_fraction * client._n_aircraft
+    )
+
+
+def _filtered_call_params(aircraft_id):
+    """Query parameters requesting the positions of a list of aircraft IDs."""
+    return {config.query_aircraft_id: ",".join(dict.fromkeys(aircraft_id))}
 
-    pos_dict = {
-        aircraft: (
-            response[aircraft]
-            if bool(response[aircraft])
-            else {col: np.nan for col in _POS_COL_MAP.values()}
-        )
-        for aircraft in response.keys()
-    }
-    pos_df = pd.DataFrame.from_dict(pos_dict, orient="index")
-    pos_df = pos_df.rename(columns=_POS_COL_MAP)
 
+def _is_multi_callsign(aircraft_id):
+    """Check if a filtered call requests more than one aircraft."""
+    return len(set(aircraft_id)) > 1
+
+
+def _handle_filtered_call(client, aircraft_id, status_code, text):
+    """
+    Get the positions of a list of aircraft IDs from the response to a
+    filtered POS call. Return None if the call failed (the fallback is to
+    request all positions, see ``_fallback_positions()``).
+
+    Filtering is only marked as supported by BlueBird after a successful call
+    for more than one aircraft, as any BlueBird accepts a single aircraft ID.
+    """
+    if status_code != 200:
+        return None
+    if _is_multi_callsign(aircraft_id):
+        client._multi_callsign_supported = True
+    return _select_positions(_process_pos_response(_json_loads(text)), aircraft_id)
+
+
+def _fallback_positions(client, aircraft_id, all_pos_df, filtered):
+    """
+    Get the positions of a list of aircraft IDs from a dataframe of all
+    positions.
+
+    If a filtered call for more than one aircraft failed first, mark filtering
+    as unsupported by BlueBird if any of the requested aircraft exists (i.e.,
+    the filtered call should have found it), even if an earlier call
+    succeeded.
+    """
+    if (
+        filtered
+        and _is_multi_callsign(aircraft_id)
+        and all_pos_df.index.isin(aircraft_id).any()
+    ):
+        client._multi_callsign_supported = False
+    return _select_positions(all_pos_df, aircraft_id)
+
+
+def _filtered_position_call(aircraft_id):
+    """
+    Make a call to the BlueBird POS endpoint for a list of aircraft IDs.
+
+    Returns
+    -------
+    (int, str)
+        The status code and text of the response, see
+        ``_handle_filtered_call()``.
+    """
+    url = construct_endpoint_url(config.endpoint_aircraft_position)
+    resp = get_session().get(url, params=_filtered_call_params(aircraft_id))
+    return resp.status_code, resp.text
+
+
+def _select_positions(all_pos_df, aircraft_id):
+    """
+    Get the rows of a list of aircraft IDs from a dataframe of all positions,
+    keeping the ``sim_t`` attribute and sharing the derived coordinates (see
+    ``derived_positions._derived_positions()``).
+    """
+    pos_df = all_pos_df.reindex(aircraft_id)
+    sim_t = getattr(all_pos_df, "sim_t", None)
     if sim_t is not None:
         pos_df.sim_t = sim_t
+    return _select_derived_positions(all_pos_df, pos_df, aircraft_id)
+
+
+def set_position_cache(enabled=True, max_age=None):
+    """
+    Enable or disable caching of aircraft positions.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        If True, ``all_positions()`` and ``aircraft_position()`` are served from
+        a snapshot of all aircraft positions until a command is sent to
+        BlueBird or the snapshot is older than max_age.
+    max_age : double, optional
+        Maximum age of the snapshot in seconds. The default is set in the config
+        file.
+
+    Returns
+    -------
+    TRUE if successful. Otherwise an exception is thrown.
 
-    return pos_df
+    Notes
+    -----
+    The cache is disabled by default (see the ``position_cache`` config
+    parameter). Any POST request to BlueBird (e.g., ``simulation_step()``,
+    ``reset_simulation()``, ``create_aircraft()`` or an aircraft control
+    command) made through PyDodo invalidates the snapshot, but changes made by
+    other BlueBird clients are only seen once the snapshot expires.
+
+    This configures the current client (see ``pydodo.Dodo``).
+
+    Examples
+    --------
+    >>> pydodo.set_position_cache(max_age = 0.5)
+    >>> pydodo.set_position_cache(enabled = False)
+    """
+    return get_client().set_position_cache(enabled, max_age)
 
 
-def all_positions():
+def all_positions(output="dataframe"):
     """
     Get all aircraft positions.
 
     Parameters
     ----------
-    NONE
+    output : str, optional
+        One of ``["dataframe", "arrays", "structured"]`` (see Notes). The
+        default is a dataframe.
 
     Returns
     -------
@@ -160,12 +402,26 @@ def all_positions():
     If the response from Bluebird contains an error status code, an exception is
     thrown.
 
+    If the position cache is enabled (see ``set_position_cache()``), the cached
+    snapshot of all aircraft positions is returned while it is valid.
+
+    For many aircraft, the other output formats avoid building a dataframe:
+    ``"arrays"`` returns a dictionary of numpy arrays with the aircraft IDs in
+    ``aircraft_id``, one array per column and the simulator time in ``sim_t``;
+    ``"structured"`` returns a numpy structured array with an ``aircraft_id``
+    field and one field per column (without the simulator time). Numeric
+    columns are doubles and missing values are NaN (empty strings for
+    ``aircraft_type``).
+
     Examples:
     ---------
     >>> pydodo.all_positions()
+    >>> pydodo.all_positions(output = "arrays")["latitude"]
     """
-    pos = _position_call()
-    return _process_pos_response(pos)
+    pos = _all_positions_call()
+    return _share_derived_positions(
+        _process_pos_response(pos, output), get_client().position_cache
+    )
 
 
 def aircraft_position(aircraft_id):
@@ -202,6 +458,14 @@ def aircraft_position(aircraft_id):
     If an invalid ID is given, or the call to Bluebird fails, an exception is
     thrown.
 
+    If the position cache is enabled (see ``set_position_cache()``), the
+    positions are taken from the cached snapshot of all aircraft positions.
+
+    For a short list of IDs (see the ``position_filter_max_ids`` and
+    ``position_filter_max_fraction`` config parameters), only the listed
+    aircraft are requested from BlueBird. If BlueBird does not support this,
+    all positions are requested instead (and filtering is not tried again).
+
     Examples
     ---------
     >>> pydodo.aircraft_position("BAW123")
@@ -209,8 +473,18 @@ def aircraft_position(aircraft_id):
     utils._validate_id_list(aircraft_id)
 
     if type(aircraft_id) == str:
+        if get_client().position_cache is not None:
+            # BlueBird matches a single aircraft ID case-insensitively
+            return _select_positions(all_positions(), [aircraft_id.upper()])
         pos = _position_call(aircraft_id)
         return _process_pos_response(pos)
     elif type(aircraft_id) == list:
-        all_pos_df = all_positions()  # get all aircraft in simulation
-        return all_pos_df.reindex(aircraft_id)  # filter requested IDs
+        client = get_client()
+        filtered = _use_filtered_call(client, aircraft_id)
+        if filtered:
+            status_code, text = _filtered_position_call(aircraft_id)
+            pos_df = _handle_filtered_call(client, aircraft_id, status_code, text)
+            if pos_df is not None:
+                return pos_df
+        # get all aircraft in simulation and filter requested IDs
+        return _fallback_positions(client, aircraft_id, all_positions(), filtered)
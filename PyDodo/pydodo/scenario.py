@@ -2,7 +2,7 @@ import json
 
 from . import utils
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
 
 
 def create_scenario(filename, scenario):
@@ -31,7 +31,7 @@ def create_scenario(filename, scenario):
         content = json.load(f)
 
     body = {"name": scenario, "content": content}
-    return post_request(config_param("endpoint_create_scenario"), body)
+    return post_request(config.endpoint_create_scenario, body)
 
 
 def load_scenario(scenario, multiplier=1.0):
@@ -62,7 +62,7 @@ def load_scenario(scenario, multiplier=1.0):
     utils._validate_multiplier(multiplier)
 
     body = {"filename": scenario, "multiplier": multiplier}
-    return post_request(config_param("endpoint_load_scenario"), body)
+    return post_request(config.endpoint_load_scenario, body)
 
 
 def upload_scenario(filename, scenario_name):
@@ -84,11 +84,18 @@ def upload_scenario(filename, scenario_name):
     --------
     >>> pydodo.upload_scenario(filename = "~/Documents/test_scenario.json", scenario_name = "test_scenario")
     """
+    body = _upload_scenario_body(filename, scenario_name)
+    return post_request(config.endpoint_create_scenario, body)
+
+
+def _upload_scenario_body(filename, scenario_name):
+    """
+    Validate the ``upload_scenario()`` inputs and return the request body.
+    """
     utils._validate_string(filename, "filename")
     utils._validate_string(scenario_name, "scenario_name")
 
     with open(filename, "r") as f:
         content = json.load(f)
 
-    body = {"name": scenario_name, "content": content}
-    return post_request(config_param("endpoint_create_scenario"), body)
+    return {"name": scenario_name, "content": content}
@@ -1,8 +1,18 @@
 import json
+import logging
+
+import numpy as np
+import pandas as pd
 
 from . import utils
+from .client import get_client
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
+from .request_position import all_positions
+
+_FLIGHT_LEVEL = 100  # feet
+
+logger = logging.getLogger(__name__)
 
 
 def upload_sector(filename, sector_name):
@@ -20,9 +30,27 @@ def upload_sector(filename, sector_name):
     -------
     TRUE if successful. Otherwise an exception is thrown.
 
+    Notes
+    -----
+    Once uploaded, the sector is also kept by the current client as a
+    ``Sector`` (see ``Dodo.sector``), to check which aircraft are inside or
+    have exited it without calling BlueBird. If the sector cannot be read as
+    a ``Sector``, this is logged and the client keeps no sector.
+
     Examples
     --------
     >>> pydodo.upload_sector(filename = "~/Documents/test_sector.geojson", sector_name = "test_sector")
+    >>> pydodo.get_client().sector.update()
+    """
+    body = _upload_sector_body(filename, sector_name)
+    result = post_request(config.endpoint_upload_sector, body)
+    get_client()._sector = _uploaded_sector(body)
+    return result
+
+
+def _upload_sector_body(filename, sector_name):
+    """
+    Validate the ``upload_sector()`` inputs and return the request body.
     """
     utils._validate_string(filename, "filename")
     utils._validate_string(sector_name, "sector_name")
@@ -30,5 +58,232 @@ def upload_sector(filename, sector_name):
     with open(filename, "r") as f:
         content = json.load(f)
 
-    body = {"name": sector_name, "content": content}
-    return post_request(config_param("endpoint_upload_sector"), body)
+    return {"name": sector_name, "content": content}
+
+
+def _uploaded_sector(body):
+    """
+    The ``Sector`` of an uploaded sector, None (after logging why) if its
+    content cannot be read as one: BlueBird may accept sectors which this
+    client does not understand.
+    """
+    try:
+        return Sector(body["content"], body["name"])
+    except (
+        AssertionError,
+        AttributeError,
+        IndexError,
+        KeyError,
+        TypeError,
+        ValueError,
+    ):
+        logger.warning(
+            "Sector %s was uploaded but cannot be checked locally",
+            body["name"],
+            exc_info=True,
+        )
+        return None
+
+
+def _polygon_rings(geometry):
+    """
+    The rings (arrays of (lon, lat) vertices) of a GeoJSON (multi)polygon.
+    Polygons may also be given as a single ring, as in Aviary sectors.
+    """
+    if geometry.get("type") == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry.get("type") == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return []
+    polygons = [
+        [polygon] if np.isscalar(polygon[0][0]) else polygon for polygon in polygons
+    ]
+    return [
+        np.asarray(ring, dtype=float)[:, :2] for polygon in polygons for ring in polygon
+    ]
+
+
+def _position_columns(pos_df):
+    """The latitudes, longitudes and altitudes (feet) of positions as arrays."""
+    return (
+        pos_df[config.latitude].to_numpy(dtype=float),
+        pos_df[config.longitude].to_numpy(dtype=float),
+        pos_df[config.current_flight_level].to_numpy(dtype=float),
+    )
+
+
+def _valid_positions(lat, lon, alt):
+    """Check which positions have a valid latitude, longitude and altitude."""
+    return np.isfinite(alt) & (np.abs(lat) <= 90) & (lon >= -180) & (lon <= 180)
+
+
+class _SectorVolume:
+    """
+    A sector volume prepared for point queries: the edges of its polygon as
+    arrays, its bounding box and its altitude band in feet.
+    """
+
+    def __init__(self, rings, lower_limit, upper_limit):
+        start = np.concatenate(rings)
+        end = np.concatenate([np.roll(ring, -1, axis=0) for ring in rings])
+        # horizontal edges never cross a horizontal ray
+        crossing = start[:, 1] != end[:, 1]
+        self.start, self.end = start[crossing], end[crossing]
+        self.min_lon, self.min_lat = start.min(axis=0)
+        self.max_lon, self.max_lat = start.max(axis=0)
+        self.lower = lower_limit * _FLIGHT_LEVEL
+        self.upper = upper_limit * _FLIGHT_LEVEL
+
+    def contains(self, lat, lon, alt):
+        """Check which points (arrays of lat, lon and alt in feet) are inside."""
+        inside = (
+            (alt >= self.lower)
+            & (alt <= self.upper)
+            & (lat >= self.min_lat)
+            & (lat <= self.max_lat)
+            & (lon >= self.min_lon)
+            & (lon <= self.max_lon)
+        )
+        idx = np.flatnonzero(inside)
+        if not len(idx):
+            return inside
+
+        # even-odd rule: count the edges crossed by a ray going east
+        x, y = lon[idx, np.newaxis], lat[idx, np.newaxis]
+        x1, y1 = self.start[:, 0], self.start[:, 1]
+        x2, y2 = self.end[:, 0], self.end[:, 1]
+        spans = (y1 > y) != (y2 > y)
+        x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        crossings = np.count_nonzero(spans & (x < x_cross), axis=1)
+        inside[idx] = crossings % 2 == 1
+        return inside
+
+
+class Sector:
+    """
+    A sector kept client-side to check which aircraft are inside it, or have
+    exited it, in one call for all aircraft.
+
+    Parameters
+    ----------
+    content : dict
+        The sector definition, a GeoJSON feature collection in the format of
+        ``upload_sector()``.
+    name : str, optional
+        The name of the sector.
+
+    Notes
+    -----
+    An aircraft is inside the sector if it is inside one of its
+    ``SECTOR_VOLUME`` features: inside the polygon (in latitude and longitude)
+    and between the lower and upper limits (flight levels). Polygon edges are
+    straight lines in latitude and longitude.
+
+    ``upload_sector()`` keeps the uploaded sector as the client's ``sector``.
+
+    Examples
+    --------
+    >>> sector = pydodo.Sector.from_file("~/Documents/test_sector.geojson")
+    >>> sector.contains(pydodo.all_positions())
+    >>> pydodo.simulation_step()
+    >>> exited = sector.update()["exited"]
+    """
+
+    def __init__(self, content, name=None):
+        self.name = name
+        self._volumes = [
+            _SectorVolume(
+                _polygon_rings(feature["geometry"]),
+                feature["properties"]["lower_limit"],
+                feature["properties"]["upper_limit"],
+            )
+            for feature in content.get("features", [])
+            if feature.get("properties", {}).get("type") == "SECTOR_VOLUME"
+            and _polygon_rings(feature.get("geometry", {}))
+        ]
+        assert self._volumes, "The sector has no volume"
+        self._inside = pd.Series([], dtype=bool)
+
+    @classmethod
+    def from_file(cls, filename, name=None):
+        """
+        Read a sector from a GeoJSON file.
+
+        Parameters
+        ----------
+        filename : str
+            A string indicating path to sector geojson file on the local machine.
+        name : str, optional
+            The name of the sector.
+        """
+        utils._validate_string(filename, "filename")
+        with open(filename, "r") as f:
+            return cls(json.load(f), name)
+
+    def contains(self, pos_df=None):
+        """
+        Check which aircraft are inside the sector.
+
+        Parameters
+        ----------
+        pos_df : pandas.DataFrame, optional
+            Aircraft positions as returned by ``all_positions()``. If not
+            provided, the positions of all aircraft are requested.
+
+        Returns
+        -------
+        pandas.Series
+            A boolean series indexed by aircraft ID, FALSE for aircraft
+            without a position.
+        """
+        if pos_df is None:
+            pos_df = all_positions()
+        lat, lon, alt = _position_columns(pos_df)
+
+        inside = np.zeros(len(pos_df), dtype=bool)
+        with np.errstate(invalid="ignore"):
+            for volume in self._volumes:
+                inside |= volume.contains(lat, lon, alt)
+        return pd.Series(inside, index=pos_df.index)
+
+    def update(self, pos_df=None):
+        """
+        Check which aircraft are inside the sector and which have exited it
+        since the last update.
+
+        Parameters
+        ----------
+        pos_df : pandas.DataFrame, optional
+            Aircraft positions as returned by ``all_positions()``. If not
+            provided, the positions of all aircraft are requested.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Dataframe indexed by aircraft ID with columns:
+        | - ``inside``: TRUE if the aircraft is inside the sector.
+        | - ``exited``: TRUE if the aircraft was inside the sector at the last update and is not anymore.
+
+        Notes
+        -----
+        Aircraft which are not in pos_df (e.g., have been removed from the
+        simulation) are not reported as exited. Aircraft with a missing or
+        invalid latitude, longitude or altitude are unknown: they keep their
+        ``inside`` value of the last update and are not reported as exited.
+        """
+        if pos_df is None:
+            pos_df = all_positions()
+        inside = self.contains(pos_df).to_numpy(dtype=bool)
+        was_inside = self._inside.reindex(pos_df.index, fill_value=False)
+        was_inside = was_inside.to_numpy(dtype=bool)
+        known = _valid_positions(*_position_columns(pos_df))
+        inside = np.where(known, inside, was_inside)
+        self._inside = pd.Series(inside, index=pos_df.index)
+        return pd.DataFrame(
+            {"inside": inside, "exited": was_inside & ~inside}, index=pos_df.index
+        )
+
+    def reset(self):
+        """Forget the aircraft inside the sector at the last update."""
+        self._inside = pd.Series([], dtype=bool)
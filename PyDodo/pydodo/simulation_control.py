@@ -1,6 +1,6 @@
 from . import utils
 from .post_request import post_request
-from .config_param import config_param
+from .config_param import config
 
 
 def reset_simulation():
@@ -19,7 +19,7 @@ def reset_simulation():
     --------
     >>> pydodo.reset_simulation()
     """
-    return post_request(config_param("endpoint_reset_simulation"))
+    return post_request(config.endpoint_reset_simulation)
 
 
 def pause_simulation():
@@ -38,7 +38,7 @@ def pause_simulation():
     --------
     >>> pydodo.pause_simulation()
     """
-    return post_request(config_param("endpoint_pause_simulation"))
+    return post_request(config.endpoint_pause_simulation)
 
 
 def resume_simulation():
@@ -57,7 +57,7 @@ def resume_simulation():
     --------
     >>> pydodo.resume_simulation()
     """
-    return post_request(config_param("endpoint_resume_simulation"))
+    return post_request(config.endpoint_resume_simulation)
 
 
 def set_simulation_rate_multiplier(multiplier):
@@ -86,7 +86,7 @@ def set_simulation_rate_multiplier(multiplier):
     utils._validate_multiplier(multiplier)
 
     body = {"multiplier": multiplier}
-    return post_request(config_param("endpoint_set_simulation_rate_multiplier"), body)
+    return post_request(config.endpoint_set_simulation_rate_multiplier, body)
 
 
 def simulation_step():
@@ -107,4 +107,4 @@ def simulation_step():
     --------
     >>> pydodo.simulation_step()
     """
-    return post_request(config_param("endpoint_simulation_step"))
+    return post_request(config.endpoint_simulation_step)
@@ -1,8 +1,8 @@
 import requests
 import json
 
-from .bluebird_connect import construct_endpoint_url
-from .config_param import config_param
+from .bluebird_connect import construct_endpoint_url, get_session
+from .config_param import config
 
 
 def simulation_info():
@@ -59,13 +59,24 @@ def simulation_info():
     --------
     >>> pydodo.simulation_info()
     """
-    endpoint = config_param("endpoint_simulation_info")
+    endpoint = config.endpoint_simulation_info
     url = construct_endpoint_url(endpoint)
 
-    resp = requests.get(url)
+    resp = get_session().get(url)
     resp.raise_for_status()
 
-    info = json.loads(resp.text)
-    info["aircraft_ids"] = info.pop("callsigns")
+    return _process_siminfo_response(json.loads(resp.text))
+
+
+def _process_siminfo_response(info):
+    """
+    Process JSON response from BlueBird SIMINFO endpoint request.
+    - Rename "callsigns" key as "aircraft_ids".
 
+    Parameters
+    ----------
+    info : JSON <dict>
+        BlueBird response from the SIMINFO endpoint.
+    """
+    info["aircraft_ids"] = info.pop("callsigns")
     return info
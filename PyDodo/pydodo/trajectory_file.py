@@ -0,0 +1,477 @@
+import os
+import bisect
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from . import utils
+from .config_param import config
+from .request_position import all_positions
+from .trajectory_store import _is_next_snapshot, _snapshot_arrays, _trajectory_columns
+
+# file extension of the parts of a recording in each format
+_TRAJECTORY_FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+_PARTIAL_SUFFIX = ".partial"
+_RECORDING_OUTPUTS = ["dataframe", "arrays", "table"]
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "pyarrow is required to record and read trajectory files (pip install pyarrow)"
+        )
+
+
+def _trajectory_schema(columns):
+    """Schema of a recording: one row per aircraft position."""
+    return pa.schema(
+        [
+            ("sim_t", pa.float64()),
+            ("aircraft_id", pa.string()),
+            (config.aircraft_type, pa.string()),
+        ]
+        + [(col, pa.float64()) for col in columns]
+    )
+
+
+def _recording_parts(path):
+    """The completed part files of a recording, in the order they were written."""
+    if not os.path.isdir(path):
+        return [path]
+    extensions = tuple(_TRAJECTORY_FORMATS.values())
+    return [
+        os.path.join(path, name)
+        for name in sorted(os.listdir(path))
+        if name.endswith(extensions)
+    ]
+
+
+class TrajectoryRecorder:
+    """
+    Record aircraft position snapshots to disk in a columnar format.
+
+    A recording is a directory of part files. Snapshots are buffered and
+    written in record batches (Arrow) or row groups (Parquet) of
+    ``batch_rows`` rows, and a new part is started every ``part_rows`` rows.
+    Each row is one aircraft position with its scenario time (``sim_t``), so
+    a recording can be read back one column or one time range at a time (see
+    ``TrajectoryReader``).
+
+    Parameters
+    ----------
+    path : str
+        Directory to write the recording to (created if it does not exist).
+        Must not already contain a recording.
+    format : str, optional
+        ``"arrow"`` (Arrow IPC files, which can be memory-mapped without
+        copying) or ``"parquet"`` (compressed). The default is set in the
+        config file.
+    batch_rows : int, optional
+        Number of rows per record batch / row group. The default is set in the
+        config file.
+    part_rows : int, optional
+        Number of rows per part file. The default is set in the config file.
+
+    Notes
+    -----
+    Requires pyarrow.
+
+    A part file is written to a temporary name and only renamed once it is
+    complete, so a recording can be read while it is being written (the rows
+    of the current part are not visible until it is complete). Call
+    ``close()``, or use the recorder as a context manager, to write the last
+    part.
+
+    Snapshots must be appended in scenario time order. A snapshot with the
+    same scenario time as the last one is skipped. Flight levels which are not
+    set are NaN.
+
+    Examples
+    --------
+    >>> with pydodo.TrajectoryRecorder("run1") as recorder:
+    >>>     for _ in range(1000):
+    >>>         pydodo.simulation_step()
+    >>>         recorder.record()
+    """
+
+    def __init__(self, path, format=None, batch_rows=None, part_rows=None):
+        _require_pyarrow()
+        if format is None:
+            format = config.trajectory_file_format
+        if batch_rows is None:
+            batch_rows = config.trajectory_file_batch_rows
+        if part_rows is None:
+            part_rows = config.trajectory_file_part_rows
+        assert format in _TRAJECTORY_FORMATS, "Invalid value {} for format".format(
+            format
+        )
+        for name, rows in [("batch_rows", batch_rows), ("part_rows", part_rows)]:
+            assert isinstance(rows, int) and rows > 0, "Invalid value {} for {}".format(
+                rows, name
+            )
+
+        os.makedirs(path, exist_ok=True)
+        assert not _recording_parts(path), "{} already contains a recording".format(
+            path
+        )
+
+        self.path = path
+        self.format = format
+        self.batch_rows = batch_rows
+        self.part_rows = part_rows
+        self.columns = _trajectory_columns()
+        self.schema = _trajectory_schema(self.columns)
+        self._buffer = []
+        self._buffered_rows = 0
+        self._writer = None
+        self._part = 0
+        self._part_file = None
+        self._part_rows_written = 0
+        self._last_t = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record(self):
+        """
+        Append a snapshot of all aircraft positions from the current client.
+
+        Returns
+        -------
+        TRUE if the snapshot was appended.
+        """
+        return self.append(all_positions(output="arrays"))
+
+    def append(self, snapshot):
+        """
+        Append a snapshot of aircraft positions.
+
+        Parameters
+        ----------
+        snapshot : pandas.DataFrame or dict
+            Aircraft positions as returned by ``all_positions()`` or
+            ``aircraft_position()``, or in the ``"arrays"`` format of
+            ``all_positions()``. Must have a scenario time (``sim_t``).
+
+        Returns
+        -------
+        TRUE if the snapshot was appended, FALSE if it was skipped because it
+        has the same scenario time as the last one.
+        """
+        sim_t, aircraft_id, aircraft_type, values = _snapshot_arrays(
+            snapshot, self.columns
+        )
+        if not _is_next_snapshot(sim_t, self._last_t):
+            return False
+        self._last_t = sim_t
+
+        n_rows = len(aircraft_id)
+        if n_rows:
+            aircraft_type = np.array(
+                [t if isinstance(t, str) else "" for t in aircraft_type], dtype=str
+            )
+            self._buffer.append(
+                (np.full(n_rows, sim_t, dtype=float), aircraft_id, aircraft_type, values)
+            )
+            self._buffered_rows += n_rows
+            if self._buffered_rows >= self.batch_rows:
+                self.flush()
+        return True
+
+    def flush(self):
+        """Write the buffered snapshots as one record batch / row group."""
+        if not self._buffer:
+            return
+        arrays = [
+            pa.array(np.concatenate([snap[0] for snap in self._buffer])),
+            pa.array(np.concatenate([snap[1] for snap in self._buffer]), pa.string()),
+            pa.array(np.concatenate([snap[2] for snap in self._buffer]), pa.string()),
+        ] + [
+            pa.array(np.concatenate([snap[3][col] for snap in self._buffer]))
+            for col in self.columns
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self._buffer = []
+        self._buffered_rows = 0
+
+        if self._writer is None:
+            self._open_part()
+        if self.format == "arrow":
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(
+                pa.Table.from_batches([batch]), row_group_size=batch.num_rows
+            )
+        self._part_rows_written += batch.num_rows
+        if self._part_rows_written >= self.part_rows:
+            self._close_part()
+
+    def close(self):
+        """Write the buffered snapshots and complete the current part file."""
+        self.flush()
+        self._close_part()
+
+    def _open_part(self):
+        name = "part-{:05d}{}".format(self._part, _TRAJECTORY_FORMATS[self.format])
+        self._part_file = os.path.join(self.path, name)
+        partial_file = self._part_file + _PARTIAL_SUFFIX
+        if self.format == "arrow":
+            self._writer = pa.ipc.new_file(partial_file, self.schema)
+        else:
+            self._writer = pq.ParquetWriter(partial_file, self.schema)
+        self._part_rows_written = 0
+
+    def _close_part(self):
+        if self._writer is None:
+            return
+        self._writer.close()
+        os.replace(self._part_file + _PARTIAL_SUFFIX, self._part_file)
+        self._writer = None
+        self._part += 1
+
+
+class TrajectoryReader:
+    """
+    Read a trajectory recording written by ``TrajectoryRecorder``.
+
+    The part files are memory-mapped and only the record batches / row groups
+    which overlap a requested time range are read. Arrow recordings are read
+    without copying: the returned columns point into the memory-mapped files,
+    so multi-gigabyte recordings can be queried a column or a time range at a
+    time.
+
+    Parameters
+    ----------
+    path : str
+        The directory of a recording, or a single part file.
+
+    Notes
+    -----
+    Requires pyarrow.
+
+    Examples
+    --------
+    >>> reader = pydodo.TrajectoryReader("run1")
+    >>> reader.column("latitude", start = 60, end = 120)
+    >>> reader.window(start = 60, end = 120)
+    >>> reader.trajectory("BAW123")
+    """
+
+    def __init__(self, path):
+        _require_pyarrow()
+        self.path = path
+        # (first scenario time, last scenario time, number of rows, loader) of
+        # each record batch / row group, in scenario time order
+        self._segments = []
+        self.schema = None
+        for part in _recording_parts(path):
+            self._add_part(part)
+        self._start_t = [seg[0] for seg in self._segments]
+        self._end_t = [seg[1] for seg in self._segments]
+
+    def _add_part(self, part):
+        if part.endswith(_TRAJECTORY_FORMATS["parquet"]):
+            parquet_file = pq.ParquetFile(part, memory_map=True)
+            self.schema = parquet_file.schema_arrow
+            sim_t = self.schema.get_field_index("sim_t")
+            for i in range(parquet_file.num_row_groups):
+                row_group = parquet_file.metadata.row_group(i)
+                if not row_group.num_rows:
+                    continue
+                stats = row_group.column(sim_t).statistics
+                self._segments.append(
+                    (
+                        stats.min,
+                        stats.max,
+                        row_group.num_rows,
+                        lambda columns, i=i, f=parquet_file: f.read_row_group(
+                            i, columns=columns
+                        ),
+                    )
+                )
+        else:
+            reader = pa.ipc.open_file(pa.memory_map(part))
+            self.schema = reader.schema
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                if not batch.num_rows:
+                    continue
+                sim_t = batch.column("sim_t")
+                self._segments.append(
+                    (
+                        sim_t[0].as_py(),
+                        sim_t[-1].as_py(),
+                        batch.num_rows,
+                        lambda columns, batch=batch: pa.Table.from_batches(
+                            [batch]
+                        ).select(columns),
+                    )
+                )
+
+    @property
+    def columns(self):
+        """The names of the recorded columns."""
+        return [] if self.schema is None else list(self.schema.names)
+
+    @property
+    def time_range(self):
+        """The first and last recorded scenario time, None if there are none."""
+        if not self._segments:
+            return None
+        return self._start_t[0], self._end_t[-1]
+
+    def table(self, start=None, end=None, columns=None):
+        """
+        Get the rows in a scenario time window as a ``pyarrow.Table``.
+
+        Parameters
+        ----------
+        start : double, optional
+            Start of the window (inclusive) in seconds since the start of the
+            scenario. If not provided, the window starts at the first row.
+        end : double, optional
+            End of the window (inclusive). If not provided, the window ends at
+            the last row.
+        columns : [str], optional
+            The columns to read. If not provided, all columns are read.
+
+        Returns
+        -------
+        pyarrow.Table
+            The rows in scenario time order, one chunk per record batch / row
+            group read.
+        """
+        columns = self.columns if columns is None else list(columns)
+        assert all(col in self.columns for col in columns), "Invalid columns {}".format(
+            columns
+        )
+        first = 0 if start is None else bisect.bisect_left(self._end_t, start)
+        last = (
+            len(self._segments)
+            if end is None
+            else bisect.bisect_right(self._start_t, end)
+        )
+
+        read_columns = columns if "sim_t" in columns else columns + ["sim_t"]
+        tables = []
+        for seg_start, seg_end, _, load in self._segments[first:last]:
+            table = load(read_columns)
+            if (start is not None and seg_start < start) or (
+                end is not None and seg_end > end
+            ):
+                # trim the rows outside of the window from the boundary segments
+                sim_t = table.column("sim_t").to_numpy()
+                lo = 0 if start is None else np.searchsorted(sim_t, start, "left")
+                hi = len(sim_t) if end is None else np.searchsorted(sim_t, end, "right")
+                table = table.slice(lo, hi - lo)
+            tables.append(table.select(columns))
+
+        if not tables:
+            return self._empty_schema(columns).empty_table()
+        return pa.concat_tables(tables)
+
+    def _empty_schema(self, columns):
+        schema = self.schema if self.schema is not None else _trajectory_schema(
+            _trajectory_columns()
+        )
+        return pa.schema([schema.field(col) for col in columns])
+
+    def column(self, name, start=None, end=None):
+        """
+        Get one column in a scenario time window.
+
+        Parameters
+        ----------
+        name : str
+            The column name (e.g., ``"latitude"``).
+        start : double, optional
+            Start of the window (inclusive), see ``table()``.
+        end : double, optional
+            End of the window (inclusive), see ``table()``.
+
+        Returns
+        -------
+        pyarrow.ChunkedArray
+            The column values, one chunk per record batch / row group read.
+            Convert with ``to_numpy()`` (this copies if there is more than one
+            chunk).
+        """
+        return self.table(start, end, [name]).column(name)
+
+    def window(self, start=None, end=None, columns=None, output="dataframe"):
+        """
+        Get the rows in a scenario time window.
+
+        Parameters
+        ----------
+        start : double, optional
+            Start of the window (inclusive), see ``table()``.
+        end : double, optional
+            End of the window (inclusive), see ``table()``.
+        columns : [str], optional
+            The columns to read. If not provided, all columns are read.
+        output : str, optional
+            One of ``["dataframe", "arrays", "table"]``: a pandas dataframe
+            (the default), a dictionary of numpy arrays or a ``pyarrow.Table``.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with one row per aircraft position, in scenario time
+            order, and columns ``sim_t``, ``aircraft_id``, ``aircraft_type``
+            and the numeric columns of ``all_positions()``.
+        """
+        assert output in _RECORDING_OUTPUTS, "Invalid value {} for output".format(
+            output
+        )
+        table = self.table(start, end, columns)
+        if output == "table":
+            return table
+        if output == "arrays":
+            return {
+                col: table.column(col).to_numpy(zero_copy_only=False)
+                for col in table.column_names
+            }
+        return table.to_pandas()
+
+    def trajectory(self, aircraft_id, start=None, end=None):
+        """
+        Get the trajectory of one aircraft.
+
+        Parameters
+        ----------
+        aircraft_id : str
+            A string aircraft identifier.
+        start : double, optional
+            Start of the window (inclusive), see ``table()``.
+        end : double, optional
+            End of the window (inclusive), see ``table()``.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe indexed by scenario time with the numeric columns of
+            ``all_positions()``. Empty if the aircraft was not recorded.
+        """
+        utils._validate_id(aircraft_id)
+        table = self.table(start, end)
+        table = table.filter(pc.equal(table.column("aircraft_id"), aircraft_id))
+        columns = [
+            col
+            for col in table.column_names
+            if col not in ("aircraft_id", config.aircraft_type)
+        ]
+        return table.select(columns).to_pandas().set_index("sim_t")
+
+    def __len__(self):
+        return sum(seg[2] for seg in self._segments)
@@ -0,0 +1,443 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+
+from . import utils
+from .config_param import config
+from .request_position import _pos_col_map, all_positions
+
+_TRAJECTORY_OUTPUTS = ["dataframe", "arrays"]
+
+
+def _trajectory_columns():
+    """The numeric position columns held for each trajectory row."""
+    return [col for col in _pos_col_map().values() if col != config.aircraft_type]
+
+
+def _snapshot_arrays(snapshot, columns):
+    """
+    Get the scenario time, aircraft IDs, aircraft types and numeric columns of
+    a snapshot of positions (a dataframe or the ``"arrays"`` format of
+    ``all_positions()``).
+    """
+    if isinstance(snapshot, pd.DataFrame):
+        sim_t = getattr(snapshot, "sim_t", None)
+        # rows of missing values for aircraft which do not exist
+        snapshot = snapshot[snapshot[config.latitude].notna()]
+        aircraft_id = snapshot.index.to_numpy(dtype=str)
+        get = lambda col: snapshot[col].to_numpy(dtype=float, na_value=np.nan)
+    else:
+        sim_t = snapshot.get("sim_t")
+        aircraft_id = np.asarray(snapshot["aircraft_id"], dtype=str)
+        get = lambda col: np.asarray(snapshot[col], dtype=float)
+    missing = np.full(len(aircraft_id), np.nan)
+    values = {col: get(col) if col in snapshot else missing for col in columns}
+    if config.aircraft_type in snapshot:
+        aircraft_type = snapshot[config.aircraft_type]
+    else:
+        aircraft_type = [None] * len(aircraft_id)
+    return sim_t, aircraft_id, aircraft_type, values
+
+
+def _is_next_snapshot(sim_t, last_t):
+    """
+    Check a snapshot's scenario time follows the last appended one. Return
+    FALSE for a repeated scenario time.
+    """
+    assert sim_t is not None, "Snapshot has no scenario time"
+    if last_t is None:
+        return True
+    assert sim_t >= last_t, "Snapshot at {} is older than the last one at {}".format(
+        sim_t, last_t
+    )
+    return sim_t > last_t
+
+
+class _Chunk:
+    """Preallocated columns of a fixed number of trajectory rows."""
+
+    def __init__(self, size, columns):
+        self.sim_t = np.empty(size, dtype=float)
+        self.aircraft = np.empty(size, dtype=np.int32)
+        self.columns = {col: np.empty(size, dtype=float) for col in columns}
+        self.size = 0
+        self._order = None
+
+    @property
+    def capacity(self):
+        return len(self.sim_t)
+
+    @property
+    def nbytes(self):
+        return (
+            self.sim_t.nbytes
+            + self.aircraft.nbytes
+            + sum(arr.nbytes for arr in self.columns.values())
+        )
+
+    def drop_until(self, t):
+        """Drop the rows at scenario times up to t, at the start of the chunk."""
+        n = int(np.searchsorted(self.sim_t[: self.size], t, side="right"))
+        if n:
+            keep = self.size - n
+            for arr in [self.sim_t, self.aircraft, *self.columns.values()]:
+                arr[:keep] = arr[n : self.size]
+            self.size = keep
+            self._order = None
+
+    def rows_of(self, aircraft):
+        """
+        Get the (ascending) offsets of the rows of an array of interned
+        aircraft indices, with a binary search of the rows sorted by aircraft.
+        """
+        if self._order is None or len(self._order) != self.size:
+            # a stable sort keeps each aircraft's rows in time order
+            self._order = np.argsort(self.aircraft[: self.size], kind="stable")
+            self._sorted_aircraft = self.aircraft[: self.size][self._order]
+        lo = np.searchsorted(self._sorted_aircraft, aircraft, side="left")
+        hi = np.searchsorted(self._sorted_aircraft, aircraft, side="right")
+        rows = [self._order[l:h] for l, h in zip(lo, hi) if h > l]
+        if not rows:
+            return np.array([], dtype=np.intp)
+        return np.sort(np.concatenate(rows)) if len(rows) > 1 else rows[0]
+
+
+class TrajectoryStore:
+    """
+    In-memory history of aircraft positions, fed by position snapshots.
+
+    Positions are held in preallocated chunks of NumPy columns (one per
+    numeric position field) and aircraft IDs are interned, so appending a
+    snapshot copies its arrays without building any dataframe. Rows are kept
+    in scenario time order: a scenario time window is found with a binary
+    search and the rows of an aircraft with a binary search per chunk.
+
+    Parameters
+    ----------
+    chunk_size : int, optional
+        Number of rows (aircraft positions) per chunk. The default is set in
+        the config file.
+    max_mb : double, optional
+        Memory cap in megabytes. Once a new chunk would exceed it, the oldest
+        chunks are evicted, with the rest of their last snapshot so that only
+        whole snapshots are held. The default is set in the config file (null
+        for no cap). The snapshot being appended is never evicted.
+
+    Notes
+    -----
+    Snapshots must be appended in scenario time order. A snapshot with the
+    same scenario time as the last one (e.g., polled while the simulation is
+    paused) is skipped. Call ``clear()`` after resetting the simulation.
+
+    Flight levels which are not set are NaN. The aircraft type of an aircraft
+    is the one in the latest snapshot which contains it.
+
+    Examples
+    --------
+    >>> store = pydodo.TrajectoryStore()
+    >>> for _ in range(100):
+    >>>     pydodo.simulation_step()
+    >>>     store.record()
+    >>> store.window(start = 60, end = 120)
+    >>> store.trajectory("BAW123")
+    """
+
+    def __init__(self, chunk_size=None, max_mb=None):
+        if chunk_size is None:
+            chunk_size = config.trajectory_store_chunk_size
+        if max_mb is None:
+            max_mb = config.trajectory_store_max_mb
+        assert (
+            isinstance(chunk_size, int) and chunk_size > 0
+        ), "Invalid value {} for chunk_size".format(chunk_size)
+        if max_mb is not None:
+            utils._validate_is_positive(max_mb, "max_mb")
+
+        self.chunk_size = chunk_size
+        self.max_mb = max_mb
+        self.columns = _trajectory_columns()
+        self.clear()
+
+    def clear(self):
+        """Drop all positions and aircraft IDs."""
+        self._chunks = []
+        # last scenario time of each chunk, for the binary search of times
+        self._chunk_end_t = []
+        self._aircraft_index = {}
+        self._aircraft_id = []
+        self._aircraft_type = []
+        # the aircraft of the last snapshot, which usually repeat
+        self._last_interned = None
+
+    def __len__(self):
+        return sum(chunk.size for chunk in self._chunks)
+
+    @property
+    def nbytes(self):
+        """Memory allocated for the positions in bytes."""
+        return sum(chunk.nbytes for chunk in self._chunks)
+
+    @property
+    def aircraft_ids(self):
+        """The IDs of all aircraft seen since the store was last cleared."""
+        return list(self._aircraft_id)
+
+    @property
+    def time_range(self):
+        """The first and last scenario time held, None if the store is empty."""
+        if not len(self):
+            return None
+        return self._chunks[0].sim_t[0], self._chunk_end_t[-1]
+
+    # ---------------------------------------------------------------------- #
+    # Appending
+    # ---------------------------------------------------------------------- #
+    def record(self):
+        """
+        Append a snapshot of all aircraft positions from the current client.
+
+        Returns
+        -------
+        TRUE if the snapshot was appended.
+        """
+        return self.append(all_positions(output="arrays"))
+
+    def append(self, snapshot):
+        """
+        Append a snapshot of aircraft positions.
+
+        Parameters
+        ----------
+        snapshot : pandas.DataFrame or dict
+            Aircraft positions as returned by ``all_positions()`` or
+            ``aircraft_position()``, or in the ``"arrays"`` format of
+            ``all_positions()``. Must have a scenario time (``sim_t``).
+
+        Returns
+        -------
+        TRUE if the snapshot was appended, FALSE if it was skipped because it
+        has the same scenario time as the last one.
+        """
+        sim_t, aircraft_id, aircraft_type, values = _snapshot_arrays(
+            snapshot, self.columns
+        )
+        last_t = self._chunk_end_t[-1] if self._chunk_end_t else None
+        if not _is_next_snapshot(sim_t, last_t):
+            return False
+
+        aircraft = self._intern(aircraft_id, aircraft_type)
+        start, n_rows = 0, len(aircraft)
+        while start < n_rows:
+            if not self._chunks or self._chunks[-1].size == self.chunk_size:
+                self._new_chunk(sim_t)
+            chunk = self._chunks[-1]
+            n = min(n_rows - start, chunk.capacity - chunk.size)
+            rows = slice(chunk.size, chunk.size + n)
+            chunk.sim_t[rows] = sim_t
+            chunk.aircraft[rows] = aircraft[start : start + n]
+            for col in self.columns:
+                chunk.columns[col][rows] = values[col][start : start + n]
+            chunk.size += n
+            self._chunk_end_t[-1] = sim_t
+            start += n
+        return True
+
+    def _intern(self, aircraft_id, aircraft_type):
+        """Get the interned indices of aircraft IDs, updating their types."""
+        aircraft_type = list(aircraft_type)
+        if self._last_interned is not None:
+            last_id, last_type, last_index = self._last_interned
+            if np.array_equal(aircraft_id, last_id) and aircraft_type == last_type:
+                return last_index
+
+        index = np.empty(len(aircraft_id), dtype=np.int32)
+        for i, (acid, actype) in enumerate(zip(aircraft_id, aircraft_type)):
+            idx = self._aircraft_index.get(acid)
+            if idx is None:
+                idx = self._aircraft_index[acid] = len(self._aircraft_id)
+                self._aircraft_id.append(acid)
+                self._aircraft_type.append(actype)
+            elif isinstance(actype, str) and actype:
+                self._aircraft_type[idx] = actype
+            index[i] = idx
+        self._last_interned = (aircraft_id, aircraft_type, index)
+        return index
+
+    def _new_chunk(self, sim_t):
+        """
+        Allocate a chunk for a snapshot at scenario time sim_t, evicting the
+        oldest chunks (but none with rows of the snapshot) to stay under the
+        cap.
+        """
+        chunk = _Chunk(self.chunk_size, self.columns)
+        if self.max_mb is not None:
+            while (
+                self._chunks
+                and self._chunk_end_t[0] < sim_t
+                and self.nbytes + chunk.nbytes > self.max_mb * 1e6
+            ):
+                self._evict()
+        self._chunks.append(chunk)
+        self._chunk_end_t.append(None)
+
+    def _evict(self):
+        """
+        Drop the oldest chunk, and the rows of its last snapshot in the next
+        chunks, so that window() never returns part of a snapshot.
+        """
+        del self._chunks[0]
+        end_t = self._chunk_end_t.pop(0)
+        # a snapshot may span several chunks
+        while self._chunks and self._chunk_end_t[0] == end_t:
+            del self._chunks[0]
+            del self._chunk_end_t[0]
+        if self._chunks:
+            self._chunks[0].drop_until(end_t)
+
+    # ---------------------------------------------------------------------- #
+    # Queries
+    # ---------------------------------------------------------------------- #
+    def _row_at_time(self, t, side):
+        """
+        Get the number of held rows with a scenario time before t (side "left")
+        or at or before t (side "right"), with a binary search.
+        """
+        search = bisect.bisect_left if side == "left" else bisect.bisect_right
+        k = search(self._chunk_end_t, t)
+        rows = sum(chunk.size for chunk in self._chunks[:k])
+        if k < len(self._chunks):
+            chunk = self._chunks[k]
+            rows += int(np.searchsorted(chunk.sim_t[: chunk.size], t, side=side))
+        return rows
+
+    def _select(self, start, end, aircraft_id):
+        """
+        Get the (chunk, offsets) of the rows in a scenario time window, of the
+        given aircraft IDs if any.
+        """
+        first = 0 if start is None else self._row_at_time(start, "left")
+        last = len(self) if end is None else self._row_at_time(end, "right")
+
+        if aircraft_id is not None:
+            aircraft = np.array(
+                sorted(
+                    self._aircraft_index[acid]
+                    for acid in set(aircraft_id)
+                    if acid in self._aircraft_index
+                ),
+                dtype=np.int32,
+            )
+
+        selection, offset = [], 0
+        for chunk in self._chunks:
+            lo, hi = max(first - offset, 0), min(last - offset, chunk.size)
+            offset += chunk.size
+            if lo >= hi:
+                continue
+            if aircraft_id is None:
+                rows = slice(lo, hi)
+            else:
+                rows = chunk.rows_of(aircraft)
+                rows = rows[(rows >= lo) & (rows < hi)]
+            selection.append((chunk, rows))
+        return selection
+
+    def _gather(self, selection):
+        """Get the columns of the selected rows as a dictionary of arrays."""
+
+        def concat(arrays, dtype):
+            return np.concatenate(arrays) if arrays else np.array([], dtype=dtype)
+
+        aircraft = concat([chunk.aircraft[rows] for chunk, rows in selection], np.int32)
+        # only look up the interned IDs and types of the selected aircraft
+        unique, inverse = np.unique(aircraft, return_inverse=True)
+        actypes = [self._aircraft_type[i] for i in unique]
+        arrays = {
+            "sim_t": concat([chunk.sim_t[rows] for chunk, rows in selection], float),
+            "aircraft_id": np.array(
+                [self._aircraft_id[i] for i in unique], dtype=str
+            )[inverse],
+            config.aircraft_type: np.array(
+                [t if isinstance(t, str) else "" for t in actypes], dtype=str
+            )[inverse],
+        }
+        for col in self.columns:
+            arrays[col] = concat(
+                [chunk.columns[col][rows] for chunk, rows in selection], float
+            )
+        return arrays
+
+    def window(self, start=None, end=None, aircraft_id=None, output="dataframe"):
+        """
+        Get the positions in a scenario time window.
+
+        Parameters
+        ----------
+        start : double, optional
+            Start of the window (inclusive) in seconds since the start of the
+            scenario. If not provided, the window starts at the oldest row.
+        end : double, optional
+            End of the window (inclusive). If not provided, the window ends at
+            the latest row.
+        aircraft_id : str, [str], optional
+            A string or list of strings of aircraft IDs. If provided, only the
+            positions of these aircraft are returned (unknown IDs are ignored).
+        output : str, optional
+            ``"dataframe"`` (the default) or ``"arrays"`` for a dictionary of
+            numpy arrays with the same columns.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe with one row per aircraft position, in scenario time
+            order, and columns ``sim_t``, ``aircraft_id``, ``aircraft_type``
+            and the numeric columns of ``all_positions()``.
+
+        Examples
+        --------
+        >>> store.window(start = 60, end = 120)
+        >>> store.window(aircraft_id = ["BAW123", "KLM456"], output = "arrays")
+        """
+        assert output in _TRAJECTORY_OUTPUTS, "Invalid value {} for output".format(
+            output
+        )
+        if aircraft_id is not None:
+            utils._validate_id_list(aircraft_id)
+            if not isinstance(aircraft_id, list):
+                aircraft_id = [aircraft_id]
+
+        arrays = self._gather(self._select(start, end, aircraft_id))
+        if output == "arrays":
+            return arrays
+        return pd.DataFrame(arrays)
+
+    def trajectory(self, aircraft_id, start=None, end=None):
+        """
+        Get the trajectory of one aircraft.
+
+        Parameters
+        ----------
+        aircraft_id : str
+            A string aircraft identifier.
+        start : double, optional
+            Start of the window (inclusive), see ``window()``.
+        end : double, optional
+            End of the window (inclusive), see ``window()``.
+
+        Returns
+        -------
+        pandas.DataFrame
+            A dataframe indexed by scenario time with the numeric columns of
+            ``all_positions()``. Empty if the aircraft is unknown.
+
+        Examples
+        --------
+        >>> store.trajectory("BAW123", start = 60)
+        """
+        utils._validate_id(aircraft_id)
+        arrays = self._gather(self._select(start, end, [aircraft_id]))
+        return pd.DataFrame(
+            {col: arrays[col] for col in self.columns},
+            index=pd.Index(arrays["sim_t"], name="sim_t"),
+        )
@@ -1,24 +1,48 @@
-from .config_param import config_param
+import numpy as np
+
+from .config_param import config
+
+
+def _invalid_values(val, is_valid):
+    """
+    Return val if it is a scalar, otherwise the elements of val which failed
+    a check (for assertion messages).
+    """
+    if np.ndim(val) == 0:
+        return val
+    return np.asarray(val)[~is_valid]
 
 
 def _validate_latitude(lat):
-    """Assert latitude is in the range ``[-90, 90]``."""
-    assert abs(lat) <= 90, "Invalid value {} for latitude".format(lat)
+    """Assert latitude is in the range ``[-90, 90]`` (element-wise for arrays)."""
+    is_valid = np.asarray(np.abs(lat) <= 90)
+    assert np.all(is_valid), "Invalid value {} for latitude".format(
+        _invalid_values(lat, is_valid)
+    )
 
 
 def _validate_longitude(lon):
-    """Assert longitude is in the range ``[-180, 180)``."""
-    assert -180 <= lon < 180, "Invalid value {} for longitude".format(lon)
+    """Assert longitude is in the range ``[-180, 180)`` (element-wise for arrays)."""
+    is_valid = np.asarray((np.asarray(lon) >= -180) & (np.asarray(lon) < 180))
+    assert np.all(is_valid), "Invalid value {} for longitude".format(
+        _invalid_values(lon, is_valid)
+    )
 
 
 def _validate_heading(hdg):
-    """Assert heading is in the range ``[0, 360)``."""
-    assert 0 <= hdg < 360, "Invalid value {} for heading".format(hdg)
+    """Assert heading is in the range ``[0, 360)`` (element-wise for arrays)."""
+    is_valid = np.asarray((np.asarray(hdg) >= 0) & (np.asarray(hdg) < 360))
+    assert np.all(is_valid), "Invalid value {} for heading".format(
+        _invalid_values(hdg, is_valid)
+    )
 
 
 def _validate_speed(spd):
-    """Assert speed is non-negative."""
-    assert spd >= 0, "Invalid value {} for speed".format(spd)
+    """Assert speed is non-negative (element-wise for arrays)."""
+    is_valid = np.asarray(np.asarray(spd) >= 0)
+    assert np.all(is_valid), "Invalid value {} for speed".format(
+        _invalid_values(spd, is_valid)
+    )
 
 
 def _validate_string(input, param_name):
@@ -31,7 +55,7 @@ def _validate_string(input, param_name):
 def _validate_id(aircraft_id):
     """Assert aircraft_id is non-empty string (and length >= 3 if using BlueSky)."""
     _validate_string(aircraft_id, "aircraft ID")
-    if config_param("simulator") == config_param("bluesky_simulator"):
+    if config.simulator == config.bluesky_simulator:
         assert len(aircraft_id) >= 3, f"Invalid input {aircraft_id} for aircraft ID"
 
 
@@ -55,7 +79,7 @@ def _check_altitude(alt):
     Assert alt (altitude) is non-negative and does not exceed the upper limit
     specified in config.
     """
-    return 0 <= alt <= config_param("feet_altitude_upper_limit")
+    return 0 <= alt <= config.feet_altitude_upper_limit
 
 
 def _check_flight_level(fl):
@@ -63,9 +87,7 @@ def _check_flight_level(fl):
     Assert fl (flight level) is in the range [lower_limit, upper limit]
     specified in the config.
     """
-    return fl >= config_param("flight_level_lower_limit") and fl <= config_param(
-        "flight_level_upper_limit"
-    )
+    return fl >= config.flight_level_lower_limit and fl <= config.flight_level_upper_limit
 
 
 def _parse_alt(alt, fl):
@@ -93,5 +115,8 @@ def _validate_multiplier(dtmult):
 
 
 def _validate_is_positive(val, param_name):
-    """Assert val is non-negative."""
-    assert val >= 0, "Invalid value {} for {}".format(val, param_name)
+    """Assert val is non-negative (element-wise for arrays)."""
+    is_valid = np.asarray(np.asarray(val) >= 0)
+    assert np.all(is_valid), "Invalid value {} for {}".format(
+        _invalid_values(val, is_valid), param_name
+    )
@@ -0,0 +1,172 @@
+import time
+
+import numpy as np
+
+from . import utils
+from .client import get_client
+from .config_param import config
+from .request_position import _position_call, _process_pos_response, _select_positions
+
+
+def _wait_cache(client):
+    """
+    The position cache shared by a client's waits: the client's position cache
+    if enabled, otherwise one which only serves the waits.
+    """
+    if client.position_cache is not None:
+        return client.position_cache
+    return client._wait_cache
+
+
+def _validate_wait_args(aircraft_id, predicate, timeout, sim_timeout):
+    """Validate the arguments of wait_until() and return the list of IDs."""
+    utils._validate_id_list(aircraft_id)
+    assert callable(predicate), "Invalid value {} for predicate".format(predicate)
+    utils._validate_is_positive(timeout, "timeout")
+    if sim_timeout is not None:
+        utils._validate_is_positive(sim_timeout, "sim_timeout")
+    return aircraft_id if isinstance(aircraft_id, list) else [aircraft_id]
+
+
+class _WaitSchedule:
+    """
+    Time between the polls of a wait, adapted to the observed simulation rate.
+
+    The simulation rate is estimated from the scenario time and the wall-clock
+    time of consecutive polls. While the scenario time advances, polls are
+    spaced so that the simulation advances about ``wait_sim_resolution``
+    seconds between them; while it does not (the simulation is paused or
+    waits to be stepped), the interval is doubled. The interval is bounded by
+    ``wait_min_interval`` and ``wait_max_interval``.
+    """
+
+    def __init__(self, timeout, sim_timeout):
+        self.interval = config.wait_min_interval
+        self._deadline = time.monotonic() + timeout
+        self._sim_timeout = sim_timeout
+        self._start_t = None
+        self._last = None
+        self._rate = None
+
+    def next_poll(self, sim_t):
+        """
+        Record a poll at scenario time sim_t.
+
+        Returns
+        -------
+        double
+            The number of seconds to wait before the next poll, None if the
+            wait has timed out.
+        """
+        now = time.monotonic()
+        if sim_t is not None:
+            if self._start_t is None:
+                self._start_t = sim_t
+            sim_elapsed = sim_t - self._start_t
+            if self._sim_timeout is not None and sim_elapsed >= self._sim_timeout:
+                return None
+        if now >= self._deadline:
+            return None
+
+        if self._last is not None and sim_t is not None and self._last[1] is not None:
+            wall_dt, sim_dt = now - self._last[0], sim_t - self._last[1]
+            if sim_dt > 0 and wall_dt > 0:
+                rate = sim_dt / wall_dt
+                # smooth out the jitter of the request latency
+                self._rate = rate if self._rate is None else (self._rate + rate) / 2
+                self.interval = config.wait_sim_resolution / self._rate
+            else:
+                self.interval *= 2
+            self.interval = min(
+                max(self.interval, config.wait_min_interval), config.wait_max_interval
+            )
+        self._last = (now, sim_t)
+        return min(self.interval, self._deadline - now)
+
+
+class _Wait:
+    """
+    A call to ``wait_until()``: the decisions shared by ``Dodo`` and
+    ``AsyncDodo``, which only differ in how they fetch the positions (from
+    ``cache``) and sleep between polls.
+    """
+
+    def __init__(self, client, aircraft_id, predicate, timeout, sim_timeout):
+        self.aircraft_id = _validate_wait_args(
+            aircraft_id, predicate, timeout, sim_timeout
+        )
+        self.predicate = predicate
+        self.cache = _wait_cache(client)
+        self.schedule = _WaitSchedule(timeout, sim_timeout)
+
+    def poll(self, response):
+        """
+        Evaluate the predicate on the positions of the aircraft in a POS
+        response.
+
+        Returns
+        -------
+        (bool, double)
+            Whether the predicate holds for all aircraft, and the number of
+            seconds to wait before the next poll (None if the wait is over).
+        """
+        pos_df = _select_positions(_process_pos_response(response), self.aircraft_id)
+        if np.all(np.asarray(self.predicate(pos_df), dtype=bool)):
+            return True, None
+        return False, self.schedule.next_poll(getattr(pos_df, "sim_t", None))
+
+
+def wait_until(aircraft_id, predicate, timeout=10, sim_timeout=None):
+    """
+    Wait until a condition on the positions of one or more aircraft holds.
+
+    Parameters
+    ----------
+    aircraft_id : str, [str]
+        A string or list of strings of aircraft IDs.
+    predicate : callable
+        A function of the positions of the aircraft (a dataframe as returned by
+        ``aircraft_position()``) returning a boolean, or a boolean for each
+        aircraft (e.g., a boolean ``pandas.Series``). The condition holds once
+        all returned values are TRUE.
+    timeout : double, optional
+        A non-negative double. Wall-clock time in seconds after which the
+        function returns even if the condition does not hold.
+    sim_timeout : double, optional
+        A non-negative double. Scenario time in seconds after which the
+        function returns even if the condition does not hold.
+
+    Returns
+    -------
+    TRUE if the condition holds, FALSE if the wait timed out.
+
+    Notes
+    -----
+    The predicate is evaluated once per poll on the positions of all the
+    aircraft, so it should be vectorised (e.g., compare dataframe columns).
+    Aircraft which do not exist have a row of missing values.
+
+    Polls are spaced according to the observed simulation rate (see the
+    ``wait_*`` config parameters) rather than sent back to back. Positions are
+    taken from a cached snapshot of all aircraft positions, so concurrent
+    waits on the same client (e.g., in several threads) share one request per
+    poll. The snapshot is the client's position cache if enabled (see
+    ``set_position_cache()``), otherwise one only used by waits. Commands sent
+    to BlueBird invalidate it.
+
+    Examples
+    --------
+    >>> pydodo.change_altitude("BAW123", flight_level = 300)
+    >>> pydodo.wait_until("BAW123", lambda pos: pos["current_flight_level"] > 25000)
+    >>> pydodo.wait_until(
+    >>>     ["BAW123", "KLM456"],
+    >>>     lambda pos: pos["longitude"] > 0,
+    >>>     timeout = 60,
+    >>> )
+    """
+    wait = _Wait(get_client(), aircraft_id, predicate, timeout, sim_timeout)
+    while True:
+        holds, delay = wait.poll(wait.cache.fetch(_position_call))
+        if delay is None:
+            return holds
+        time.sleep(delay)
@@ -47,7 +47,9 @@ setup(
     description="Scaffold for ATC agents to interface with the BlueBird API",
     version="1.0.0",
     author="Radka Jersakova and Ruairidh MacLeod",
+    python_requires=">=3.7",
     install_requires=REQUIRED_PACKAGES,
+    extras_require={"recording": ["pyarrow"]},
     packages=["pydodo"],
     url="https://github.com/alan-turing-institute/dodo/PyDoDo",
     cmdclass={"install": install, "develop": develop},
@@ -8,6 +8,8 @@ from pydodo import (
     reset_simulation,
     create_aircraft,
     loss_of_separation,
+    loss_of_separation_matrix,
+    loss_of_separation_pairs,
 )
 from pydodo.bluebird_connect import ping_bluebird
 
@@ -72,3 +74,47 @@ def test_loss_of_separation():
     new_aircraft_id = "TST3003"
     score4 = loss_of_separation(aircraft_id, new_aircraft_id)
     assert np.isnan(score4)
+
+
+@pytest.mark.skipif(not bb_resp, reason="Can't connect to bluebird")
+def test_local_loss_of_separation():
+    """
+    Tests the locally computed loss of separation scores match the BlueBird
+    metric.
+    """
+    cmd = reset_simulation()
+    assert cmd == True
+
+    aircraft = {
+        "TST1001": (51, 0, 250),
+        "TST2002": (51.05, 0.05, 255),
+        "TST3003": (51.1, -0.1, 265),
+        "TST4004": (50, -1, 200),
+    }
+    for callsign, (lat, lon, fl) in aircraft.items():
+        cmd = create_aircraft(
+            aircraft_id=callsign,
+            type=type,
+            latitude=lat,
+            longitude=lon,
+            heading=heading,
+            flight_level=fl,
+            speed=speed,
+        )
+        assert cmd == True
+
+    aircraft_id = list(aircraft) + ["TST5005"]
+    los_df = loss_of_separation_matrix(aircraft_id)
+    for from_id in aircraft_id:
+        for to_id in aircraft_id:
+            expected = loss_of_separation(from_id, to_id)
+            assert los_df.loc[from_id, to_id] == pytest.approx(
+                expected, abs=1e-6, nan_ok=True
+            )
+
+    pairs = loss_of_separation_pairs()
+    for _, row in pairs.iterrows():
+        assert row["loss_of_separation"] == pytest.approx(
+            loss_of_separation(row["from_aircraft_id"], row["to_aircraft_id"]),
+            abs=1e-6,
+        )
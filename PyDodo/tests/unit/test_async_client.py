@@ -0,0 +1,81 @@
+import pytest
+import asyncio
+import inspect
+
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import pydodo
+from pydodo import AsyncDodo, config
+
+
+def test_async_api_coverage():
+    """
+    Check every function in the PyDodo API is available as a coroutine (or as
+    an asynchronous iterator for streams).
+    """
+    dodo = AsyncDodo()
+    for name in pydodo.__all__:
+        method = getattr(dodo, name)
+        assert inspect.iscoroutinefunction(method) or inspect.isasyncgenfunction(
+            method
+        ), name
+
+
+def test_async_client():
+    pos = {
+        "TEST1": {
+            "actype": "B744",
+            "current_fl": 25000,
+            "gs": 250,
+            "lat": 51,
+            "lon": 0,
+            "vs": 0,
+            "requested_fl": None,
+            "cleared_fl": None,
+        },
+        "TEST2": {
+            "actype": "B744",
+            "current_fl": 20000,
+            "gs": 250,
+            "lat": 51,
+            "lon": 1,
+            "vs": 0,
+            "requested_fl": None,
+            "cleared_fl": None,
+        },
+        "scenario_time": 0,
+    }
+    commands = []
+
+    async def get_pos(request):
+        return web.json_response(pos)
+
+    async def post_step(request):
+        commands.append("step")
+        return web.json_response({})
+
+    async def run():
+        app = web.Application()
+        prefix = "/{}/{}/".format(config.api_path, config.api_version)
+        app.router.add_get(prefix + config.endpoint_aircraft_position, get_pos)
+        app.router.add_post(prefix + config.endpoint_simulation_step, post_step)
+        server = TestServer(app, host="localhost")
+        await server.start_server()
+        try:
+            async with AsyncDodo(host="localhost", port=server.port) as dodo:
+                return await asyncio.gather(
+                    dodo.all_positions(),
+                    dodo.vertical_separation(["TEST1", "TEST2"]),
+                    dodo.simulation_step(),
+                )
+        finally:
+            await server.close()
+
+    pos_df, sep_df, step = asyncio.run(run())
+    assert isinstance(pos_df, pd.DataFrame)
+    assert list(pos_df.index) == ["TEST1", "TEST2"]
+    assert sep_df.loc["TEST1", "TEST2"] == pytest.approx(5000 * 0.3048)
+    assert step == True
+    assert commands == ["step"]
@@ -0,0 +1,67 @@
+import pytest
+import asyncio
+
+from pydodo import batch, batch_results, async_batch, BatchError
+from pydodo.batch_executor import _get_batch_loop
+
+
+async def succeed(value=True):
+    await asyncio.sleep(0.01)
+    return value
+
+
+async def fail(msg):
+    await asyncio.sleep(0.01)
+    raise ValueError(msg)
+
+
+def test_batch():
+    assert batch([succeed(), succeed()]) == True
+    assert batch(succeed()) == True
+
+    with pytest.raises(BatchError) as excinfo:
+        batch([succeed(), fail("first"), fail("second")])
+    assert str(excinfo.value) == "first;second"
+    assert [res.success for res in excinfo.value.results] == [True, False, False]
+
+
+def test_batch_results():
+    results = batch_results([succeed(1), fail("invalid"), succeed(2)])
+
+    assert [res.success for res in results] == [True, False, True]
+    assert [res.result for res in results] == [1, None, 2]
+    assert isinstance(results[1].error, ValueError)
+    assert all(res.latency > 0 for res in results)
+
+
+def test_batch_reuses_loop():
+    loop = _get_batch_loop()
+    batch([succeed()])
+    assert _get_batch_loop() is loop
+    assert loop.is_running()
+
+
+def test_max_concurrency():
+    in_flight = []
+
+    async def tracked():
+        in_flight.append(1)
+        assert len(in_flight) <= 2
+        await asyncio.sleep(0.01)
+        in_flight.pop()
+        return True
+
+    assert batch([tracked() for i in range(6)], max_concurrency=2) == True
+
+    with pytest.raises(AssertionError):
+        batch_results([], max_concurrency=0)
+
+
+def test_async_batch():
+    async def run():
+        # blocking batch also works while another event loop is running
+        assert batch([succeed()]) == True
+        return await async_batch([succeed(), fail("invalid")])
+
+    results = asyncio.run(run())
+    assert [res.success for res in results] == [True, False]
@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from pydodo import config, separation_matrix
+from pydodo.distance_measures import (
+    _separation_from_pos,
+    euclidean_distance,
+    geodesic_distance,
+)
+
+
+def random_positions(n):
+    """Positions (altitude in feet) as returned by all_positions()."""
+    rng = np.random.RandomState(0)
+    return pd.DataFrame(
+        {
+            config.latitude: rng.uniform(50, 53, n),
+            config.longitude: rng.uniform(-2, 2, n),
+            config.current_flight_level: rng.uniform(20000, 30000, n),
+        },
+        index=["TST{}".format(i) for i in range(n)],
+    )
+
+
+def expected_separation(pos_df, from_id, to_id, distance_f):
+    metres = pos_df.copy()
+    metres[config.current_flight_level] *= 0.3048
+    return _separation_from_pos(metres, from_id, to_id, distance_f)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_separation_matrix_tiles(processes):
+    pos_df = random_positions(50)
+    from_id = list(pos_df.index[:23]) + ["MISSING"]
+    to_id = list(pos_df.index[10:])
+
+    sep_df = separation_matrix(
+        pos_df, from_id, to_id, measure="geodesic", tile_size=7, processes=processes
+    )
+    expected = expected_separation(pos_df, from_id, to_id, geodesic_distance)
+    pd.testing.assert_frame_equal(sep_df, expected)
+    assert sep_df.loc["MISSING"].isna().all()
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_separation_matrix_memmap(tmp_path, processes):
+    pos_df = random_positions(30)
+    path = str(tmp_path / "separation.npy")
+
+    sep = separation_matrix(
+        pos_df,
+        measure="euclidean",
+        dtype="float32",
+        path=path,
+        tile_size=8,
+        processes=processes,
+    )
+    assert isinstance(sep, np.memmap)
+    assert sep.dtype == np.float32
+    expected = expected_separation(
+        pos_df, list(pos_df.index), list(pos_df.index), euclidean_distance
+    )
+    on_disk = np.load(path, mmap_mode="r")
+    np.testing.assert_allclose(on_disk, expected.to_numpy(), rtol=1e-6)
+    np.testing.assert_array_equal(on_disk, sep)
+
+
+def test_separation_matrix_args():
+    pos_df = random_positions(3)
+    with pytest.raises(AssertionError):
+        separation_matrix(pos_df, measure="manhattan")
+    with pytest.raises(AssertionError):
+        separation_matrix(pos_df, dtype="int32")
+    with pytest.raises(AssertionError):
+        separation_matrix(pos_df, tile_size=0)
+    with pytest.raises(AssertionError):
+        separation_matrix(pos_df, path="separation.csv")
+
+    # the input positions are left in feet
+    separation_matrix(pos_df, measure="vertical")
+    assert (pos_df[config.current_flight_level] > 20000).all()
+
+
+def test_separation_matrix_integer_types():
+    pos_df = random_positions(10)
+    expected = separation_matrix(pos_df, tile_size=4, processes=1)
+    sep_df = separation_matrix(pos_df, tile_size=np.int64(4), processes=np.int32(1))
+    pd.testing.assert_frame_equal(sep_df, expected)
+
+    with pytest.raises(AssertionError):
+        separation_matrix(pos_df, tile_size=4.0)
+
+
+def test_separation_matrix_clients():
+    from pydodo import AsyncDodo, Dodo
+
+    pos_df = random_positions(10)
+    expected = separation_matrix(pos_df, processes=1)
+    sep_df = Dodo().separation_matrix(pos_df, processes=1)
+    pd.testing.assert_frame_equal(sep_df, expected)
+    sep_df = asyncio.run(AsyncDodo().separation_matrix(pos_df, processes=1))
+    pd.testing.assert_frame_equal(sep_df, expected)
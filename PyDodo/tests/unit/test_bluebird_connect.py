@@ -1,7 +1,19 @@
 import pytest
+import asyncio
+from unittest.mock import patch
 
-from pydodo import bluebird_config
-from pydodo.bluebird_connect import get_bluebird_url, construct_endpoint_url
+import requests
+
+from pydodo import bluebird_config, config, async_session, Dodo
+from pydodo.bluebird_connect import (
+    get_bluebird_url,
+    construct_endpoint_url,
+    get_session,
+    close_sessions,
+    ping_bluebird,
+    get_async_session,
+    close_async_sessions,
+)
 
 def test_bluebird_config():
 
@@ -18,3 +30,63 @@ def test_bluebird_config():
     endpoint="POS"
     endpoint_url = construct_endpoint_url(endpoint)
     assert endpoint_url == "{0}/{1}".format(url, endpoint)
+
+
+def test_pooled_session():
+    session = get_session()
+    assert get_session() is session
+    assert session.timeout == config.http_timeout
+    assert session.get_adapter(get_bluebird_url())._pool_maxsize == config.http_pool_maxsize
+
+    assert close_sessions() == True
+    assert get_session() is not session
+
+
+def test_dodo_clients():
+    sim1 = Dodo(host="test_host_1", port=2001, version="v25", pool_maxsize=2)
+    sim2 = Dodo(host="test_host_2", port=2002, version="v25")
+
+    # each client owns its URL and connection pool
+    assert sim1.get_bluebird_url() == "http://test_host_1:2001/api/v25"
+    assert sim2.get_bluebird_url() == "http://test_host_2:2002/api/v25"
+    assert sim1.session is not sim2.session
+    assert sim1.session.get_adapter(sim1.url)._pool_maxsize == 2
+
+    # configuring a client does not affect the default client
+    default_url = get_bluebird_url()
+    assert sim1.bluebird_config(host="test_host_3", port=2003, version="v25") == True
+    assert sim1.url == "http://test_host_3:2003/api/v25"
+    assert get_bluebird_url() == default_url
+
+    with sim2:
+        assert get_bluebird_url() == sim2.url
+        assert construct_endpoint_url("POS") == sim2.url + "/POS"
+    assert get_bluebird_url() == default_url
+
+    with pytest.raises(AttributeError):
+        sim1.not_a_pydodo_function
+
+
+def test_async_session():
+    async def sessions():
+        async with async_session() as session:
+            assert get_async_session() is session
+            assert session.connector.limit == config.async_connector_limit
+            assert session.connector.limit_per_host == config.async_limit_per_host
+        assert session.closed
+        # a new session is created lazily after the old one was closed
+        new_session = get_async_session()
+        assert new_session is not session
+        await close_async_sessions()
+        assert new_session.closed
+        return True
+
+    assert asyncio.run(sessions()) == True
+
+
+def test_ping_bluebird_timeout():
+    def mocked_post(session, url, **kwargs):
+        raise requests.exceptions.ReadTimeout("timed out")
+
+    with patch("requests.Session.post", mocked_post):
+        assert ping_bluebird() == False
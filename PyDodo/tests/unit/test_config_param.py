@@ -0,0 +1,76 @@
+import os
+import pytest
+
+from pydodo import config, config_param
+from pydodo.config_param import Config
+
+
+def write_config(path, port):
+    with open(path, "w") as f:
+        f.write('default:\n  host: "localhost"\n  port: "{}"\n'.format(port))
+
+
+def test_config_attributes():
+    assert config.endpoint_aircraft_position == config_param("endpoint_aircraft_position")
+    assert config["simulator"] == config_param("simulator")
+    assert "host" in config
+
+    with pytest.raises(AttributeError):
+        config.not_a_config_param
+
+    with pytest.raises(AssertionError):
+        config_param("not_a_config_param")
+
+
+def test_config_is_read_only():
+    with pytest.raises(AttributeError):
+        config.host = "test_host"
+    with pytest.raises(AttributeError):
+        del config.host
+
+
+def test_config_reload(tmpdir):
+    cfg_file = os.path.join(str(tmpdir), "config.yml")
+    write_config(cfg_file, 5001)
+
+    cfg = Config(cfg_file)
+    assert cfg.port == "5001"
+
+    write_config(cfg_file, 5002)
+    # the file is only parsed on construction and reload
+    assert cfg.port == "5001"
+    assert cfg.reload() == True
+    assert cfg.port == "5002"
+
+
+def test_config_hot_reload(tmpdir):
+    cfg_file = os.path.join(str(tmpdir), "config.yml")
+    write_config(cfg_file, 5001)
+
+    cfg = Config(cfg_file, hot_reload=True)
+    assert cfg.port == "5001"
+
+    write_config(cfg_file, 5002)
+    # make sure the modification time changes on coarse-grained filesystems
+    mtime = os.stat(cfg_file).st_mtime
+    os.utime(cfg_file, (mtime + 1, mtime + 1))
+    assert cfg.port == "5002"
+
+
+def test_config_defaults(tmpdir):
+    """
+    Check parameters missing from an older config file take their default
+    value, and the file overrides the defaults.
+    """
+    cfg_file = os.path.join(str(tmpdir), "config.yml")
+    write_config(cfg_file, 5001)
+
+    cfg = Config(cfg_file)
+    assert cfg.wait_min_interval == 0.05
+    assert cfg.separation_processes is None
+    assert "position_cache" in cfg
+
+    with open(cfg_file, "a") as f:
+        f.write("  wait_min_interval: 0.5\n")
+    cfg.reload()
+    assert cfg.wait_min_interval == 0.5
@@ -0,0 +1,122 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo.conflicts import _conflicts_from_pos
+
+KNOT = 1852 / 3600
+FOOT = 0.3048
+EARTH_RADIUS = 6371000
+
+
+def positions(aircraft):
+    """Positions (altitude in metres) from a dict of (lat, lon, alt, hdg, gs, vs)."""
+    columns = [
+        "latitude",
+        "longitude",
+        "current_flight_level",
+        "heading",
+        "ground_speed",
+        "vertical_speed",
+    ]
+    return pd.DataFrame.from_dict(aircraft, orient="index", columns=columns)
+
+
+def test_head_on_conflict():
+    # 0.2 degrees of latitude apart, flying towards each other at 250 knots
+    pos_df = positions(
+        {
+            "TST1": (51.0, 0.0, 10000, 0, 250, 0),
+            "TST2": (51.2, 0.0, 10000, 180, 250, 0),
+            # same track as TST1, one minute behind and 2000 ft below
+            "TST3": (50.9, 0.0, 10000 - 2000 * FOOT, 0, 250, 0),
+        }
+    )
+    conflicts = _conflicts_from_pos(pos_df, 300, 9260, 1000 * FOOT)
+    assert list(conflicts["from_aircraft_id"]) == ["TST1"]
+    assert list(conflicts["to_aircraft_id"]) == ["TST2"]
+
+    distance = 0.2 * np.pi / 180 * 6371000
+    closing = 2 * 250 * KNOT
+    conflict = conflicts.iloc[0]
+    assert conflict["time_to_conflict"] == pytest.approx((distance - 9260) / closing, rel=0.01)
+    assert conflict["time_to_cpa"] == pytest.approx(distance / closing, rel=0.01)
+    assert conflict["lateral_cpa"] == pytest.approx(0, abs=50)
+    assert conflict["vertical_cpa"] == pytest.approx(0)
+
+    # the conflict is beyond a shorter horizon
+    assert _conflicts_from_pos(pos_df, 30, 9260, 1000 * FOOT).empty
+
+
+def test_vertical_conflict():
+    pos_df = positions(
+        {
+            # parallel tracks 2 and 4 NM apart, 3000 ft apart vertically
+            "TST1": (51.0, 0.0, 10000, 90, 250, 0),
+            "TST2": (51.0 + 2 / 60, 0.0, 10000 + 3000 * FOOT, 90, 250, -1000),
+            "TST3": (51.0 + 6 / 60, 0.0, 10000, 90, 250, 0),
+        }
+    )
+    conflicts = _conflicts_from_pos(pos_df, 300, 5 * 1852, 1000 * FOOT)
+    # TST2 descends to within 1000 ft of TST1 and TST3 after 2 minutes
+    assert list(zip(conflicts["from_aircraft_id"], conflicts["to_aircraft_id"])) == [
+        ("TST1", "TST2"),
+        ("TST2", "TST3"),
+    ]
+    assert conflicts["time_to_conflict"].to_list() == pytest.approx([120, 120], abs=1)
+
+    # already in conflict
+    conflicts = _conflicts_from_pos(pos_df, 300, 7 * 1852, 5000 * FOOT)
+    assert (conflicts["time_to_conflict"] == 0).all()
+    assert len(conflicts) == 3
+
+    assert _conflicts_from_pos(pos_df.iloc[:0], 300, 9260, 300).empty
+    with pytest.raises(AssertionError):
+        _conflicts_from_pos(pos_df, -1, 9260, 300)
+    with pytest.raises(AssertionError):
+        _conflicts_from_pos(pos_df.drop(columns="heading"), 300, 9260, 300)
+
+
+def sampled_conflicts(pos_df, lookahead_s, lateral_min, vertical_min):
+    """Conflicts found by sampling the relative motion of every pair."""
+    ids = list(pos_df.index)
+    lat, lon, alt, hdg, gs, vs = pos_df.to_numpy(dtype=float).T
+    vx = gs * KNOT * np.sin(np.radians(hdg))
+    vy = gs * KNOT * np.cos(np.radians(hdg))
+    vz = vs * FOOT / 60
+    t = np.linspace(0, lookahead_s, 2001)
+    pairs = set()
+    for i in range(len(ids)):
+        for j in range(i + 1, len(ids)):
+            mid_lat = np.radians((lat[i] + lat[j]) / 2)
+            dx = np.radians(lon[j] - lon[i]) * np.cos(mid_lat) * EARTH_RADIUS
+            dy = np.radians(lat[j] - lat[i]) * EARTH_RADIUS
+            lateral = np.hypot(dx + (vx[j] - vx[i]) * t, dy + (vy[j] - vy[i]) * t)
+            vertical = np.abs(alt[j] - alt[i] + (vz[j] - vz[i]) * t)
+            if ((lateral < lateral_min) & (vertical < vertical_min)).any():
+                pairs.add((ids[i], ids[j]))
+    return pairs
+
+
+def test_predict_conflicts_sampled():
+    rng = np.random.RandomState(0)
+    n = 120
+    pos_df = pd.DataFrame(
+        {
+            "latitude": rng.uniform(51, 52, n),
+            "longitude": rng.uniform(-1, 1, n),
+            "current_flight_level": rng.uniform(8000, 11000, n),
+            "heading": rng.uniform(0, 360, n),
+            "ground_speed": rng.uniform(200, 450, n),
+            "vertical_speed": rng.choice([0, 0, -1500, 1500], n),
+        },
+        index=["TST{}".format(i) for i in range(n)],
+    )
+    conflicts = _conflicts_from_pos(pos_df, 300, 9260, 300)
+    predicted = set(zip(conflicts["from_aircraft_id"], conflicts["to_aircraft_id"]))
+
+    # the models differ slightly: compare with slightly smaller and larger minima
+    assert len(predicted) > 10
+    assert sampled_conflicts(pos_df, 300, 9260 * 0.99, 300 * 0.99) <= predicted
+    assert predicted <= sampled_conflicts(pos_df, 300, 9260 * 1.01, 300 * 1.01)
@@ -0,0 +1,109 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from pydodo import config
+from pydodo.derived_positions import _derived_positions, _filter_positions
+from pydodo.distance_measures import (
+    _EARTH_RADIUS,
+    _FLATTENING,
+    _lla_to_ECEF,
+    _separation_from_pos,
+    geodesic_distance,
+)
+from pydodo.geodesic import ellipsoid_distance
+from pydodo.position_cache import PositionCache
+from pydodo.request_position import _select_positions
+
+
+def positions():
+    pos_df = pd.DataFrame(
+        {
+            config.latitude: [51.0, 52.0, np.nan, -33.9],
+            config.longitude: [0.1, -1.5, 2.0, 151.2],
+            config.current_flight_level: [10000, 9000, 8000, 7000],
+        },
+        index=["TST1", "TST2", "TST3", "TST4"],
+    )
+    pos_df.sim_t = 10
+    return pos_df
+
+
+def test_derived_values():
+    pos_df = positions()
+    derived = _derived_positions(pos_df)
+    lat = pos_df[config.latitude].to_numpy()
+    np.testing.assert_array_equal(derived.sin_lat, np.sin(np.radians(lat)))
+    np.testing.assert_array_equal(
+        derived.cos_lon, np.cos(np.radians(pos_df[config.longitude]))
+    )
+
+    alt = pos_df[config.current_flight_level].to_numpy(dtype=float)
+    expected = _lla_to_ECEF(lat, pos_df[config.longitude], alt)
+    for actual, coord in zip(derived.ecef(alt, _EARTH_RADIUS, _FLATTENING), expected):
+        np.testing.assert_array_equal(actual, coord)
+
+    # computed once per snapshot
+    assert _derived_positions(pos_df) is derived
+    assert derived.ecef(alt, _EARTH_RADIUS, _FLATTENING) is derived.ecef(
+        alt.copy(), _EARTH_RADIUS, _FLATTENING
+    )
+    # and again if the positions change
+    pos_df.loc["TST1", config.latitude] = 50
+    assert _derived_positions(pos_df) is not derived
+    assert _derived_positions(pos_df).sin_lat[0] == np.sin(np.radians(50))
+
+
+def test_derived_views():
+    pos_df = positions()
+    selected = _select_positions(pos_df, ["TST4", "MISSING", "TST1"])
+    view = _derived_positions(selected)
+    assert view._parent is _derived_positions(pos_df)
+    np.testing.assert_array_equal(
+        view.cos_lat, [np.cos(np.radians(-33.9)), np.nan, np.cos(np.radians(51))]
+    )
+    # the values are computed for the whole snapshot and shared
+    assert ("cos_lat",) in _derived_positions(pos_df)._values
+
+    located = _filter_positions(pos_df, pos_df[config.latitude].notna())
+    assert list(located.index) == ["TST1", "TST2", "TST4"]
+    np.testing.assert_array_equal(
+        _derived_positions(located).cos_lat, _derived_positions(pos_df).cos_lat[[0, 1, 3]]
+    )
+
+    # views are sent without the whole snapshot
+    sent = pickle.loads(pickle.dumps(view))
+    assert sent._parent is None
+    np.testing.assert_array_equal(sent.cos_lat, view.cos_lat)
+    np.testing.assert_array_equal(sent.sin_lon, view.sin_lon)
+
+
+def test_geodesic_shares_reduced_latitudes():
+    pos_df = positions()
+    ids = ["TST1", "TST2", "TST3", "TST4"]
+    sep_df = _separation_from_pos(pos_df, ids, ids, geodesic_distance)
+
+    # the reduced latitudes are derived once per snapshot, not per pair
+    assert ("sin_reduced_lat", _FLATTENING) in _derived_positions(pos_df)._values
+    lat = pos_df[config.latitude].to_numpy()
+    lon = pos_df[config.longitude].to_numpy()
+    expected = ellipsoid_distance(
+        lat[:, np.newaxis],
+        lon[:, np.newaxis],
+        lat[np.newaxis, :],
+        lon[np.newaxis, :],
+        _EARTH_RADIUS,
+        _FLATTENING,
+    )
+    np.testing.assert_array_equal(sep_df.to_numpy(), expected)
+
+
+def test_position_cache_shares_derived():
+    cache = PositionCache(max_age=10)
+    lat, lon = np.array([51.0, 52.0]), np.array([0.0, 1.0])
+    derived = cache.derived_positions(lat, lon)
+    assert cache.derived_positions(lat.copy(), lon.copy()) is derived
+    assert cache.derived_positions(lat + 1, lon) is not derived
+    cache.invalidate()
+    assert cache._derived is None
@@ -1,12 +1,16 @@
 import pytest
 import math
 
+import numpy as np
+import pandas as pd
+
 from pydodo import (
     geodesic_distance,
     great_circle_distance,
     vertical_distance,
     euclidean_distance,
 )
+from pydodo.distance_measures import _separation_from_pos
 
 
 def test_geodesic_distance():
@@ -127,3 +131,105 @@ def test_optional_params(from_lat, from_lon, to_lat, to_lon):
     assert result2 == pytest.approx(
         great_circle_distance(from_lat, from_lon, to_lat, to_lon, radius=r), 0.01
     )
+
+
+@pytest.mark.parametrize(
+    "distance_f,kwargs",
+    [
+        (geodesic_distance, {}),
+        (great_circle_distance, {"radius": 6371000}),
+        (vertical_distance, {}),
+        (euclidean_distance, {"major_semiaxis": 6378388, "flattening": 0}),
+    ],
+)
+def test_separation_matrix(distance_f, kwargs):
+    """
+    Check the vectorised separation matrix matches the scalar distance
+    functions and has missing values for aircraft without a position.
+    """
+    pos_df = pd.DataFrame(
+        {
+            "latitude": [51.507389, 50.6083, 55.945336, np.nan],
+            "longitude": [0.127806, -1.9608, -3.187299, np.nan],
+            "current_flight_level": [7620, 6096, 0, np.nan],
+        },
+        index=["TST1001", "TST2002", "TST3003", "TST4004"],
+    )
+    from_ids = ["TST1001", "TST2002", "TST4004"]
+    to_ids = ["TST3003", "TST1001", "TST4004", "TST5005"]
+
+    sep_df = _separation_from_pos(pos_df, from_ids, to_ids, distance_f, **kwargs)
+    assert list(sep_df.index) == from_ids
+    assert list(sep_df.columns) == to_ids
+
+    for from_id in from_ids:
+        for to_id in to_ids:
+            if from_id in ["TST1001", "TST2002"] and to_id in ["TST1001", "TST3003"]:
+                expected = distance_f(
+                    from_lat=pos_df.loc[from_id, "latitude"],
+                    from_lon=pos_df.loc[from_id, "longitude"],
+                    from_alt=pos_df.loc[from_id, "current_flight_level"],
+                    to_lat=pos_df.loc[to_id, "latitude"],
+                    to_lon=pos_df.loc[to_id, "longitude"],
+                    to_alt=pos_df.loc[to_id, "current_flight_level"],
+                    **kwargs
+                )
+                assert sep_df.loc[from_id, to_id] == pytest.approx(expected)
+            else:
+                assert np.isnan(sep_df.loc[from_id, to_id])
+
+
+@pytest.mark.parametrize(
+    "distance_f,arg_names",
+    [
+        (geodesic_distance, ["from_lat", "from_lon", "to_lat", "to_lon"]),
+        (great_circle_distance, ["from_lat", "from_lon", "to_lat", "to_lon"]),
+        (vertical_distance, ["from_alt", "to_alt"]),
+        (
+            euclidean_distance,
+            ["from_lat", "from_lon", "from_alt", "to_lat", "to_lon", "to_alt"],
+        ),
+    ],
+)
+def test_distance_broadcasting(distance_f, arg_names):
+    """
+    Check the distance functions broadcast arrays and Series element-wise and
+    match the results for scalar inputs.
+    """
+    log_df = pd.DataFrame(
+        {
+            "from_lat": [51.507389, 50.6083, 55.945336],
+            "from_lon": [0.127806, -1.9608, -3.187299],
+            "from_alt": [7620, 6096, 0],
+        },
+        index=[10, 20, 30],
+    )
+    to_point = {"to_lat": 50.6083, "to_lon": -1.9608, "to_alt": 350}
+
+    args = {
+        name: log_df[name] if name in log_df else to_point[name] for name in arg_names
+    }
+    result = distance_f(**args)
+    assert isinstance(result, pd.Series)
+    assert list(result.index) == list(log_df.index)
+
+    for i, idx in enumerate(log_df.index):
+        scalar_args = {
+            name: log_df.loc[idx, name] if name in log_df else to_point[name]
+            for name in arg_names
+        }
+        assert result[idx] == pytest.approx(distance_f(**scalar_args))
+
+    array_args = {name: np.asarray(val) for name, val in args.items()}
+    array_result = distance_f(**array_args)
+    assert isinstance(array_result, np.ndarray)
+    assert np.allclose(array_result, result)
+
+    log_df.iloc[1, :] = [91, 180, -1]
+    with pytest.raises(AssertionError):
+        distance_f(
+            **{
+                name: log_df[name] if name in log_df else to_point[name]
+                for name in arg_names
+            }
+        )
@@ -0,0 +1,105 @@
+import pytest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from pydodo import FuelEfficiencyAccumulator, config
+
+
+def snapshot(sim_t, aircraft, altitude=20000):
+    """Positions from a dict of (ground speed, vertical speed)."""
+    pos_df = pd.DataFrame.from_dict(
+        {
+            acid: (51.0, 0.0, altitude, gs, vs)
+            for acid, (gs, vs) in aircraft.items()
+        },
+        orient="index",
+        columns=[
+            config.latitude,
+            config.longitude,
+            config.current_flight_level,
+            config.ground_speed,
+            config.vertical_speed,
+        ],
+    )
+    pos_df.sim_t = sim_t
+    return pos_df
+
+
+def test_fuel_accumulation():
+    accumulator = FuelEfficiencyAccumulator(
+        reconcile_interval=None, burn_rate=1, climb_burn_rate=0.5, altitude_burn_rate=0
+    )
+    efficiency = accumulator.update(snapshot(0, {"TST1": (360, 0), "TST2": (360, 2000)}))
+    assert efficiency.isna().all()
+
+    accumulator.update(snapshot(10, {"TST1": (360, 0), "TST2": (360, 2000)}))
+    # repeated scenario times are skipped
+    accumulator.update(snapshot(10, {"TST1": (360, 0), "TST2": (360, 2000)}))
+    efficiency = accumulator.update(
+        snapshot(20, {"TST1": (720, 0), "TST2": (360, 0), "TST3": (400, 0)})
+    )
+    assert list(efficiency.index) == ["TST1", "TST2", "TST3"]
+
+    estimates = accumulator.estimates()
+    # 10 s at 360 knots then 10 s from 360 to 720 knots
+    assert estimates.loc["TST1", "distance"] == pytest.approx(1 + 1.5)
+    assert estimates.loc["TST1", "fuel"] == pytest.approx(20)
+    # climbing at 2000 ft/min then levelling off
+    assert estimates.loc["TST2", "fuel"] == pytest.approx(10 * 2 + 10 * 1.5)
+    assert efficiency["TST2"] == pytest.approx(2 / 35)
+    assert np.isnan(efficiency["TST3"])
+
+    # aircraft missing from a snapshot start again from their next position
+    accumulator.update(snapshot(30, {"TST1": (720, 0)}))
+    accumulator.update(snapshot(40, {"TST1": (720, 0), "TST2": (360, 0)}))
+    assert accumulator.estimates().loc["TST2", "fuel"] == pytest.approx(35)
+
+    with pytest.raises(AssertionError):
+        accumulator.update(snapshot(0, {"TST1": (720, 0)}))
+
+
+def test_fuel_altitude():
+    accumulator = FuelEfficiencyAccumulator(
+        reconcile_interval=None, burn_rate=1, climb_burn_rate=0, altitude_burn_rate=0.02
+    )
+    accumulator.update(snapshot(0, {"TST1": (360, 0)}, altitude=10000))
+    accumulator.update(snapshot(10, {"TST1": (360, 0)}, altitude=30000))
+    # 10 s at a mean altitude of 20000 feet
+    assert accumulator.estimates().loc["TST1", "fuel"] == pytest.approx(10 * 0.6)
+
+    # the level flight burn does not go negative
+    accumulator.update(snapshot(20, {"TST1": (360, 0)}, altitude=90000))
+    assert accumulator.estimates().loc["TST1", "fuel"] == pytest.approx(10 * 0.6)
+
+
+def test_fuel_reconciliation():
+    accumulator = FuelEfficiencyAccumulator(reconcile_interval=20)
+    server_scores = pd.Series({"TST1": 0.5, "TST2": np.nan})
+    calls = []
+
+    def fuel_efficiency(aircraft_id):
+        calls.append(aircraft_id)
+        return server_scores.reindex(aircraft_id)
+
+    with patch("pydodo.fuel_accumulator.fuel_efficiency", fuel_efficiency):
+        for sim_t in range(0, 50, 10):
+            efficiency = accumulator.update(
+                snapshot(sim_t, {"TST1": (360, 0), "TST2": (360, 0)})
+            )
+            if sim_t == 20:
+                assert calls == [["TST1", "TST2"]]
+                # the estimate matches the server, the other one is unscaled
+                assert efficiency["TST1"] == pytest.approx(0.5)
+                level_burn = 1 - config.fuel_altitude_burn_rate * 20
+                assert efficiency["TST2"] == pytest.approx(0.1 / level_burn)
+        assert len(calls) == 2
+
+        # the scale carries over between reconciliations
+        efficiency = accumulator.update(
+            snapshot(50, {"TST1": (720, 0), "TST2": (360, 0)})
+        )
+        assert efficiency["TST1"] > 0.5
+        assert accumulator.reconcile()["TST1"] == 0.5
+        assert accumulator.estimates().loc["TST1", "efficiency"] == pytest.approx(0.5)
@@ -0,0 +1,64 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo.local_metrics import (
+    _loss_of_separation_score,
+    _los_matrix_from_pos,
+    _los_pairs_from_pos,
+)
+
+NM = 1852
+FT = 0.3048
+
+
+@pytest.mark.parametrize(
+    "lateral,vertical,expected",
+    [
+        (0, 0, -1),
+        (4 * NM, 500 * FT, -1),
+        (7.5 * NM, 0, -0.5),
+        (0, 1500 * FT, -0.5),
+        (7.5 * NM, 1750 * FT, -0.25),
+        (10 * NM, 0, 0),
+        (0, 2000 * FT, 0),
+        (20 * NM, 5000 * FT, 0),
+        (np.nan, 0, np.nan),
+    ],
+)
+def test_loss_of_separation_score(lateral, vertical, expected):
+    result = _loss_of_separation_score(lateral, vertical)
+    assert result == pytest.approx(expected, nan_ok=True)
+
+
+def test_loss_of_separation_matrix_and_pairs():
+    rng = np.random.RandomState(0)
+    n = 100
+    pos_df = pd.DataFrame(
+        {
+            "latitude": rng.uniform(50, 52, n),
+            "longitude": rng.uniform(-2, 0, n),
+            "current_flight_level": rng.choice([7000, 7300, 7600, 7900], n),
+        },
+        index=["TST{}".format(i) for i in range(n)],
+    )
+    aircraft_id = list(pos_df.index) + ["TST5005"]
+
+    los_df = _los_matrix_from_pos(pos_df, aircraft_id)
+    assert los_df.shape == (n + 1, n + 1)
+    assert np.allclose(los_df.iloc[:n, :n], los_df.iloc[:n, :n].T)
+    assert np.all(np.diag(los_df)[:n] == -1)
+    assert los_df["TST5005"].isna().all()
+
+    pairs = _los_pairs_from_pos(pos_df)
+    assert len(pairs) > 0
+    assert np.all(pairs["loss_of_separation"] < 0)
+
+    # the pairs are exactly the off-diagonal non-zero scores
+    values = los_df.iloc[:n, :n].to_numpy()
+    from_idx, to_idx = np.nonzero(np.triu(values < 0, k=1))
+    assert list(zip(pairs["from_aircraft_id"], pairs["to_aircraft_id"])) == [
+        (aircraft_id[i], aircraft_id[j]) for i, j in zip(from_idx, to_idx)
+    ]
+    assert np.allclose(pairs["loss_of_separation"], values[from_idx, to_idx])
@@ -0,0 +1,107 @@
+import pytest
+import asyncio
+import threading
+
+import numpy as np
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pydodo import AsyncDodo, Dodo, config
+
+MISSING_ID = "TST9009"
+
+
+@pytest.fixture
+def metric_server():
+    """
+    Run a fake BlueBird METRIC endpoint in a background thread, recording the
+    highest number of requests in flight.
+    """
+    state = {"in_flight": 0, "max_in_flight": 0, "requests": 0}
+
+    async def get_metric(request):
+        state["requests"] += 1
+        state["in_flight"] += 1
+        state["max_in_flight"] = max(state["max_in_flight"], state["in_flight"])
+        await asyncio.sleep(0.01)
+        state["in_flight"] -= 1
+
+        name, args = request.query["name"], request.query["args"].split(",")
+        if MISSING_ID in args:
+            return web.Response(
+                status=config.status_code_no_aircraft_found, text="not found"
+            )
+        if name == config.loss_of_separation:
+            return web.json_response({name: -1 if args[0] == args[1] else 0})
+        return web.json_response({name: len(args[0])})
+
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def start():
+        app = web.Application()
+        prefix = "/{}/{}/".format(config.api_path, config.api_version)
+        app.router.add_get(prefix + config.endpoint_metrics, get_metric)
+        server = TestServer(app, host="localhost")
+        await server.start_server()
+        return server
+
+    server = asyncio.run_coroutine_threadsafe(start(), loop).result()
+    yield server.port, state
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+def test_bulk_aircraft_metrics(metric_server):
+    port, state = metric_server
+    dodo = Dodo(host="localhost", port=port)
+
+    assert dodo.fuel_efficiency("TST1001") == 7
+    assert np.isnan(dodo.sector_exit(MISSING_ID))
+
+    aircraft_id = ["TST{}".format(i) for i in range(1000, 1040)] + [MISSING_ID]
+    for metric_f in [dodo.fuel_efficiency, dodo.sector_exit]:
+        state["max_in_flight"] = 0
+        result = metric_f(aircraft_id, max_concurrency=5)
+        assert isinstance(result, pd.Series)
+        assert list(result.index) == aircraft_id
+        assert (result[:-1] == 7).all()
+        assert np.isnan(result[MISSING_ID])
+        assert 1 < state["max_in_flight"] <= 5
+
+
+def test_bulk_loss_of_separation(metric_server):
+    port, state = metric_server
+    dodo = Dodo(host="localhost", port=port)
+
+    from_id = ["TST1001", "TST2002"]
+    to_id = ["TST2002", "TST1001", MISSING_ID]
+    state["requests"] = 0
+    result = dodo.loss_of_separation(from_id, to_id)
+    assert state["requests"] == 6
+    assert isinstance(result, pd.DataFrame)
+    assert list(result.index) == from_id
+    assert list(result.columns) == to_id
+    assert result.loc["TST1001", "TST1001"] == -1
+    assert result.loc["TST1001", "TST2002"] == 0
+    assert result[MISSING_ID].isna().all()
+
+    async def run():
+        async with AsyncDodo(host="localhost", port=port) as dodo:
+            return await asyncio.gather(
+                dodo.loss_of_separation(from_id, to_id),
+                dodo.fuel_efficiency(from_id),
+                dodo.loss_of_separation("TST1001", "TST1001"),
+            )
+
+    los_df, fuel, los = asyncio.run(run())
+    pd.testing.assert_frame_equal(los_df, result)
+    assert list(fuel) == [7, 7]
+    assert los == -1
+
+    with pytest.raises(AssertionError):
+        dodo.loss_of_separation([], "TST1001")
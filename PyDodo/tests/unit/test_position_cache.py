@@ -0,0 +1,109 @@
+import pytest
+import time
+import json
+from unittest.mock import patch
+
+from pydodo import Dodo, config
+from pydodo.position_cache import PositionCache
+
+
+def position_response(scenario_time):
+    return {
+        "TEST1": {
+            "actype": "B744",
+            "current_fl": 25000,
+            "gs": 250,
+            "lat": 51,
+            "lon": 0,
+            "vs": 0,
+            "requested_fl": None,
+            "cleared_fl": None,
+        },
+        "scenario_time": scenario_time,
+    }
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(json_data)
+
+    def raise_for_status(self):
+        pass
+
+
+def test_position_cache():
+    requests_made = []
+
+    def mocked_get(session, url, **kwargs):
+        requests_made.append("GET")
+        return MockResponse(position_response(len(requests_made)))
+
+    def mocked_post(session, url, **kwargs):
+        requests_made.append("POST")
+        return MockResponse({})
+
+    dodo = Dodo(position_cache=True, position_cache_max_age=60)
+    with patch("requests.Session.get", mocked_get), patch(
+        "requests.Session.post", mocked_post
+    ):
+        pos_df = dodo.all_positions()
+        assert pos_df.sim_t == 1
+        assert dodo.all_positions().equals(pos_df)
+        assert dodo.aircraft_position("TEST1").equals(pos_df)
+        # as with BlueBird, a single aircraft ID is not case-sensitive
+        assert dodo.aircraft_position("test1").equals(pos_df)
+        assert dodo.aircraft_position(["TEST1"]).sim_t == 1
+        assert dodo.current_flight_level("TEST1") == 25000
+        assert requests_made == ["GET"]
+
+        # commands invalidate the cache
+        assert dodo.simulation_step() == True
+        assert dodo.all_positions().sim_t == 3
+        assert requests_made == ["GET", "POST", "GET"]
+
+        dodo.set_position_cache(enabled=False)
+        dodo.all_positions()
+        dodo.all_positions()
+        assert requests_made == ["GET", "POST", "GET", "GET", "GET"]
+
+    # the default client is not affected
+    assert Dodo().position_cache is None
+
+
+def test_position_cache_expiry():
+    cache = PositionCache(max_age=0.05)
+    assert cache.get() is None
+
+    requested_at = time.monotonic()
+    assert cache.put(position_response(10), requested_at) == True
+    assert cache.get()[config.simulator_time] == 10
+    assert cache.scenario_time == 10
+
+    # responses for an earlier scenario time are not cached
+    assert cache.put(position_response(5), time.monotonic()) == False
+    assert cache.get()[config.simulator_time] == 10
+
+    time.sleep(0.06)
+    assert cache.get() is None
+
+
+def test_position_cache_invalidation():
+    cache = PositionCache(max_age=60)
+
+    requested_at = time.monotonic()
+    cache.invalidate()
+    # the response may predate the command that invalidated the cache
+    assert cache.put(position_response(10), requested_at) == False
+    assert cache.get() is None
+
+    assert cache.put(position_response(5), time.monotonic()) == True
+    cached = cache.get()
+    cached.pop(config.simulator_time)
+    assert cache.get()[config.simulator_time] == 5
+
+    cache.invalidate()
+    assert cache.get() is None
+
+    with pytest.raises(AssertionError):
+        PositionCache(max_age=-1)
@@ -0,0 +1,159 @@
+import pytest
+import json
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pydodo import AsyncDodo, Dodo, config, stream_positions
+from pydodo.position_stream import _position_delta
+
+
+def aircraft(lat, current_fl=25000, requested_fl=None):
+    return {
+        "actype": "B744",
+        "current_fl": current_fl,
+        "gs": 250,
+        "lat": lat,
+        "lon": 0,
+        "vs": 0,
+        "requested_fl": requested_fl,
+        "cleared_fl": None,
+    }
+
+
+class MockSimulation:
+    """Positions of a simulation in which each step moves the aircraft north."""
+
+    def __init__(self):
+        self.sim_t = 0
+        self.aircraft = {"TST1": aircraft(50), "TST2": aircraft(51)}
+
+    def step(self):
+        self.sim_t += 1
+        self.aircraft["TST1"] = aircraft(50 + self.sim_t / 10)
+        if self.sim_t == 2:
+            del self.aircraft["TST2"]
+            self.aircraft["TST3"] = aircraft(52, requested_fl=30000)
+
+    def response(self):
+        return dict(self.aircraft, scenario_time=self.sim_t)
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(json_data)
+
+    def raise_for_status(self):
+        pass
+
+
+def check_deltas(deltas):
+    first, second, third = deltas
+
+    assert first.sim_t == 0
+    assert list(first.new.index) == ["TST1", "TST2"]
+    assert first.new.loc["TST2", "latitude"] == 51
+    assert np.isnan(first.new.loc["TST1", "requested_flight_level"])
+    assert first.removed == [] and first.changed == {}
+
+    assert second.sim_t == 1
+    assert second.new.empty and second.removed == []
+    assert list(second.changed) == ["latitude"]
+    assert second.changed["latitude"].to_dict() == {"TST1": pytest.approx(50.1)}
+
+    assert third.sim_t == 2
+    assert list(third.new.index) == ["TST3"]
+    assert third.new.loc["TST3", "requested_flight_level"] == 30000
+    assert third.removed == ["TST2"]
+    assert third.changed["latitude"].to_dict() == {"TST1": pytest.approx(50.2)}
+
+
+def test_stream_positions():
+    sim = MockSimulation()
+
+    def mocked_get(session, url, **kwargs):
+        return MockResponse(sim.response())
+
+    def mocked_post(session, url, **kwargs):
+        assert url.endswith(config.endpoint_simulation_step)
+        sim.step()
+        return MockResponse({})
+
+    dodo = Dodo()
+    with patch("requests.Session.get", mocked_get), patch(
+        "requests.Session.post", mocked_post
+    ):
+        stream = dodo.stream_positions(on_step=True)
+        check_deltas([next(stream) for _ in range(3)])
+        stream.close()
+
+    with pytest.raises(AssertionError):
+        stream_positions()
+    with pytest.raises(AssertionError):
+        stream_positions(interval=-1)
+
+
+def test_stream_positions_interval():
+    sim = MockSimulation()
+
+    def mocked_get(session, url, **kwargs):
+        return MockResponse(sim.response())
+
+    with patch("requests.Session.get", mocked_get):
+        stream = stream_positions(interval=0.01)
+        assert next(stream).sim_t == 0
+        # unchanged snapshots are skipped
+        sim.step()
+        assert next(stream).sim_t == 1
+
+
+def test_position_delta():
+    ids = np.array(["TST1", "TST2"])
+    previous = {
+        "aircraft_id": ids,
+        "latitude": np.array([50.0, np.nan]),
+        "aircraft_type": np.array(["B744", "A320"]),
+        "sim_t": 5,
+    }
+    assert _position_delta(previous, dict(previous)) is None
+
+    current = dict(previous, aircraft_type=np.array(["B744", "A321"]), sim_t=6)
+    delta = _position_delta(previous, current)
+    assert delta.sim_t == 6
+    assert list(delta.changed) == ["aircraft_type"]
+    assert delta.changed["aircraft_type"].to_dict() == {"TST2": "A321"}
+
+
+def test_async_stream_positions():
+    sim = MockSimulation()
+
+    async def get_pos(request):
+        return web.json_response(sim.response())
+
+    async def post_step(request):
+        sim.step()
+        return web.json_response({})
+
+    async def run():
+        app = web.Application()
+        prefix = "/{}/{}/".format(config.api_path, config.api_version)
+        app.router.add_get(prefix + config.endpoint_aircraft_position, get_pos)
+        app.router.add_post(prefix + config.endpoint_simulation_step, post_step)
+        server = TestServer(app, host="localhost")
+        await server.start_server()
+        try:
+            async with AsyncDodo(host="localhost", port=server.port) as dodo:
+                deltas = []
+                async for delta in dodo.stream_positions(on_step=True):
+                    deltas.append(delta)
+                    if len(deltas) == 3:
+                        break
+                return deltas
+        finally:
+            await server.close()
+
+    check_deltas(asyncio.run(run()))
@@ -0,0 +1,88 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo import geodesic_distance, vertical_distance, euclidean_distance
+from pydodo.proximity import _proximity_from_pos
+
+
+@pytest.fixture
+def pos_df():
+    rng = np.random.RandomState(1)
+    n = 150
+    return pd.DataFrame(
+        {
+            "latitude": rng.uniform(50, 52, n),
+            "longitude": rng.uniform(-2, 0, n),
+            "current_flight_level": rng.uniform(0, 12000, n),
+        },
+        index=["TST{}".format(i) for i in range(n)],
+    )
+
+
+def brute_force_pairs(pos_df, lateral, vertical):
+    pairs = []
+    ids = list(pos_df.index)
+    lat, lon, alt = pos_df.to_numpy().T
+    for i in range(len(ids)):
+        lat_d = geodesic_distance(lat[i], lon[i], lat[i + 1 :], lon[i + 1 :])
+        vert_d = vertical_distance(alt[i], alt[i + 1 :])
+        for j in range(len(lat_d)):
+            if lat_d[j] <= lateral and (vertical is None or vert_d[j] <= vertical):
+                pairs.append((ids[i], ids[i + 1 + j], lat_d[j], vert_d[j]))
+    return pairs
+
+
+@pytest.mark.parametrize("lateral,vertical", [(9260, 304.8), (5000, None), (0, 0)])
+def test_proximity_pairs(pos_df, lateral, vertical):
+    result = _proximity_from_pos(pos_df, lateral, vertical, 6378137.0, 1 / 298.257223563)
+    expected = brute_force_pairs(pos_df, lateral, vertical)
+
+    assert list(result.columns) == [
+        "from_aircraft_id",
+        "to_aircraft_id",
+        "lateral",
+        "vertical",
+        "euclidean",
+    ]
+    assert list(zip(result["from_aircraft_id"], result["to_aircraft_id"])) == [
+        pair[:2] for pair in expected
+    ]
+    assert np.allclose(result["lateral"], [pair[2] for pair in expected])
+    assert np.allclose(result["vertical"], [pair[3] for pair in expected])
+
+    for _, row in result.iterrows():
+        p1, p2 = pos_df.loc[row["from_aircraft_id"]], pos_df.loc[row["to_aircraft_id"]]
+        assert row["euclidean"] == pytest.approx(
+            euclidean_distance(
+                p1["latitude"],
+                p1["longitude"],
+                p1["current_flight_level"],
+                p2["latitude"],
+                p2["longitude"],
+                p2["current_flight_level"],
+            )
+        )
+
+
+def test_proximity_pairs_missing_positions(pos_df):
+    pos_df = pos_df.iloc[:2].reindex(["TST0", "TST1", "TST2002"])
+    pos_df.loc["TST1", ["latitude", "longitude"]] = pos_df.loc["TST0", ["latitude", "longitude"]]
+
+    result = _proximity_from_pos(pos_df, 1, None, 6378137.0, 1 / 298.257223563)
+    assert list(result["from_aircraft_id"]) == ["TST0"]
+    assert list(result["to_aircraft_id"]) == ["TST1"]
+    assert result["lateral"][0] == 0
+
+    result = _proximity_from_pos(pos_df.iloc[:1], 1, None, 6378137.0, 1 / 298.257223563)
+    assert result.empty
+
+
+def test_proximity_pairs_wrong_inputs(pos_df):
+    with pytest.raises(AssertionError):
+        _proximity_from_pos(pos_df, -1, None, 6378137.0, 1 / 298.257223563)
+
+    pos_df.iloc[0, 0] = 91
+    with pytest.raises(AssertionError):
+        _proximity_from_pos(pos_df, 1000, None, 6378137.0, 1 / 298.257223563)
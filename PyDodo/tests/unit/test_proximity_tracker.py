@@ -0,0 +1,63 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo import ProximityTracker, config
+from pydodo.local_metrics import _FOOT
+from pydodo.proximity import _proximity_from_pos
+
+
+def random_positions(rng, n):
+    """Positions (altitude in feet) as returned by all_positions()."""
+    return pd.DataFrame(
+        {
+            config.latitude: rng.uniform(51, 52, n),
+            config.longitude: rng.uniform(-1, 1, n),
+            config.current_flight_level: rng.uniform(20000, 30000, n),
+        },
+        index=["TST{}".format(i) for i in range(n)],
+    )
+
+
+def test_tracker_matches_proximity_pairs():
+    rng = np.random.RandomState(0)
+    pos_df = random_positions(rng, 300)
+    tracker = ProximityTracker(
+        9260, 1000 * _FOOT, lateral_skin=4000, vertical_skin=200
+    )
+    for step in range(30):
+        # aircraft move up to about 300 m and 5 m per step
+        pos_df[config.latitude] += rng.uniform(-0.002, 0.002, len(pos_df))
+        pos_df[config.longitude] += rng.uniform(-0.003, 0.003, len(pos_df))
+        pos_df[config.current_flight_level] += rng.uniform(-15, 15, len(pos_df))
+        if step == 20:
+            # an aircraft leaves, another one enters
+            pos_df = pos_df.drop(index="TST0")
+            pos_df.loc["NEW"] = pos_df.iloc[0] + [0.01, 0.01, 0]
+
+        pairs = tracker.update(pos_df)
+        metres = pos_df.copy()
+        metres[config.current_flight_level] *= _FOOT
+        expected = _proximity_from_pos(metres, 9260, 1000 * _FOOT, 6378137, 1 / 298.257223563)
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(
+            pairs.sort_values(["from_aircraft_id", "to_aircraft_id"]).reset_index(drop=True),
+            expected.sort_values(["from_aircraft_id", "to_aircraft_id"]).reset_index(drop=True),
+        )
+
+    # the candidate list is reused across steps
+    assert 1 < tracker.n_rebuilds < 10
+    assert tracker.n_candidates >= len(pairs)
+
+
+def test_tracker_args():
+    with pytest.raises(AssertionError):
+        ProximityTracker(-1)
+    with pytest.raises(AssertionError):
+        ProximityTracker(9260, lateral_skin=-1)
+
+    tracker = ProximityTracker(9260)
+    pos_df = random_positions(np.random.RandomState(1), 1)
+    assert tracker.update(pos_df).empty
+    assert tracker.update(pos_df.iloc[:0]).empty
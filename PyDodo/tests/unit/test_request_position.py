@@ -1,4 +1,5 @@
 import pytest
+import math
 from unittest.mock import patch
 import pandas as pd
 import requests
@@ -56,7 +57,7 @@ def mocked_requests_get(*args, **kwargs):
     return MockResponse(None, 404)
 
 
-@patch("requests.get", side_effect=mocked_requests_get)
+@patch("requests.Session.get", side_effect=mocked_requests_get)
 def test_output_format(mock_get):
     """
     Check request output is formatted correctly.
@@ -83,3 +84,158 @@ def test_output_format(mock_get):
 
     pos_id = aircraft_position("TEST1")
     assert pos_id.equals(output)
+
+
+@patch("requests.Session.get", side_effect=mocked_requests_get)
+def test_array_output_formats(mock_get):
+    """
+    Check the columnar output formats hold the same values as the dataframe.
+    """
+    pos_df = all_positions()
+
+    pos_arrays = all_positions(output="arrays")
+    assert list(pos_arrays["aircraft_id"]) == list(pos_df.index)
+    assert pos_arrays["sim_t"] == 0
+    for col in pos_df.columns:
+        assert list(pos_arrays[col]) == pytest.approx(
+            list(pos_df[col].astype(float if col != "aircraft_type" else str)),
+            nan_ok=True,
+        )
+
+    pos_arr = all_positions(output="structured")
+    assert pos_arr.dtype.names == ("aircraft_id",) + tuple(pos_df.columns)
+    assert pos_arr["aircraft_id"][0] == "TEST1"
+    assert pos_arr["latitude"][0] == latitude
+    assert pos_arr["current_flight_level"][0] == altitude
+
+    with pytest.raises(AssertionError):
+        all_positions(output="json")
+
+
+def test_json_loads():
+    """
+    Check responses are decoded with or without orjson, including NaN values.
+    """
+    from pydodo.request_position import _json_loads
+
+    assert _json_loads('{"TEST1": {"lat": 51}}') == {"TEST1": {"lat": 51}}
+    assert math.isnan(_json_loads('{"TEST1": {"lat": NaN}}')["TEST1"]["lat"])
+
+
+def mocked_pos_server(n_aircraft, supports_filter, requests_made):
+    """
+    Mock the POS endpoint of a simulation with n_aircraft aircraft, which may
+    or may not accept a comma separated list of callsigns.
+    """
+    aircraft = {
+        "TST{}".format(i): {
+            "actype": type,
+            "current_fl": altitude,
+            "gs": speed,
+            "lat": latitude,
+            "lon": longitude + i / 100,
+            "vs": vertical_speed,
+            "requested_fl": None,
+            "cleared_fl": None,
+        }
+        for i in range(n_aircraft)
+    }
+
+    def mocked_get(session, url, **kwargs):
+        params = kwargs.get("params")
+        requests_made.append(params)
+        if params is None:
+            return MockResponse(dict(aircraft, scenario_time=0))
+        callsigns = params[config_param("query_aircraft_id")].split(",")
+        if len(callsigns) > 1 and not supports_filter:
+            return MockResponse(None, 400)
+        found = {acid: aircraft[acid] for acid in callsigns if acid in aircraft}
+        if not found:
+            return MockResponse(None, 404)
+        return MockResponse(dict(found, scenario_time=0))
+
+    return mocked_get
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(json_data)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise HTTPError(self.status_code)
+
+
+def test_filtered_aircraft_position():
+    """
+    Check a list of aircraft IDs is requested with one filtered call when
+    BlueBird supports it, and with one call for all aircraft otherwise.
+    """
+    from pydodo import Dodo
+
+    ids = ["TST3", "TST1", "MISSING"]
+
+    requests_made = []
+    dodo = Dodo()
+    with patch("requests.Session.get", mocked_pos_server(50, True, requests_made)):
+        filtered_df = dodo.aircraft_position(ids)
+        assert list(filtered_df.index) == ids
+        assert filtered_df.loc["TST1", "longitude"] == pytest.approx(longitude + 0.01)
+        assert filtered_df.loc["MISSING"].isna().all()
+        assert filtered_df.sim_t == 0
+        assert requests_made == [
+            {config_param("query_aircraft_id"): "TST3,TST1,MISSING"}
+        ]
+
+        # too large a fraction of the aircraft in the simulation
+        dodo.all_positions()
+        del requests_made[:]
+        pos_df = dodo.aircraft_position(["TST{}".format(i) for i in range(20)])
+        assert len(pos_df) == 20
+        assert requests_made == [None]
+
+    # BlueBird rejects the filtered call: fall back and remember the failure
+    requests_made = []
+    dodo = Dodo()
+    with patch("requests.Session.get", mocked_pos_server(50, False, requests_made)):
+        assert dodo.aircraft_position(ids).equals(filtered_df)
+        assert len(requests_made) == 2 and requests_made[1] is None
+        del requests_made[:]
+        dodo.aircraft_position(ids)
+        assert requests_made == [None]
+
+
+def test_filtered_aircraft_position_single_id():
+    """
+    Check a successful call for a single aircraft ID does not mark filtering
+    as supported when BlueBird rejects a list of aircraft IDs.
+    """
+    from pydodo import Dodo
+
+    ids = ["TST3", "TST1"]
+
+    requests_made = []
+    dodo = Dodo()
+    with patch("requests.Session.get", mocked_pos_server(50, False, requests_made)):
+        single_df = dodo.aircraft_position(["TST1"])
+        assert list(single_df.index) == ["TST1"]
+        assert dodo._multi_callsign_supported is None
+
+        del requests_made[:]
+        pos_df = dodo.aircraft_position(ids)
+        assert list(pos_df.index) == ids
+        assert len(requests_made) == 2 and requests_made[1] is None
+        assert dodo._multi_callsign_supported is False
+
+        del requests_made[:]
+        dodo.aircraft_position(ids)
+        assert requests_made == [None]
+
+    # a failed filtered call overrides an earlier success
+    requests_made = []
+    dodo = Dodo()
+    dodo._multi_callsign_supported = True
+    with patch("requests.Session.get", mocked_pos_server(50, False, requests_made)):
+        dodo.aircraft_position(ids)
+        assert dodo._multi_callsign_supported is False
@@ -0,0 +1,121 @@
+import os
+import pytest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+from pydodo import Dodo, Sector, config
+
+SECTOR_FILE = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "dodo-test-sector.geojson"
+)
+
+
+def positions(aircraft):
+    """Positions from a dict of (lat, lon, alt in feet)."""
+    columns = [config.latitude, config.longitude, config.current_flight_level]
+    return pd.DataFrame.from_dict(aircraft, orient="index", columns=columns)
+
+
+def test_sector_contains():
+    sector = Sector.from_file(SECTOR_FILE, "test_sector")
+    pos_df = positions(
+        {
+            "TST1": (51.5, -0.1275, 20000),
+            # the western edge leans east going north
+            "TST2": (52.3, -0.395, 20000),
+            "TST3": (50.7, -0.395, 20000),
+            # outside the altitude band
+            "TST4": (51.5, -0.1275, 46000),
+            "TST5": (51.5, -0.1275, 4000),
+            "TST6": (53.0, -0.1275, 20000),
+            "TST7": (np.nan, np.nan, np.nan),
+        }
+    )
+    inside = sector.contains(pos_df)
+    assert list(inside.index) == list(pos_df.index)
+    assert list(inside) == [True, True, False, False, False, False, False]
+    assert sector.contains(pos_df.iloc[:0]).empty
+
+
+def test_sector_update():
+    sector = Sector.from_file(SECTOR_FILE)
+    status = sector.update(positions({"TST1": (51.5, -0.1275, 20000)}))
+    assert list(status.columns) == ["inside", "exited"]
+    assert status.loc["TST1", "inside"] and not status.loc["TST1", "exited"]
+
+    status = sector.update(
+        positions({"TST1": (52.5, -0.1275, 20000), "TST2": (51.5, -0.1275, 20000)})
+    )
+    assert list(status["inside"]) == [False, True]
+    assert list(status["exited"]) == [True, False]
+
+    # aircraft only exit once, and removed aircraft do not exit
+    status = sector.update(positions({"TST1": (52.6, -0.1275, 20000)}))
+    assert not status["exited"].any()
+
+    with pytest.raises(AssertionError):
+        Sector({"type": "FeatureCollection", "features": []})
+
+
+def test_sector_update_unknown_positions():
+    """
+    Check aircraft with a missing or invalid position keep their last state
+    and are not reported as exited.
+    """
+    sector = Sector.from_file(SECTOR_FILE)
+    inside = (51.5, -0.1275, 20000)
+    sector.update(positions({"TST1": inside, "TST2": inside, "TST3": inside}))
+
+    status = sector.update(
+        positions(
+            {
+                "TST1": (np.nan, np.nan, np.nan),
+                "TST2": (51.5, 200, 20000),
+                "TST3": (51.5, -0.1275, np.nan),
+            }
+        )
+    )
+    assert status["inside"].all()
+    assert not status["exited"].any()
+
+    # the aircraft exit once their position is known again
+    status = sector.update(positions({"TST1": (52.5, -0.1275, 20000)}))
+    assert status.loc["TST1", "exited"]
+
+
+def test_upload_sector_keeps_sector():
+    dodo = Dodo()
+    assert dodo.sector is None
+
+    class MockResponse:
+        def raise_for_status(self):
+            pass
+
+    with patch("requests.Session.post", lambda session, url, **kwargs: MockResponse()):
+        assert dodo.upload_sector(SECTOR_FILE, "test_sector") == True
+    assert dodo.sector.name == "test_sector"
+    assert dodo.sector.contains(positions({"TST1": (51.5, -0.1275, 20000)})).all()
+
+
+def test_upload_sector_unreadable(tmp_path, caplog):
+    """
+    Check a sector accepted by BlueBird but which cannot be read as a Sector
+    is uploaded, and the client keeps no sector.
+    """
+    dodo = Dodo()
+    filename = str(tmp_path / "sector.geojson")
+    with open(filename, "w") as f:
+        f.write('{"type": "FeatureCollection", "features": [{"type": "Feature"}]}')
+
+    class MockResponse:
+        def raise_for_status(self):
+            pass
+
+    with patch("requests.Session.post", lambda session, url, **kwargs: MockResponse()):
+        assert dodo.upload_sector(SECTOR_FILE, "test_sector") == True
+        assert dodo.sector is not None
+        assert dodo.upload_sector(filename, "other_sector") == True
+    assert dodo.sector is None
+    assert "other_sector" in caplog.text
@@ -0,0 +1,86 @@
+import os
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo import TrajectoryReader, TrajectoryRecorder, config
+
+pa = pytest.importorskip("pyarrow")
+
+
+def snapshot(sim_t, aircraft_id):
+    """Positions in the "arrays" format with latitude = sim_t + aircraft number."""
+    n = np.array([int(acid[3:]) for acid in aircraft_id], dtype=float)
+    return {
+        "aircraft_id": np.array(aircraft_id, dtype=str),
+        config.aircraft_type: np.array(["B744"] * len(aircraft_id), dtype=str),
+        config.latitude: sim_t + n,
+        config.longitude: -n,
+        config.current_flight_level: np.full(len(n), 25000.0),
+        "sim_t": sim_t,
+    }
+
+
+def record(path, format):
+    with TrajectoryRecorder(path, format=format, batch_rows=5, part_rows=10) as recorder:
+        for sim_t in range(10):
+            ids = ["TST1", "TST2", "TST3"] if sim_t < 5 else ["TST2", "TST4"]
+            assert recorder.append(snapshot(sim_t, ids)) == True
+        assert recorder.append(snapshot(9, ["TST2"])) == False
+        with pytest.raises(AssertionError):
+            recorder.append(snapshot(8, ["TST2"]))
+
+
+@pytest.mark.parametrize("format", ["arrow", "parquet"])
+def test_trajectory_recording(tmp_path, format):
+    path = str(tmp_path / "run")
+    record(path, format)
+    parts = sorted(os.listdir(path))
+    assert parts == ["part-0000{}.{}".format(i, format) for i in range(3)]
+
+    reader = TrajectoryReader(path)
+    assert len(reader) == 25
+    assert reader.time_range == (0, 9)
+    assert reader.columns[:3] == ["sim_t", "aircraft_id", config.aircraft_type]
+
+    window = reader.window(start=3.5, end=6)
+    assert list(window["sim_t"]) == [4, 4, 4, 5, 5, 6, 6]
+    assert list(window["aircraft_id"]) == ["TST1", "TST2", "TST3"] + ["TST2", "TST4"] * 2
+    assert list(window[config.latitude]) == list(window["sim_t"] + [1, 2, 3, 2, 4, 2, 4])
+    assert (window[config.aircraft_type] == "B744").all()
+    assert window[config.ground_speed].isna().all()
+
+    latitude = reader.column(config.latitude, start=8)
+    assert latitude.to_numpy().tolist() == [10, 12, 11, 13]
+
+    arrays = reader.window(end=0, columns=["aircraft_id", config.longitude], output="arrays")
+    assert list(arrays) == ["aircraft_id", config.longitude]
+    assert list(arrays[config.longitude]) == [-1, -2, -3]
+
+    trajectory = reader.trajectory("TST2", start=2, end=6)
+    assert list(trajectory.index) == [2, 3, 4, 5, 6]
+    assert list(trajectory[config.latitude]) == [4, 5, 6, 7, 8]
+    assert reader.trajectory("MISSING").empty
+
+    assert reader.window(start=20).empty
+
+    # only one recording per directory
+    with pytest.raises(AssertionError):
+        TrajectoryRecorder(path)
+
+
+def test_trajectory_recording_zero_copy(tmp_path):
+    path = str(tmp_path / "run")
+    with TrajectoryRecorder(path, format="arrow", batch_rows=100) as recorder:
+        pos_df = pd.DataFrame(
+            {config.latitude: [51.0, 52.0], config.longitude: [0.0, 1.0]},
+            index=["TST1", "TST2"],
+        )
+        pos_df.sim_t = 10
+        recorder.append(pos_df)
+
+    latitude = TrajectoryReader(path).column(config.latitude)
+    assert latitude.num_chunks == 1
+    # the values are read straight from the memory-mapped file
+    assert latitude.chunk(0).to_numpy(zero_copy_only=True).tolist() == [51, 52]
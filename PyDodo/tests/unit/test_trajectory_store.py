@@ -0,0 +1,127 @@
+import pytest
+
+import numpy as np
+import pandas as pd
+
+from pydodo import TrajectoryStore, config
+
+
+def snapshot(sim_t, aircraft_id):
+    """Positions in the "arrays" format with latitude = sim_t + aircraft number."""
+    n = np.array([int(acid[3:]) for acid in aircraft_id], dtype=float)
+    return {
+        "aircraft_id": np.array(aircraft_id, dtype=str),
+        config.aircraft_type: np.array(["B744"] * len(aircraft_id), dtype=str),
+        config.latitude: sim_t + n,
+        config.longitude: -n,
+        config.current_flight_level: np.full(len(n), 25000.0),
+        "sim_t": sim_t,
+    }
+
+
+def test_trajectory_store():
+    store = TrajectoryStore(chunk_size=4, max_mb=None)
+    assert len(store) == 0 and store.time_range is None
+
+    for sim_t in range(10):
+        ids = ["TST1", "TST2", "TST3"] if sim_t < 5 else ["TST2", "TST4"]
+        assert store.append(snapshot(sim_t, ids)) == True
+    # repeated polls at the same scenario time are skipped
+    assert store.append(snapshot(9, ["TST2"])) == False
+    with pytest.raises(AssertionError):
+        store.append(snapshot(8, ["TST2"]))
+
+    assert len(store) == 25
+    assert store.time_range == (0, 9)
+    assert store.aircraft_ids == ["TST1", "TST2", "TST3", "TST4"]
+
+    window = store.window(start=3.5, end=6)
+    assert list(window["sim_t"]) == [4, 4, 4, 5, 5, 6, 6]
+    assert list(window["aircraft_id"]) == ["TST1", "TST2", "TST3"] + ["TST2", "TST4"] * 2
+    assert list(window[config.latitude]) == list(window["sim_t"] + [1, 2, 3, 2, 4, 2, 4])
+    assert (window[config.aircraft_type] == "B744").all()
+    assert window[config.ground_speed].isna().all()
+
+    window = store.window(start=2, aircraft_id=["TST4", "TST1", "MISSING"])
+    assert list(window["sim_t"]) == [2, 3, 4, 5, 6, 7, 8, 9]
+    assert list(window["aircraft_id"]) == ["TST1"] * 3 + ["TST4"] * 5
+
+    trajectory = store.trajectory("TST2", end=4)
+    assert list(trajectory.index) == [0, 1, 2, 3, 4]
+    assert list(trajectory[config.latitude]) == [2, 3, 4, 5, 6]
+    assert store.trajectory("MISSING").empty
+
+    arrays = store.window(aircraft_id="TST3", output="arrays")
+    assert list(arrays["sim_t"]) == [0, 1, 2, 3, 4]
+    assert list(arrays[config.longitude]) == [-3] * 5
+
+    store.clear()
+    assert len(store) == 0 and store.aircraft_ids == []
+
+
+def test_trajectory_store_dataframe():
+    store = TrajectoryStore()
+    pos_df = pd.DataFrame(
+        {
+            config.aircraft_type: ["B744", np.nan],
+            config.latitude: [51.0, np.nan],
+            config.longitude: [0.0, np.nan],
+            config.requested_flight_level: [None, None],
+        },
+        index=["TST1", "MISSING"],
+    )
+    pos_df.sim_t = 10
+    assert store.append(pos_df) == True
+    assert store.aircraft_ids == ["TST1"]
+    window = store.window()
+    assert list(window["aircraft_id"]) == ["TST1"]
+    assert window.loc[0, config.latitude] == 51
+    assert np.isnan(window.loc[0, config.requested_flight_level])
+
+    # copies do not keep the scenario time
+    with pytest.raises(AssertionError):
+        store.append(pos_df.copy())
+
+
+def test_trajectory_store_eviction():
+    chunk_size = 1000
+    store = TrajectoryStore(chunk_size=chunk_size, max_mb=0.25)
+    one_chunk = TrajectoryStore(chunk_size=chunk_size, max_mb=None)
+    one_chunk.append(snapshot(0, ["TST1"]))
+    n_chunks = int(0.25e6 // one_chunk.nbytes)
+
+    ids = ["TST{}".format(i) for i in range(100)]
+    for sim_t in range(200):
+        store.append(snapshot(sim_t, ids))
+    assert store.nbytes <= 0.25e6
+    assert len(store) <= n_chunks * chunk_size
+    # the oldest positions were evicted
+    first_t, last_t = store.time_range
+    assert first_t > 0 and last_t == 199
+    assert list(store.trajectory("TST5", start=195)[config.latitude]) == [
+        200,
+        201,
+        202,
+        203,
+        204,
+    ]
+
+
+def test_trajectory_store_eviction_whole_snapshots():
+    """
+    Check eviction never leaves part of a snapshot, with snapshots which are
+    not aligned with (or larger than) the chunks.
+    """
+    one_chunk = TrajectoryStore(chunk_size=4, max_mb=None)
+    one_chunk.append(snapshot(0, ["TST1"]))
+    for n_aircraft in [3, 7]:
+        store = TrajectoryStore(chunk_size=4, max_mb=3.5 * one_chunk.nbytes / 1e6)
+        ids = ["TST{}".format(i) for i in range(n_aircraft)]
+        for sim_t in range(20):
+            store.append(snapshot(sim_t, ids))
+            counts = store.window()["sim_t"].value_counts()
+            assert (counts == n_aircraft).all()
+            assert store.time_range[1] == sim_t
+        first_t, _ = store.time_range
+        assert first_t > 0
+        assert list(store.window(end=first_t)["aircraft_id"]) == ids
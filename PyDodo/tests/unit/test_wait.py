@@ -0,0 +1,154 @@
+import pytest
+import json
+import time
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pandas as pd
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pydodo import AsyncDodo, Dodo, config, wait_until
+from pydodo.wait import _WaitSchedule
+
+
+def aircraft(lat):
+    return {
+        "actype": "B744",
+        "current_fl": 25000,
+        "gs": 250,
+        "lat": lat,
+        "lon": 0,
+        "vs": 0,
+        "requested_fl": None,
+        "cleared_fl": None,
+    }
+
+
+class MockSimulation:
+    """A simulation running 10 times faster than real time, moving aircraft north."""
+
+    def __init__(self):
+        self.start = time.monotonic()
+        self.requests = 0
+
+    def response(self):
+        self.requests += 1
+        sim_t = 10 * (time.monotonic() - self.start)
+        return {
+            "TST1": aircraft(50 + sim_t / 100),
+            "TST2": aircraft(51 + sim_t / 100),
+            "scenario_time": sim_t,
+        }
+
+
+class MockResponse:
+    def __init__(self, json_data, status_code=200):
+        self.status_code = status_code
+        self.text = json.dumps(json_data)
+
+    def raise_for_status(self):
+        pass
+
+
+def test_wait_until():
+    sim = MockSimulation()
+
+    def mocked_get(session, url, **kwargs):
+        return MockResponse(sim.response())
+
+    dodo = Dodo()
+    with patch("requests.Session.get", mocked_get):
+        start = time.monotonic()
+        # both aircraft pass their threshold at sim_t = 5
+        threshold = pd.Series({"TST1": 50.05, "TST2": 51.05})
+        assert dodo.wait_until(
+            ["TST1", "TST2"], lambda pos: pos["latitude"] > threshold
+        )
+        assert 0.4 < time.monotonic() - start < 1.5
+        # the polls follow the simulation rate rather than hammering BlueBird
+        assert sim.requests < 20
+
+        assert not dodo.wait_until("TST1", lambda pos: pos["latitude"] > 60, timeout=0.3)
+        assert not dodo.wait_until(
+            "TST1", lambda pos: pos["latitude"] > 60, sim_timeout=2
+        )
+        # missing aircraft have missing positions
+        assert not dodo.wait_until("MISSING", lambda pos: pos["latitude"] > 0, timeout=0.1)
+
+        with pytest.raises(AssertionError):
+            wait_until("TST1", "latitude > 50")
+        with pytest.raises(AssertionError):
+            wait_until("TST1", lambda pos: True, timeout=-1)
+
+
+def test_concurrent_waits_share_fetch():
+    sim = MockSimulation()
+
+    def mocked_get(session, url, **kwargs):
+        time.sleep(0.02)
+        return MockResponse(sim.response())
+
+    dodo = Dodo()
+    results = []
+
+    def wait():
+        results.append(
+            dodo.wait_until("TST1", lambda pos: pos["latitude"] > 50.05, timeout=5)
+        )
+
+    with patch("requests.Session.get", mocked_get):
+        threads = [threading.Thread(target=wait) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert results == [True] * 8
+    # the first poll of all the waits is one request
+    assert sim.requests < 8 * 5
+
+
+def test_wait_schedule():
+    schedule = _WaitSchedule(timeout=60, sim_timeout=None)
+    assert schedule.next_poll(0) == config.wait_min_interval
+    # the simulation does not advance: back off
+    time.sleep(0.01)
+    assert schedule.next_poll(0) == 2 * config.wait_min_interval
+    time.sleep(0.01)
+    assert schedule.next_poll(0) == 4 * config.wait_min_interval
+    for _ in range(10):
+        interval = schedule.next_poll(0)
+    assert interval == config.wait_max_interval
+
+    # fast simulations are polled more often
+    time.sleep(0.05)
+    interval = schedule.next_poll(1000)
+    assert interval == config.wait_min_interval
+
+
+def test_async_wait_until():
+    sim = MockSimulation()
+
+    async def get_pos(request):
+        return web.json_response(sim.response())
+
+    async def run():
+        app = web.Application()
+        prefix = "/{}/{}/".format(config.api_path, config.api_version)
+        app.router.add_get(prefix + config.endpoint_aircraft_position, get_pos)
+        server = TestServer(app, host="localhost")
+        await server.start_server()
+        try:
+            async with AsyncDodo(host="localhost", port=server.port) as dodo:
+                return await asyncio.gather(
+                    *[
+                        dodo.wait_until("TST2", lambda pos: pos["latitude"] > 51.03)
+                        for _ in range(5)
+                    ],
+                    dodo.wait_until("TST1", lambda pos: pos["latitude"] > 60, timeout=0.2),
+                )
+        finally:
+            await server.close()
+
+    assert asyncio.run(run()) == [True] * 5 + [False]